@@ -0,0 +1,351 @@
+"""
+Classification Service for Base44 Applications
+Long-lived local server (HTTP or Unix socket) that keeps trained models warm and micro-batches scoring
+"""
+
+import copy
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from analysis.ml_models import MLAnalysisEngine
+from extractors.regex_code_analyzer import RegexCodeAnalyzer
+from utils.clone_detector import SOURCE_EXTENSIONS, file_digest
+from utils.result_cache import MemoryBudgetLRU
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _PendingRow:
+    """One feature row waiting for the batcher"""
+    name: str
+    features: np.ndarray  # Raw (unnormalized) feature row
+    future: Future
+
+class MicroBatcher:
+    """
+    Collects concurrent submissions and scores them together
+
+    A batch closes when it reaches max_batch_size rows or max_wait_seconds after
+    its first row arrived, so an idle server answers a lone request immediately.
+    """
+
+    def __init__(self, score_batch: Callable[[List[str], np.ndarray], List[Dict[str, Any]]],
+                 max_batch_size: int = 64, max_wait_seconds: float = 0.002):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.batches = 0
+        self.rows = 0
+
+        self._queue: "queue.Queue[Optional[_PendingRow]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, features: np.ndarray) -> Future:
+        """Queue one row; the future resolves to its prediction dict"""
+        future = Future()
+        self._queue.put(_PendingRow(name, features, future))
+        return future
+
+    def close(self):
+        """Stop the batcher thread after the queued rows are scored"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait_seconds
+            stop = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+
+            self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch: List[_PendingRow]):
+        try:
+            predictions = self.score_batch([row.name for row in batch], np.stack([row.features for row in batch]))
+        except Exception as e:
+            for row in batch:
+                row.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        for row, prediction in zip(batch, predictions):
+            row.future.set_result(prediction)
+
+class ClassificationService:
+    """Trained models, taxonomy and extractors loaded once and shared by all requests"""
+
+    def __init__(self, model_file: str, taxonomy_file: Optional[str] = None,
+                 max_batch_size: int = 64, max_wait_seconds: float = 0.002,
+                 cache_max_bytes: int = 128 * 1024 * 1024, latency_window: int = 10000):
+        """
+        Args:
+            model_file: Models saved by MLAnalysisEngine (run_complete_analysis or save_models)
+            taxonomy_file: Optional exported taxonomy (TaxonomyBuilder.export_taxonomy) used to
+                attach the taxonomy category of already-catalogued apps
+            max_batch_size: Largest number of rows scored together
+            max_wait_seconds: How long a batch waits for more rows after its first one
+            cache_max_bytes: Memory budget for per-file analysis results
+            latency_window: Number of recent request latencies kept for stats()
+        """
+        self.engine = MLAnalysisEngine().load_models(model_file)
+        self.analyzer = RegexCodeAnalyzer()
+
+        self.taxonomy: Dict[str, Dict] = {}
+        if taxonomy_file:
+            with open(taxonomy_file, 'r', encoding='utf-8') as f:
+                self.taxonomy = json.load(f).get('application_categories', {})
+            logger.info(f"Loaded taxonomy categories for {len(self.taxonomy)} apps")
+
+        # Per-file results keyed by (file name, content digest): boilerplate shared by many
+        # apps is analyzed once, regardless of which app directory it was read from
+        self.file_results = MemoryBudgetLRU(max_bytes=cache_max_bytes)
+
+        self.batcher = MicroBatcher(self._score_batch, max_batch_size, max_wait_seconds)
+        self._latencies = deque(maxlen=latency_window)
+        self._latency_lock = threading.Lock()
+
+    def close(self):
+        self.batcher.close()
+
+    def _score_batch(self, names: List[str], raw_features: np.ndarray) -> List[Dict[str, Any]]:
+        """Normalize and run all three models over a batch (runs on the batcher thread)"""
+        X = self.engine.feature_extractor.apply_normalization(raw_features, self.engine.normalization_params)
+        return self.engine._score_matrix(X, names)
+
+    def extract_app(self, app_path: str) -> Dict[str, Any]:
+        """Template summary for an app directory (same shape as the regex analyzer's output)"""
+        app_path = Path(app_path)
+        if not app_path.is_dir():
+            raise FileNotFoundError(f"Application path {app_path} does not exist")
+
+        analyses = []
+        for ext in SOURCE_EXTENSIONS:
+            for file_path in app_path.rglob(f"*{ext}"):
+                content = file_path.read_bytes()
+                key = (file_path.name, file_digest(content))
+                metrics = self.file_results.get(key)
+                if metrics is None:
+                    metrics = self.analyzer.analyze_component(str(file_path), content.decode('utf-8', errors='replace'))
+                    self.file_results.put(key, metrics)
+                else:
+                    metrics = copy.copy(metrics)
+                    metrics.file_path = str(file_path)
+                analyses.append(metrics)
+
+        summary = self.analyzer._create_template_summary(app_path.name, analyses)
+        if 'error' in summary:
+            raise ValueError(f"No source files found under {app_path}")
+        return summary
+
+    def _feature_row(self, request: Dict[str, Any]) -> Tuple[str, np.ndarray]:
+        """(name, raw feature row) for one request"""
+        if 'app_path' in request:
+            summary = self.extract_app(request['app_path'])
+            return request.get('name') or summary['template_name'], self.engine.build_template_matrix([summary])[0]
+
+        if 'features' in request:
+            level = request.get('level', 'template')
+            record = request['features']
+            name = request.get('name') or record.get('template_name', '')
+            if level == 'template':
+                return name, self.engine.build_template_matrix([record])[0]
+            if level == 'component':
+                return name, self.engine.feature_extractor.build_feature_matrix([record])[0]
+            raise ValueError(f"Unknown record level: {level}")
+
+        raise ValueError("Request needs either 'app_path' or 'features'")
+
+    def classify(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Classify one app
+
+        Args:
+            request: {'app_path': ...} to run the extractors, or
+                {'features': record, 'level': 'template'|'component', 'name': ...}
+                for pre-extracted features
+
+        Returns:
+            Prediction dict (category, complexity, cluster), plus the taxonomy
+            category when the app is catalogued
+        """
+        start = time.perf_counter()
+        name, features = self._feature_row(request)
+        return self._collect(name, self.batcher.submit(name, features), start)
+
+    def _collect(self, name: str, future: Future, start: float) -> Dict[str, Any]:
+        """Wait for a submitted row and finish its prediction dict"""
+        prediction = dict(future.result())
+
+        taxonomy_entry = self.taxonomy.get(name)
+        if taxonomy_entry:
+            prediction['taxonomy_category'] = taxonomy_entry.get('final_category')
+
+        latency = time.perf_counter() - start
+        prediction['latency_ms'] = latency * 1000
+        with self._latency_lock:
+            self._latencies.append(latency)
+        return prediction
+
+    def handle(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch a decoded request body: a single app, or {'apps': [...]}"""
+        if 'apps' in payload:
+            start = time.perf_counter()
+            rows = []
+            for request in payload['apps']:
+                try:
+                    rows.append(self._feature_row(request))
+                except Exception as e:
+                    rows.append(e)
+
+            # Submit every row before waiting on any, so the batcher can score them together
+            pending = [row if isinstance(row, Exception) else (row[0], self.batcher.submit(*row)) for row in rows]
+            results = []
+            for item in pending:
+                try:
+                    if isinstance(item, Exception):
+                        raise item
+                    results.append(self._collect(*item, start))
+                except Exception as e:
+                    results.append({'error': str(e)})
+            return {'results': results}
+        return self.classify(payload)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request latency percentiles and batching counters"""
+        with self._latency_lock:
+            latencies = np.asarray(self._latencies, dtype=np.float64) * 1000
+        stats = {
+            'requests': len(latencies),
+            'batches': self.batcher.batches,
+            'mean_batch_size': self.batcher.rows / self.batcher.batches if self.batcher.batches else 0.0,
+            'cached_files': len(self.file_results)
+        }
+        if len(latencies):
+            p50, p99 = np.percentile(latencies, [50, 99])
+            stats.update(latency_p50_ms=float(p50), latency_p99_ms=float(p99), latency_max_ms=float(latencies.max()))
+        return stats
+
+def _http_handler(service: ClassificationService):
+    """Request handler class bound to a service instance"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _reply(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {'status': 'ok'})
+            elif self.path == '/stats':
+                self._reply(200, service.stats())
+            else:
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/classify':
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                self._reply(200, service.handle(payload))
+            except (ValueError, FileNotFoundError) as e:
+                self._reply(400, {'error': str(e)})
+            except Exception as e:
+                logger.error(f"Classification failed: {e}")
+                self._reply(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return Handler
+
+def _unix_handler(service: ClassificationService):
+    """Line-delimited JSON handler (one request per line, connections may be kept open)"""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    response = service.handle(json.loads(line))
+                except Exception as e:
+                    response = {'error': str(e)}
+                self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+    return Handler
+
+def create_http_server(service: ClassificationService, host: str = '127.0.0.1',
+                       port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server: POST /classify, GET /stats, GET /health (call serve_forever() to run)"""
+    server = ThreadingHTTPServer((host, port), _http_handler(service))
+    server.daemon_threads = True
+    logger.info(f"Classification service listening on http://{host}:{server.server_address[1]}")
+    return server
+
+def create_unix_server(service: ClassificationService, socket_path: str) -> socketserver.ThreadingUnixStreamServer:
+    """Unix-socket server speaking line-delimited JSON (call serve_forever() to run)"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _unix_handler(service))
+    server.daemon_threads = True
+    logger.info(f"Classification service listening on {socket_path}")
+    return server
+
+def main():
+    """Serve the models produced by the ML analysis over HTTP on localhost"""
+    service = ClassificationService(
+        model_file="data/processed/ml_analysis_results.models.npz",
+        taxonomy_file="data/processed/base44_taxonomy.json" if Path("data/processed/base44_taxonomy.json").exists() else None
+    )
+    server = create_http_server(service)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,21 @@ Predictive models for complexity, quality, and category classification
 import json
 import pickle
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 import re
 from collections import Counter, defaultdict
+from functools import partial
 import logging
 
-# For ML without external dependencies
-from math import sqrt, log, exp
-import random
 import statistics
+import time
+
+import numpy as np
+
+from utils.parallel_executor import ParallelExecutor, BACKEND_SERIAL, BACKEND_THREAD, BACKEND_PROCESS
+from utils.component_records import iter_component_records, metrics_to_record
+from analysis.similarity_index import SimilarityIndex, MODE_EXACT
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +87,75 @@ class MLFeatures:
     css_classes: float = 0.0
     styled_components: float = 0.0
 
+# Feature -> component record key, copied as-is
+_DIRECT_FEATURES = {
+    'total_lines': 'total_lines', 'code_lines': 'code_lines', 'jsx_lines': 'jsx_lines',
+    'cyclomatic_complexity': 'cyclomatic_complexity', 'nesting_depth': 'nesting_depth',
+    'jsx_elements_count': 'jsx_elements_count', 'jsx_conditional_rendering': 'jsx_conditional_rendering',
+    'hooks_count': 'total_hooks', 'state_variables': 'state_variables', 'effect_hooks': 'effect_hooks',
+    'total_imports': 'total_imports', 'jsx_attributes_count': 'jsx_attributes_count',
+    'api_calls': 'api_calls', 'fetch_calls': 'fetch_calls',
+    'console_logs': 'console_logs', 'todo_comments': 'todo_comments',
+    'try_catch_blocks': 'try_catch_blocks', 'magic_numbers': 'magic_numbers',
+    'function_count': 'function_count', 'async_functions': 'async_functions',
+    'object_literals': 'object_literals', 'array_literals': 'array_literals',
+    'destructuring_patterns': 'destructuring_patterns',
+    'memo_usage': 'memo_usage', 'usecallback_usage': 'usecallback_usage', 'usememo_usage': 'usememo_usage',
+    'inline_styles': 'inline_styles', 'css_classes': 'css_classes', 'styled_components': 'styled_components',
+    'custom_hooks_count': 'custom_hooks', 'custom_components_count': 'custom_components',
+    'html_elements_count': 'html_elements', 'base44_api_calls': 'base44_api_usage'
+}
+
+# Feature -> (numerator key, denominator key); 0 where the denominator is 0
+_RATIO_FEATURES = {
+    'comment_ratio': ('comment_lines', 'total_lines'),
+    'base44_imports_ratio': ('base44_imports', 'total_imports'),
+    'third_party_imports_ratio': ('third_party_imports', 'total_imports'),
+    'local_imports_ratio': ('local_imports', 'total_imports'),
+    'arrow_functions_ratio': ('arrow_functions', 'function_count')
+}
+
+# Record keys holding collections; the feature is their size
+_COUNTED_KEYS = {'custom_hooks', 'custom_components', 'html_elements',
+                 'base44_imports', 'third_party_imports', 'local_imports'}
+
+# Record keys holding {name: count} mappings; the feature is their total
+_SUMMED_KEYS = {'base44_api_usage'}
+
+def _record_column(records: List[Dict], key: str) -> np.ndarray:
+    """One record key across all records as a float64 column"""
+    if key in _COUNTED_KEYS:
+        values = (len(record.get(key, ())) for record in records)
+    elif key in _SUMMED_KEYS:
+        values = (sum(record.get(key, {}).values()) for record in records)
+    else:
+        values = (record.get(key, 0) for record in records)
+    return np.fromiter(values, dtype=np.float64, count=len(records))
+
+# Per-file metric fields named differently by the AST analyzer
+_COMPONENT_FIELD_ALIASES = {
+    'custom_components_used': 'custom_components',
+    'jsx_attributes_total': 'jsx_attributes_count',
+    'function_declarations': 'function_count'
+}
+
+def template_category(template_name: str) -> str:
+    """Category label derived from a template name (simple heuristic)"""
+    name = template_name.lower()
+    if 'ai' in name:
+        return 'AI/ML'
+    elif 'crypto' in name:
+        return 'Crypto/Finance'
+    elif 'edu' in name or 'learn' in name:
+        return 'Education'
+    elif 'fit' in name or 'health' in name:
+        return 'Health/Fitness'
+    elif 'task' in name or 'flow' in name or 'manage' in name:
+        return 'Productivity'
+    elif 'market' in name or 'shop' in name or 'commerce' in name:
+        return 'E-commerce'
+    return 'General'
+
 class FeatureExtractor:
     """Extract ML features from component analysis data"""
     
@@ -181,263 +255,775 @@ class FeatureExtractor:
         """Convert features object to vector"""
         return [getattr(features, name) for name in self.feature_names]
     
-    def normalize_features(self, feature_vectors: List[List[float]]) -> Tuple[List[List[float]], Dict[int, Tuple[float, float]]]:
+    def build_feature_matrix(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the (records x features) float32 matrix column by column
+        
+        Equivalent to extract_features_from_component + features_to_vector per
+        record, without creating an MLFeatures object for every row.
+        """
+        records = records if isinstance(records, list) else list(records)
+        keys = set(_DIRECT_FEATURES.values()) | {key for pair in _RATIO_FEATURES.values() for key in pair}
+        columns = {key: _record_column(records, key) for key in keys}
+        return self.matrix_from_columns(columns, len(records))
+    
+    def matrix_from_columns(self, columns: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """Fill a preallocated float32 feature matrix from per-key record columns"""
+        matrix = np.zeros((n_rows, len(self.feature_names)), dtype=np.float32)
+        
+        for index, name in enumerate(self.feature_names):
+            if name in _RATIO_FEATURES:
+                numerator_key, denominator_key = _RATIO_FEATURES[name]
+                numerator = columns.get(numerator_key)
+                denominator = columns.get(denominator_key)
+                if numerator is None or denominator is None:
+                    continue
+                np.divide(numerator, denominator, out=matrix[:, index], where=denominator > 0,
+                          casting='unsafe')
+            elif _DIRECT_FEATURES.get(name) in columns:
+                matrix[:, index] = columns[_DIRECT_FEATURES[name]]
+        
+        return matrix
+    
+    def fit_normalization(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-feature min/max arrays for min-max scaling"""
+        X = np.asarray(X)
+        if not X.size:
+            return {'min': np.zeros(X.shape[-1], dtype=np.float32), 'max': np.zeros(X.shape[-1], dtype=np.float32)}
+        return {'min': X.min(axis=0).astype(np.float32), 'max': X.max(axis=0).astype(np.float32)}
+    
+    def apply_normalization(self, X: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+        """Min-max scale with stored params; constant features map to 0"""
+        X = np.array(X, dtype=np.float32)
+        span = params['max'] - params['min']
+        scale = np.divide(1.0, span, out=np.zeros_like(span), where=span > 0)
+        X -= params['min']
+        X *= scale
+        return X
+    
+    def normalize_features(self, feature_vectors: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """Normalize feature vectors using min-max scaling"""
-        if not feature_vectors:
-            return [], {}
-        
-        n_features = len(feature_vectors[0])
-        normalization_params = {}
-        
-        # Calculate min and max for each feature
-        for i in range(n_features):
-            values = [vec[i] for vec in feature_vectors]
-            min_val = min(values)
-            max_val = max(values)
-            normalization_params[i] = (min_val, max_val)
-        
-        # Normalize
-        normalized_vectors = []
-        for vector in feature_vectors:
-            normalized = []
-            for i, value in enumerate(vector):
-                min_val, max_val = normalization_params[i]
-                if max_val > min_val:
-                    normalized_value = (value - min_val) / (max_val - min_val)
-                else:
-                    normalized_value = 0.0
-                normalized.append(normalized_value)
-            normalized_vectors.append(normalized)
-        
-        return normalized_vectors, normalization_params
+        params = self.fit_normalization(feature_vectors)
+        return self.apply_normalization(feature_vectors, params), params
 
 class NaiveBayesClassifier:
-    """Simple Naive Bayes classifier for component categorization"""
+    """Gaussian Naive Bayes classifier for component categorization"""
     
-    def __init__(self):
-        self.class_priors = {}
-        self.feature_means = {}
-        self.feature_stdevs = {}
+    def __init__(self, var_smoothing: float = 1e-9):
+        """
+        Args:
+            var_smoothing: Fraction of the largest feature variance added to every
+                class variance, keeping constant features from producing zero variances
+        """
+        self.var_smoothing = var_smoothing
         self.classes = []
+        self.class_log_priors = np.zeros(0)  # (classes,)
+        self.theta = np.zeros((0, 0))  # (classes x features) means
+        self.var = np.zeros((0, 0))  # (classes x features) variances
+        # Running statistics for partial_fit
+        self._counts = np.zeros(0)
+        self._m2 = np.zeros((0, 0))
+        self._epsilon = None
+    
+    @property
+    def class_priors(self) -> Dict[str, float]:
+        return {cls: float(p) for cls, p in zip(self.classes, np.exp(self.class_log_priors))}
+    
+    @property
+    def feature_means(self) -> Dict[str, List[float]]:
+        return {cls: row.tolist() for cls, row in zip(self.classes, self.theta)}
+    
+    @property
+    def feature_stdevs(self) -> Dict[str, List[float]]:
+        return {cls: row.tolist() for cls, row in zip(self.classes, np.sqrt(self.var))}
     
     def fit(self, X: List[List[float]], y: List[str]):
         """Train the classifier"""
-        self.classes = list(set(y))
-        n_samples = len(X)
-        n_features = len(X[0]) if X else 0
+        self._epsilon = None
+        return self.partial_fit(X, y)
+    
+    def partial_fit(self, X: List[List[float]], y: List[str]):
+        """
+        Update the class statistics with another chunk of samples
         
-        # Calculate class priors
-        class_counts = Counter(y)
-        for cls in self.classes:
-            self.class_priors[cls] = class_counts[cls] / n_samples
+        Chunks are merged with the pairwise (Chan et al.) mean/variance update, so
+        fitting chunk by chunk gives the same model as one fit on all samples;
+        the smoothing term is fixed from the first chunk.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return self
+        if self._epsilon is None:
+            self._reset_statistics(X)
         
-        # Calculate feature statistics for each class
-        for cls in self.classes:
-            cls_indices = [i for i, label in enumerate(y) if label == cls]
-            cls_features = [X[i] for i in cls_indices]
-            
-            self.feature_means[cls] = []
-            self.feature_stdevs[cls] = []
-            
-            for feature_idx in range(n_features):
-                feature_values = [sample[feature_idx] for sample in cls_features]
-                
-                mean = statistics.mean(feature_values) if feature_values else 0
-                stdev = statistics.stdev(feature_values) if len(feature_values) > 1 else 1e-6
-                
-                self.feature_means[cls].append(mean)
-                self.feature_stdevs[cls].append(stdev)
-    
-    def _gaussian_probability(self, x: float, mean: float, stdev: float) -> float:
-        """Calculate Gaussian probability density"""
-        if stdev == 0:
-            stdev = 1e-6
-        exponent = exp(-((x - mean) ** 2) / (2 * stdev ** 2))
-        return (1 / (sqrt(2 * 3.14159) * stdev)) * exponent
-    
-    def predict_proba(self, X: List[float]) -> Dict[str, float]:
-        """Predict class probabilities"""
-        probabilities = {}
+        # Classes not seen before get empty statistics rows
+        chunk_classes, chunk_labels = np.unique(np.asarray(y, dtype=object), return_inverse=True)
+        for cls in chunk_classes:
+            if cls not in self.classes:
+                self.classes.append(cls)
+                self._counts = np.append(self._counts, 0.0)
+                self.theta = np.vstack([self.theta, np.zeros(X.shape[1])])
+                self._m2 = np.vstack([self._m2, np.zeros(X.shape[1])])
+        class_index = {cls: i for i, cls in enumerate(self.classes)}
+        labels = np.asarray([class_index[cls] for cls in chunk_classes])[chunk_labels]
         
-        for cls in self.classes:
-            # Start with class prior
-            prob = log(self.class_priors[cls])
-            
-            # Multiply by feature likelihoods
-            for i, feature_value in enumerate(X):
-                mean = self.feature_means[cls][i]
-                stdev = self.feature_stdevs[cls][i]
-                likelihood = self._gaussian_probability(feature_value, mean, stdev)
-                prob += log(likelihood + 1e-10)  # Add small value to prevent log(0)
-            
-            probabilities[cls] = exp(prob)
+        # Per-class chunk sums via a one-hot (samples x classes) indicator
+        indicator = np.zeros((len(X), len(self.classes)))
+        indicator[np.arange(len(X)), labels] = 1.0
+        chunk_counts = indicator.sum(axis=0)
+        present = chunk_counts > 0
         
-        # Normalize probabilities
-        total_prob = sum(probabilities.values())
-        if total_prob > 0:
-            for cls in probabilities:
-                probabilities[cls] /= total_prob
+        chunk_means = np.zeros_like(self.theta)
+        chunk_means[present] = (indicator.T @ X)[present] / chunk_counts[present, None]
+        chunk_m2 = indicator.T @ (X - chunk_means[labels]) ** 2
         
-        return probabilities
+        total = self._counts + chunk_counts
+        delta = chunk_means - self.theta
+        weight = np.divide(chunk_counts, total, out=np.zeros_like(total), where=total > 0)
+        self.theta = np.where(present[:, None], self.theta + delta * weight[:, None], self.theta)
+        self._m2 = self._m2 + chunk_m2 + delta ** 2 * (self._counts * weight)[:, None]
+        self._counts = total
+        
+        # Sample variance (ddof=1); single-sample classes fall back to the smoothing term
+        self.var = np.divide(self._m2, (self._counts - 1)[:, None],
+                             out=np.zeros_like(self._m2), where=self._counts[:, None] > 1)
+        self.var += self._epsilon
+        self.class_log_priors = np.log(self._counts / self._counts.sum())
+        return self
+    
+    def _reset_statistics(self, X: np.ndarray):
+        """Start fresh statistics sized for X, fixing the smoothing term from it"""
+        self.classes = []
+        self._counts = np.zeros(0)
+        self.theta = np.zeros((0, X.shape[1]))
+        self._m2 = np.zeros((0, X.shape[1]))
+        self._epsilon = max(self.var_smoothing * (X.var(axis=0).max() if X.size else 0.0), 1e-12)
+    
+    def _joint_log_likelihood(self, X: np.ndarray) -> np.ndarray:
+        """Unnormalized log posterior for every (sample, class) pair"""
+        # sum((x - mu)^2 / var) expanded into three matrix products over all samples
+        precision = 1.0 / self.var
+        squared_distance = ((X * X) @ precision.T - 2.0 * (X @ (self.theta * precision).T)
+                            + (self.theta * self.theta * precision).sum(axis=1))
+        log_normalizer = -0.5 * np.log(2 * np.pi * self.var).sum(axis=1)
+        return -0.5 * squared_distance + log_normalizer + self.class_log_priors
+    
+    def predict_log_proba_batch(self, X: List[List[float]]) -> np.ndarray:
+        """Normalized log class probabilities (samples x classes, columns in self.classes order)"""
+        jll = self._joint_log_likelihood(np.atleast_2d(np.asarray(X, dtype=np.float64)))
+        top = jll.max(axis=1, keepdims=True)
+        return jll - (top + np.log(np.exp(jll - top).sum(axis=1, keepdims=True)))
+    
+    def predict_proba_batch(self, X: List[List[float]]) -> np.ndarray:
+        """Class probabilities for a matrix of samples"""
+        return np.exp(self.predict_log_proba_batch(X))
+    
+    def predict_proba(self, X: List[float]) -> Dict[str, float]:
+        """Predict class probabilities"""
+        probabilities = self.predict_proba_batch([X])[0]
+        return {cls: float(p) for cls, p in zip(self.classes, probabilities)}
+    
+    def predict_batch(self, X: List[List[float]]) -> List[str]:
+        """Predict class labels for a matrix of samples"""
+        jll = self._joint_log_likelihood(np.atleast_2d(np.asarray(X, dtype=np.float64)))
+        return [self.classes[i] for i in jll.argmax(axis=1)]
     
     def predict(self, X: List[float]) -> str:
         """Predict class label"""
-        probabilities = self.predict_proba(X)
-        return max(probabilities, key=probabilities.get)
+        return self.predict_batch([X])[0]
 
 class LinearRegressor:
-    """Simple linear regression for complexity prediction"""
+    """Linear regression for complexity prediction (closed-form ridge or mini-batch SGD)"""
     
-    def __init__(self):
-        self.weights = []
+    def __init__(self, alpha: float = 0.0, solver: str = 'auto', closed_form_max_features: int = 2048,
+                 batch_size: int = 256, tol: float = 1e-6, n_iter_no_change: int = 5, seed: Optional[int] = None):
+        """
+        Args:
+            alpha: L2 penalty on the weights (the bias is not penalized)
+            solver: 'closed_form', 'sgd', or 'auto' (closed form up to closed_form_max_features)
+            closed_form_max_features: Largest feature count solved in closed form by 'auto'
+            batch_size: Samples per SGD update
+            tol: Minimum relative loss improvement per SGD epoch
+            n_iter_no_change: Epochs without improvement before SGD stops
+            seed: Seed for weight initialization and SGD shuffling
+        """
+        self.alpha = alpha
+        self.solver = solver
+        self.closed_form_max_features = closed_form_max_features
+        self.batch_size = batch_size
+        self.tol = tol
+        self.n_iter_no_change = n_iter_no_change
+        self.seed = seed
+        self.weights = np.zeros(0)
         self.bias = 0.0
         self.feature_names = []
+        self.solver_used = ''
+        self.n_epochs = 0
+        # Running state for partial_fit
+        self._normal_equations = None
+        self._rng = None
     
     def fit(self, X: List[List[float]], y: List[float], learning_rate: float = 0.01, epochs: int = 1000):
-        """Train linear regression model using gradient descent"""
-        n_samples = len(X)
-        n_features = len(X[0]) if X else 0
+        """Train linear regression model (learning_rate/epochs only apply to the SGD solver)"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self._normal_equations = None
+        self._rng = None
+        
+        solver = self._resolve_solver(X.shape[1])
+        if solver == 'closed_form':
+            self._fit_closed_form(X, y)
+        elif solver == 'sgd':
+            self._fit_sgd(X, y, learning_rate, epochs)
+        else:
+            raise ValueError(f"Unknown solver: {self.solver}")
+        
+        self.solver_used = solver
+        return self
+    
+    def _resolve_solver(self, n_features: int) -> str:
+        """Concrete solver for a feature count"""
+        if self.solver == 'auto':
+            return 'closed_form' if n_features <= self.closed_form_max_features else 'sgd'
+        if self.solver not in ('closed_form', 'sgd'):
+            raise ValueError(f"Unknown solver: {self.solver}")
+        return self.solver
+    
+    def partial_fit(self, X: List[List[float]], y: List[float], learning_rate: float = 0.01):
+        """
+        Update the model with another chunk of samples
+        
+        The closed-form solver accumulates X'X, X'y and column sums across chunks
+        and re-solves the normal equations, so chunked training matches a single
+        fit; the SGD solver runs one shuffled mini-batch epoch over the chunk.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if not len(X):
+            return self
         
-        # Initialize weights and bias
-        self.weights = [random.uniform(-0.1, 0.1) for _ in range(n_features)]
+        solver = self._resolve_solver(X.shape[1])
+        if solver == 'closed_form':
+            stats = self._normal_equations
+            if stats is None:
+                stats = self._normal_equations = {
+                    'n': 0, 'sum_x': np.zeros(X.shape[1]), 'sum_y': 0.0,
+                    'xtx': np.zeros((X.shape[1], X.shape[1])), 'xty': np.zeros(X.shape[1])
+                }
+            stats['n'] += len(X)
+            stats['sum_x'] += X.sum(axis=0)
+            stats['sum_y'] += float(y.sum())
+            stats['xtx'] += X.T @ X
+            stats['xty'] += X.T @ y
+            self._solve_normal_equations(stats)
+        else:
+            if self._rng is None:
+                self._rng = np.random.default_rng(self.seed)
+                self.weights = self._rng.uniform(-0.1, 0.1, X.shape[1])
+                self.bias = 0.0
+            self._sgd_epoch(X, y, self._rng, learning_rate)
+            self.n_epochs += 1
+        
+        self.solver_used = solver
+        return self
+    
+    def _solve_normal_equations(self, stats: Dict[str, Any]):
+        """Centered (ridge) solve from accumulated sufficient statistics"""
+        n = stats['n']
+        x_mean = stats['sum_x'] / n
+        y_mean = stats['sum_y'] / n
+        gram = stats['xtx'] - n * np.outer(x_mean, x_mean)
+        rhs = stats['xty'] - n * x_mean * y_mean
+        
+        if self.alpha > 0:
+            gram[np.diag_indices_from(gram)] += self.alpha
+            self.weights = np.linalg.solve(gram, rhs)
+        else:
+            self.weights = np.linalg.lstsq(gram, rhs, rcond=None)[0]
+        self.bias = float(y_mean - x_mean @ self.weights)
+    
+    def _fit_closed_form(self, X: np.ndarray, y: np.ndarray):
+        """Solve the (ridge) normal equations on centered data"""
+        x_mean = X.mean(axis=0)
+        y_mean = y.mean()
+        Xc = X - x_mean
+        yc = y - y_mean
+        
+        if self.alpha > 0:
+            gram = Xc.T @ Xc
+            gram[np.diag_indices_from(gram)] += self.alpha
+            self.weights = np.linalg.solve(gram, Xc.T @ yc)
+        else:
+            # Minimum-norm least squares; copes with collinear features
+            self.weights = np.linalg.lstsq(Xc, yc, rcond=None)[0]
+        
+        self.bias = float(y_mean - x_mean @ self.weights)
+        self.n_epochs = 0
+    
+    def _fit_sgd(self, X: np.ndarray, y: np.ndarray, learning_rate: float, epochs: int):
+        """Mini-batch gradient descent on the (ridge) mean squared error"""
+        if epochs < 1:
+            raise ValueError("epochs must be at least 1 for the SGD solver")
+        rng = np.random.default_rng(self.seed)
+        n_samples, n_features = X.shape
+        
+        self.weights = rng.uniform(-0.1, 0.1, n_features)
         self.bias = 0.0
         
-        # Gradient descent
+        best_loss = np.inf
+        epochs_without_improvement = 0
+        
         for epoch in range(epochs):
-            # Forward pass
-            predictions = []
-            for sample in X:
-                pred = self.bias + sum(w * x for w, x in zip(self.weights, sample))
-                predictions.append(pred)
+            self._sgd_epoch(X, y, rng, learning_rate)
             
-            # Calculate gradients
-            weight_gradients = [0.0] * n_features
-            bias_gradient = 0.0
+            # Full-data loss once per epoch
+            residual = X @ self.weights + self.bias - y
+            loss = residual @ residual / n_samples
+            if not np.isfinite(loss):
+                raise FloatingPointError(f"SGD diverged at epoch {epoch}; lower learning_rate")
             
-            for i, (sample, actual, pred) in enumerate(zip(X, y, predictions)):
-                error = pred - actual
-                
-                # Weight gradients
-                for j, feature_val in enumerate(sample):
-                    weight_gradients[j] += (2 / n_samples) * error * feature_val
-                
-                # Bias gradient
-                bias_gradient += (2 / n_samples) * error
+            if loss < best_loss * (1.0 - self.tol):
+                best_loss = loss
+                epochs_without_improvement = 0
+            else:
+                epochs_without_improvement += 1
             
-            # Update parameters
-            for j in range(n_features):
-                self.weights[j] -= learning_rate * weight_gradients[j]
-            self.bias -= learning_rate * bias_gradient
+            if loss < 1e-12 or epochs_without_improvement >= self.n_iter_no_change:
+                break
+        
+        self.n_epochs = epoch + 1
+    
+    def _sgd_epoch(self, X: np.ndarray, y: np.ndarray, rng: np.random.Generator, learning_rate: float):
+        """One shuffled pass of mini-batch updates"""
+        n_samples = len(X)
+        order = rng.permutation(n_samples)
+        for start in range(0, n_samples, self.batch_size):
+            batch = order[start:start + self.batch_size]
+            error = X[batch] @ self.weights + self.bias - y[batch]
             
-            # Optional: early stopping based on loss
-            if epoch % 100 == 0:
-                mse = sum((pred - actual) ** 2 for pred, actual in zip(predictions, y)) / n_samples
-                if mse < 1e-6:
-                    break
+            weight_gradient = (2.0 / len(batch)) * (X[batch].T @ error) + 2.0 * self.alpha * self.weights / n_samples
+            self.weights -= learning_rate * weight_gradient
+            self.bias -= learning_rate * 2.0 * error.mean()
     
     def predict(self, X: List[float]) -> float:
         """Predict single value"""
-        return self.bias + sum(w * x for w, x in zip(self.weights, X))
+        return float(np.asarray(X, dtype=np.float64) @ self.weights + self.bias)
     
-    def predict_batch(self, X: List[List[float]]) -> List[float]:
+    def predict_batch(self, X: List[List[float]]) -> np.ndarray:
         """Predict multiple values"""
-        return [self.predict(sample) for sample in X]
+        return np.asarray(X, dtype=np.float64) @ self.weights + self.bias
     
     def get_feature_importance(self) -> List[Tuple[int, float]]:
         """Get feature importance based on weight magnitudes"""
-        importance = [(i, abs(weight)) for i, weight in enumerate(self.weights)]
+        importance = [(i, float(abs(weight))) for i, weight in enumerate(self.weights)]
         return sorted(importance, key=lambda x: x[1], reverse=True)
 
+def _squared_distances(X: np.ndarray, centroids: np.ndarray, x_squared: Optional[np.ndarray] = None) -> np.ndarray:
+    """Squared Euclidean distances (samples x centroids) via ||x||^2 - 2 x.c + ||c||^2"""
+    if x_squared is None:
+        x_squared = (X * X).sum(axis=1)
+    distances = x_squared[:, None] - 2.0 * (X @ centroids.T) + (centroids * centroids).sum(axis=1)
+    return np.maximum(distances, 0.0)
+
+def _cluster_sums(X: np.ndarray, labels: np.ndarray, k: int) -> np.ndarray:
+    """Per-cluster sums of the points (k x features) via a one-hot matrix product"""
+    indicator = np.zeros((len(X), k))
+    indicator[np.arange(len(X)), labels] = 1.0
+    return indicator.T @ X
+
+def _kmeans_plus_plus(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding: each new centroid is drawn proportionally to its squared distance"""
+    centroids = np.empty((k, X.shape[1]))
+    centroids[0] = X[rng.integers(len(X))]
+    closest = _squared_distances(X, centroids[:1]).ravel()
+    
+    for i in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(X), p=closest / total) if total > 0 else rng.integers(len(X))
+        centroids[i] = X[index]
+        closest = np.minimum(closest, _squared_distances(X, centroids[i:i + 1]).ravel())
+    
+    return centroids
+
 class ClusteringAnalyzer:
-    """K-means style clustering for pattern discovery"""
+    """K-means clustering for pattern discovery (k-means++ seeding, restarts, optional mini-batch)"""
     
-    def __init__(self, k: int = 5):
+    def __init__(self, k: int = 5, n_init: int = 4, algorithm: str = 'lloyd', batch_size: int = 1024,
+                 seed: Optional[int] = None, backend: str = BACKEND_THREAD, max_workers: Optional[int] = None):
+        """
+        Args:
+            k: Number of clusters
+            n_init: Independent restarts; the one with the lowest inertia is kept
+            algorithm: 'lloyd' (full batch) or 'minibatch' for large corpora
+            batch_size: Samples per mini-batch update
+            seed: Seed for reproducible seeding/sampling across all restarts
+            backend: Executor backend for running restarts in parallel
+            max_workers: Worker count (defaults to the CPU count)
+        """
+        if algorithm not in ('lloyd', 'minibatch'):
+            raise ValueError(f"Unknown k-means algorithm: {algorithm}")
+        
         self.k = k
-        self.centroids = []
+        self.n_init = n_init
+        self.algorithm = algorithm
+        self.batch_size = batch_size
+        self.seed = seed
+        self.backend = backend
+        self.max_workers = max_workers
+        self.centroids = np.zeros((0, 0))
         self.labels = []
+        self.inertia = 0.0
+        self.n_iter = 0
         self.feature_names = []
+        # Running state for partial_fit
+        self._seen = None
+        self._rng = None
     
-    def _distance(self, point1: List[float], point2: List[float]) -> float:
-        """Calculate Euclidean distance"""
-        return sqrt(sum((a - b) ** 2 for a, b in zip(point1, point2)))
-    
-    def fit(self, X: List[List[float]], max_iterations: int = 100):
+    def fit(self, X: List[List[float]], max_iterations: int = 100, tol: float = 1e-6):
         """Fit K-means clustering"""
+        X = np.asarray(X, dtype=np.float64)
         if len(X) < self.k:
             self.k = len(X)
+        if not self.k:
+            return self
         
-        n_features = len(X[0]) if X else 0
-        
-        # Initialize centroids randomly
-        self.centroids = []
-        for _ in range(self.k):
-            centroid = [random.uniform(min(X[i][j] for i in range(len(X))), 
-                                     max(X[i][j] for i in range(len(X)))) 
-                       for j in range(n_features)]
-            self.centroids.append(centroid)
-        
-        for iteration in range(max_iterations):
-            # Assign points to clusters
-            new_labels = []
-            for point in X:
-                distances = [self._distance(point, centroid) for centroid in self.centroids]
-                cluster = distances.index(min(distances))
-                new_labels.append(cluster)
-            
-            # Check for convergence
-            if iteration > 0 and new_labels == self.labels:
+        # One independent random stream per restart, all derived from the seed
+        seeds = np.random.SeedSequence(self.seed).spawn(self.n_init)
+        executor = ParallelExecutor(backend=self.backend, max_workers=self.max_workers)
+        runs = executor.map(partial(self._fit_once, X, max_iterations, tol), seeds)
+        
+        centroids, labels, self.inertia, self.n_iter = min(runs, key=lambda run: run[2])
+        self.centroids = centroids
+        self.labels = labels.tolist()
+        return self
+    
+    def _fit_once(self, X: np.ndarray, max_iterations: int, tol: float,
+                  seed_sequence: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray, float, int]:
+        """One restart: (centroids, labels, inertia, iterations)"""
+        rng = np.random.default_rng(seed_sequence)
+        centroids = _kmeans_plus_plus(X, self.k, rng)
+        
+        if self.algorithm == 'minibatch':
+            centroids, n_iter = self._minibatch_iterations(X, centroids, rng, max_iterations, tol)
+        else:
+            centroids, n_iter = self._lloyd_iterations(X, centroids, max_iterations, tol)
+        
+        distances = _squared_distances(X, centroids)
+        labels = distances.argmin(axis=1)
+        inertia = float(distances[np.arange(len(X)), labels].sum())
+        return centroids, labels, inertia, n_iter
+    
+    def _lloyd_iterations(self, X: np.ndarray, centroids: np.ndarray,
+                          max_iterations: int, tol: float) -> Tuple[np.ndarray, int]:
+        """Full-batch assignment/update steps until labels or centroids stop moving"""
+        labels = None
+        iteration = 0
+        x_squared = (X * X).sum(axis=1)
+        
+        for iteration in range(1, max_iterations + 1):
+            distances = _squared_distances(X, centroids, x_squared)
+            new_labels = distances.argmin(axis=1)
+            if labels is not None and np.array_equal(new_labels, labels):
                 break
+            labels = new_labels
             
-            self.labels = new_labels
+            counts = np.bincount(labels, minlength=self.k)
+            sums = _cluster_sums(X, labels, self.k)
+            new_centroids = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids)
+            
+            # Re-seed empty clusters with the points farthest from their centroid
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                farthest = np.argsort(-distances[np.arange(len(X)), labels])[:len(empty)]
+                new_centroids[empty] = X[farthest]
+            
+            shift = ((new_centroids - centroids) ** 2).sum()
+            centroids = new_centroids
+            if shift <= tol:
+                break
+        
+        return centroids, iteration
+    
+    def _minibatch_iterations(self, X: np.ndarray, centroids: np.ndarray, rng: np.random.Generator,
+                              max_iterations: int, tol: float) -> Tuple[np.ndarray, int]:
+        """Mini-batch updates with per-centroid learning rates (1 / points seen)"""
+        seen = np.zeros(self.k)
+        batch_size = min(self.batch_size, len(X))
+        iteration = 0
+        
+        for iteration in range(1, max_iterations + 1):
+            batch = X[rng.choice(len(X), batch_size, replace=False)]
+            previous = centroids.copy()
+            self._minibatch_step(batch, centroids, seen)
             
-            # Update centroids
-            for cluster_idx in range(self.k):
-                cluster_points = [X[i] for i, label in enumerate(self.labels) if label == cluster_idx]
-                
-                if cluster_points:
-                    new_centroid = []
-                    for feature_idx in range(n_features):
-                        feature_values = [point[feature_idx] for point in cluster_points]
-                        new_centroid.append(statistics.mean(feature_values))
-                    self.centroids[cluster_idx] = new_centroid
+            if ((centroids - previous) ** 2).sum() <= tol:
+                break
+        
+        return centroids, iteration
+    
+    def _minibatch_step(self, batch: np.ndarray, centroids: np.ndarray, seen: np.ndarray):
+        """Move centroids (in place) towards the batch points assigned to them"""
+        labels = _squared_distances(batch, centroids).argmin(axis=1)
+        
+        counts = np.bincount(labels, minlength=len(centroids))
+        sums = _cluster_sums(batch, labels, len(centroids))
+        
+        seen += counts
+        updated = counts > 0
+        # c <- c + (sum(batch points) - count * c) / seen  (running mean of points assigned so far)
+        centroids[updated] += (sums[updated] - counts[updated, None] * centroids[updated]) / seen[updated, None]
+    
+    def partial_fit(self, X: List[List[float]]):
+        """
+        Mini-batch update with another chunk of points
+        
+        The first chunk seeds the centroids with k-means++; every chunk is then
+        consumed in batch_size slices. Per-point labels are not kept.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return self
+        
+        if self._seen is None:
+            self._rng = np.random.default_rng(self.seed)
+            self.k = min(self.k, len(X))
+            self.centroids = _kmeans_plus_plus(X, self.k, self._rng)
+            self._seen = np.zeros(self.k)
+        
+        order = self._rng.permutation(len(X))
+        for start in range(0, len(X), self.batch_size):
+            self._minibatch_step(X[order[start:start + self.batch_size]], self.centroids, self._seen)
+        self.n_iter += 1
+        return self
     
     def predict(self, X: List[float]) -> int:
         """Predict cluster for a single point"""
-        distances = [self._distance(X, centroid) for centroid in self.centroids]
-        return distances.index(min(distances))
+        return int(self.predict_batch([X])[0])
+    
+    def predict_batch(self, X: List[List[float]]) -> np.ndarray:
+        """Predict clusters for a matrix of points"""
+        return _squared_distances(np.asarray(X, dtype=np.float64), self.centroids).argmin(axis=1)
     
     def get_cluster_characteristics(self, X: List[List[float]], feature_names: List[str]) -> Dict[int, Dict[str, float]]:
         """Analyze characteristics of each cluster"""
+        X = np.asarray(X, dtype=np.float64)
+        labels = np.asarray(self.labels)
         characteristics = {}
         
         for cluster_idx in range(self.k):
-            cluster_points = [X[i] for i, label in enumerate(self.labels) if label == cluster_idx]
+            cluster_points = X[labels == cluster_idx]
             
-            if not cluster_points:
+            if not len(cluster_points):
                 continue
             
-            cluster_chars = {}
-            for feature_idx, feature_name in enumerate(feature_names):
-                feature_values = [point[feature_idx] for point in cluster_points]
-                cluster_chars[feature_name] = {
-                    'mean': statistics.mean(feature_values),
-                    'median': statistics.median(feature_values),
-                    'std': statistics.stdev(feature_values) if len(feature_values) > 1 else 0
-                }
+            means = cluster_points.mean(axis=0)
+            medians = np.median(cluster_points, axis=0)
+            stds = cluster_points.std(axis=0, ddof=1) if len(cluster_points) > 1 else np.zeros(X.shape[1])
             
-            characteristics[cluster_idx] = cluster_chars
+            characteristics[cluster_idx] = {
+                feature_name: {
+                    'mean': float(means[feature_idx]),
+                    'median': float(medians[feature_idx]),
+                    'std': float(stds[feature_idx])
+                }
+                for feature_idx, feature_name in enumerate(feature_names)
+            }
         
         return characteristics
 
+def k_fold_splits(n_samples: int, n_folds: int = 10, seed: Optional[int] = None,
+                  stratify: Optional[List[str]] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    (train, test) index arrays for k-fold cross-validation
+    
+    With stratify, each label's samples are shuffled and dealt round-robin across
+    folds so every fold keeps roughly the overall label mix.
+    """
+    rng = np.random.default_rng(seed)
+    n_folds = max(2, min(n_folds, n_samples))
+    fold_of = np.empty(n_samples, dtype=np.int64)
+    
+    if stratify is None:
+        fold_of[rng.permutation(n_samples)] = np.arange(n_samples) % n_folds
+    else:
+        _, labels = np.unique(np.asarray(stratify, dtype=object), return_inverse=True)
+        offset = 0
+        for label in range(labels.max() + 1):
+            members = rng.permutation(np.flatnonzero(labels == label))
+            fold_of[members] = (np.arange(len(members)) + offset) % n_folds
+            offset += len(members)
+    
+    return [(np.flatnonzero(fold_of != fold), np.flatnonzero(fold_of == fold)) for fold in range(n_folds)]
+
+def repeated_holdout_splits(n_samples: int, repeats: int = 10, test_size: float = 0.2,
+                            seed: Optional[int] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """(train, test) index arrays for repeated random holdout"""
+    rng = np.random.default_rng(seed)
+    n_test = min(max(1, int(round(n_samples * test_size))), n_samples - 1)
+    splits = []
+    for _ in range(repeats):
+        order = rng.permutation(n_samples)
+        splits.append((np.sort(order[n_test:]), np.sort(order[:n_test])))
+    return splits
+
+def _evaluate_split(X: np.ndarray, complexity: np.ndarray, categories: np.ndarray, k: int,
+                    seed: Optional[int], split: Tuple[np.ndarray, np.ndarray]) -> Dict[str, float]:
+    """Fit all three models on one training split and score them on its test split"""
+    train, test = split
+    start = time.perf_counter()
+    metrics = {}
+    
+    # Complexity regression: held-out R^2 and MSE
+    regressor = LinearRegressor(seed=seed).fit(X[train], complexity[train])
+    residual = regressor.predict_batch(X[test]) - complexity[test]
+    total = ((complexity[test] - complexity[test].mean()) ** 2).sum()
+    metrics['complexity_mse'] = float((residual ** 2).mean())
+    metrics['complexity_r_squared'] = float(1 - (residual ** 2).sum() / total) if total > 0 else 0.0
+    
+    # Category classification: held-out accuracy
+    classifier = NaiveBayesClassifier().fit(X[train], categories[train].tolist())
+    predictions = np.asarray(classifier.predict_batch(X[test]), dtype=object)
+    metrics['category_accuracy'] = float((predictions == categories[test]).mean())
+    
+    # Clustering: mean squared distance of held-out points to the nearest centroid
+    clusterer = ClusteringAnalyzer(k=min(k, len(train)), seed=seed, backend=BACKEND_SERIAL).fit(X[train])
+    metrics['clustering_inertia'] = float(_squared_distances(X[test], clusterer.centroids).min(axis=1).mean())
+    
+    metrics['fit_seconds'] = time.perf_counter() - start
+    return metrics
+
+class ModelEvaluator:
+    """k-fold / repeated-holdout evaluation of the complexity, category and clustering models"""
+    
+    def __init__(self, backend: str = BACKEND_PROCESS, max_workers: Optional[int] = None,
+                 k: int = 5, seed: Optional[int] = None):
+        """
+        Args:
+            backend: Executor backend for running splits in parallel
+            max_workers: Worker count (defaults to the CPU count)
+            k: Cluster count for the clustering model
+            seed: Seed for the splits and the models
+        """
+        self.backend = backend
+        self.max_workers = max_workers
+        self.k = k
+        self.seed = seed
+    
+    def cross_validate(self, X: List[List[float]], complexity: List[float], categories: List[str],
+                       n_folds: int = 10) -> Dict[str, Any]:
+        """Stratified (by category) k-fold cross-validation"""
+        splits = k_fold_splits(len(complexity), n_folds, self.seed, stratify=categories)
+        return self._evaluate(X, complexity, categories, splits, f"{len(splits)}-fold")
+    
+    def repeated_holdout(self, X: List[List[float]], complexity: List[float], categories: List[str],
+                         repeats: int = 10, test_size: float = 0.2) -> Dict[str, Any]:
+        """Repeated random train/test holdout"""
+        splits = repeated_holdout_splits(len(complexity), repeats, test_size, self.seed)
+        return self._evaluate(X, complexity, categories, splits, f"{repeats}x holdout ({test_size:.0%} test)")
+    
+    def _evaluate(self, X, complexity, categories, splits, scheme: str) -> Dict[str, Any]:
+        """Run every split and summarize each metric"""
+        start = time.perf_counter()
+        
+        # Matrices are bound once and shipped to each worker once, not per split
+        evaluate = partial(_evaluate_split, np.asarray(X, dtype=np.float64),
+                           np.asarray(complexity, dtype=np.float64),
+                           np.asarray(categories, dtype=object), self.k, self.seed)
+        executor = ParallelExecutor(backend=self.backend, max_workers=self.max_workers, chunk_size=1)
+        split_metrics = executor.map(evaluate, splits)
+        
+        summary = {}
+        for name in split_metrics[0]:
+            if name == 'fit_seconds':
+                continue
+            values = np.asarray([metrics[name] for metrics in split_metrics])
+            summary[name] = {
+                'mean': float(values.mean()),
+                'variance': float(values.var(ddof=1)) if len(values) > 1 else 0.0,
+                'min': float(values.min()),
+                'max': float(values.max())
+            }
+        
+        return {
+            'scheme': scheme,
+            'n_splits': len(splits),
+            'metrics': summary,
+            'compute_seconds': sum(metrics['fit_seconds'] for metrics in split_metrics),
+            'wall_seconds': time.perf_counter() - start
+        }
+
+@dataclass
+class ComponentChunk:
+    """One chunk of the component-level dataset"""
+    features: np.ndarray  # (components x features) raw float32
+    targets: np.ndarray  # Complexity target per component
+    labels: List[str]  # Template category per component
+    names: List[str]  # template_name:file_path
+
+class ComponentDataset:
+    """Re-iterable stream of per-file component metrics, served as fixed-size feature chunks"""
+    
+    def __init__(self, source: Union[str, Path, Callable[[], Iterable[Any]]], chunk_size: int = 50000,
+                 target_key: str = 'complexity_score', feature_extractor: Optional[FeatureExtractor] = None):
+        """
+        Args:
+            source: Component record file written by an analyzer's components_file option,
+                or a zero-argument callable returning records or metrics objects (called
+                once per pass, so the data never has to be held in memory)
+            chunk_size: Components per feature matrix
+            target_key: Record field used as the regression target
+            feature_extractor: Feature layout (defaults to FeatureExtractor())
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.target_key = target_key
+        self.feature_extractor = feature_extractor or FeatureExtractor()
+    
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """One pass over the source as plain records with unified field names"""
+        items = self.source() if callable(self.source) else iter_component_records(self.source)
+        for item in items:
+            record = dict(item) if isinstance(item, dict) else metrics_to_record(item, getattr(item, 'template_name', ''))
+            for alias, name in _COMPONENT_FIELD_ALIASES.items():
+                if alias in record and name not in record:
+                    record[name] = record[alias]
+            yield record
+    
+    def __iter__(self) -> Iterator[ComponentChunk]:
+        chunk = []
+        for record in self.records():
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                yield self._to_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield self._to_chunk(chunk)
+    
+    def _to_chunk(self, records: List[Dict[str, Any]]) -> ComponentChunk:
+        """Feature matrix, targets and labels for a list of records"""
+        targets = np.fromiter((record.get(self.target_key, record.get('cyclomatic_complexity', 0)) or 0
+                               for record in records), dtype=np.float64, count=len(records))
+        template_names = [record.get('template_name', '') for record in records]
+        return ComponentChunk(
+            features=self.feature_extractor.build_feature_matrix(records),
+            targets=targets,
+            labels=[template_category(name) for name in template_names],
+            names=[f"{name}:{record.get('file_path', '')}" for name, record in zip(template_names, records)]
+        )
+
 class MLAnalysisEngine:
     """Main engine for ML analysis of Base44 components"""
     
+    MODEL_FORMAT_VERSION = 1
+    
     def __init__(self):
         self.feature_extractor = FeatureExtractor()
         self.complexity_predictor = LinearRegressor()
         self.category_classifier = NaiveBayesClassifier()
         self.pattern_clusterer = ClusteringAnalyzer()
         self.normalization_params = {}
+        self.loaded_model_file = None
+        self.similarity_index: Optional[SimilarityIndex] = None
     
     def load_data(self, analysis_results_file: str) -> Tuple[List[Dict], List[str]]:
         """Load component analysis data"""
@@ -459,64 +1045,75 @@ class MLAnalysisEngine:
         
         return components, template_names
     
-    def prepare_features(self, components: List[Dict]) -> Tuple[List[List[float]], List[MLFeatures]]:
-        """Extract and normalize features from components"""
-        feature_objects = []
-        
-        for component in components:
-            # Convert template-level data to component-like format for feature extraction
-            component_data = {
-                'total_lines': component.get('total_lines', 0),
-                'code_lines': component.get('total_lines', 0) * 0.8,  # Estimate
-                'jsx_lines': component.get('total_jsx_elements', 0) * 2,  # Estimate
-                'comment_lines': component.get('total_lines', 0) * 0.1,  # Estimate
-                'cyclomatic_complexity': component.get('average_cyclomatic_complexity', 0),
-                'nesting_depth': 3,  # Default estimate
-                'jsx_elements_count': component.get('total_jsx_elements', 0),
-                'jsx_conditional_rendering': component.get('total_jsx_elements', 0) * 0.2,  # Estimate
-                'total_hooks': component.get('total_hooks', 0),
-                'state_variables': component.get('components_with_state', 0),
-                'effect_hooks': component.get('components_with_effects', 0),
-                'custom_hooks': [],
-                'total_imports': component.get('total_files', 0) * 5,  # Estimate
-                'base44_imports': [] if component.get('base44_integration', 0) == 0 else ['base44'],
-                'third_party_imports': ['react', 'radix'],  # Common ones
-                'local_imports': ['./component'],
-                'custom_components': set(['CustomComponent'] * int(component.get('functional_components', 0) * 0.3)),
-                'html_elements': set(['div', 'span']),
-                'jsx_attributes_count': component.get('total_jsx_elements', 0) * 3,  # Estimate
-                'api_calls': component.get('api_calls_total', 0),
-                'base44_api_usage': component.get('base44_api_methods', {}),
-                'fetch_calls': component.get('api_calls_total', 0) * 0.5,  # Estimate
-                'console_logs': component.get('console_logs_total', 0),
-                'todo_comments': component.get('todo_comments_total', 0),
-                'try_catch_blocks': 1,  # Estimate
-                'magic_numbers': 5,  # Estimate
-                'function_count': component.get('functional_components', 0),
-                'arrow_functions': component.get('functional_components', 0) * 0.7,  # Estimate
-                'async_functions': component.get('api_calls_total', 0) * 0.3,  # Estimate
-                'object_literals': component.get('total_files', 0) * 2,  # Estimate
-                'array_literals': component.get('total_files', 0),  # Estimate
-                'destructuring_patterns': component.get('total_hooks', 0) * 0.5,  # Estimate
-                'memo_usage': 0,  # Default
-                'usecallback_usage': 0,  # Default
-                'usememo_usage': 0,  # Default
-                'inline_styles': component.get('total_jsx_elements', 0) * 0.1,  # Estimate
-                'css_classes': component.get('total_jsx_elements', 0) * 0.8,  # Estimate
-                'styled_components': 0,  # Default
-            }
-            
-            features = self.feature_extractor.extract_features_from_component(component_data)
-            feature_objects.append(features)
+    def prepare_features(self, components: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract and normalize features from template-level records
+        
+        Returns:
+            (normalized float32 matrix, raw float32 matrix)
+        """
+        raw_features = self.build_template_matrix(components)
+        normalized, self.normalization_params = self.feature_extractor.normalize_features(raw_features)
+        
+        return normalized, raw_features
+    
+    def build_template_matrix(self, components: List[Dict]) -> np.ndarray:
+        """Raw float32 feature matrix for template-level records"""
+        n = len(components)
+        
+        def column(key: str) -> np.ndarray:
+            return _record_column(components, key)
         
-        # Convert to vectors
-        feature_vectors = [self.feature_extractor.features_to_vector(features) 
-                          for features in feature_objects]
+        total_lines = column('total_lines')
+        jsx_elements = column('total_jsx_elements')
+        hooks = column('total_hooks')
+        total_files = column('total_files')
+        api_calls = column('api_calls_total')
+        functional_components = column('functional_components')
         
-        # Normalize features
-        normalized_vectors, self.normalization_params = self.feature_extractor.normalize_features(feature_vectors)
+        def constant(value: float) -> np.ndarray:
+            return np.full(n, value, dtype=np.float64)
         
-        return normalized_vectors, feature_objects
+        # Template aggregates mapped onto component-level keys (estimates where not measured)
+        component_columns = {
+            'total_lines': total_lines,
+            'code_lines': total_lines * 0.8,  # Estimate
+            'jsx_lines': jsx_elements * 2,  # Estimate
+            'comment_lines': total_lines * 0.1,  # Estimate
+            'cyclomatic_complexity': column('average_cyclomatic_complexity'),
+            'nesting_depth': constant(3),  # Default estimate
+            'jsx_elements_count': jsx_elements,
+            'jsx_conditional_rendering': jsx_elements * 0.2,  # Estimate
+            'total_hooks': hooks,
+            'state_variables': column('components_with_state'),
+            'effect_hooks': column('components_with_effects'),
+            'custom_hooks': constant(0),
+            'total_imports': total_files * 5,  # Estimate
+            'base44_imports': (column('base44_integration') != 0).astype(np.float64),
+            'third_party_imports': constant(2),  # react, radix
+            'local_imports': constant(1),
+            'custom_components': (np.floor(functional_components * 0.3) > 0).astype(np.float64),
+            'html_elements': constant(2),  # div, span
+            'jsx_attributes_count': jsx_elements * 3,  # Estimate
+            'api_calls': api_calls,
+            'base44_api_usage': np.fromiter((sum(c.get('base44_api_methods', {}).values()) for c in components),
+                                            dtype=np.float64, count=n),
+            'fetch_calls': api_calls * 0.5,  # Estimate
+            'console_logs': column('console_logs_total'),
+            'todo_comments': column('todo_comments_total'),
+            'try_catch_blocks': constant(1),  # Estimate
+            'magic_numbers': constant(5),  # Estimate
+            'function_count': functional_components,
+            'arrow_functions': functional_components * 0.7,  # Estimate
+            'async_functions': api_calls * 0.3,  # Estimate
+            'object_literals': total_files * 2,  # Estimate
+            'array_literals': total_files,  # Estimate
+            'destructuring_patterns': hooks * 0.5,  # Estimate
+            'inline_styles': jsx_elements * 0.1,  # Estimate
+            'css_classes': jsx_elements * 0.8,  # Estimate
+        }
+        
+        return self.feature_extractor.matrix_from_columns(component_columns, n)
     
     def train_complexity_predictor(self, X: List[List[float]], templates: List[Dict]):
         """Train complexity prediction model"""
@@ -543,27 +1140,12 @@ class MLAnalysisEngine:
     def train_category_classifier(self, X: List[List[float]], template_names: List[str]):
         """Train category classification model"""
         # Extract categories from template names (simple heuristic)
-        categories = []
-        for name in template_names:
-            if 'ai' in name.lower():
-                categories.append('AI/ML')
-            elif 'crypto' in name.lower():
-                categories.append('Crypto/Finance')
-            elif 'edu' in name.lower() or 'learn' in name.lower():
-                categories.append('Education')
-            elif 'fit' in name.lower() or 'health' in name.lower():
-                categories.append('Health/Fitness')
-            elif 'task' in name.lower() or 'flow' in name.lower() or 'manage' in name.lower():
-                categories.append('Productivity')
-            elif 'market' in name.lower() or 'shop' in name.lower() or 'commerce' in name.lower():
-                categories.append('E-commerce')
-            else:
-                categories.append('General')
+        categories = [template_category(name) for name in template_names]
         
         self.category_classifier.fit(X, categories)
         
         # Calculate accuracy
-        predictions = [self.category_classifier.predict(x) for x in X]
+        predictions = self.category_classifier.predict_batch(X)
         accuracy = sum(1 for actual, pred in zip(categories, predictions) if actual == pred) / len(categories)
         
         return {
@@ -572,9 +1154,27 @@ class MLAnalysisEngine:
             'category_distribution': Counter(categories)
         }
     
-    def discover_patterns(self, X: List[List[float]], k: int = 5):
-        """Discover patterns using clustering"""
-        self.pattern_clusterer = ClusteringAnalyzer(k=k)
+    def evaluate_models(self, X: List[List[float]], templates: List[Dict], template_names: List[str],
+                        n_folds: int = 10, repeats: int = 0, seed: Optional[int] = None,
+                        backend: str = BACKEND_PROCESS) -> Dict[str, Any]:
+        """
+        Out-of-sample metrics for all three models
+        
+        Returns k-fold results under 'k_fold' and, when repeats > 0, repeated
+        holdout results under 'repeated_holdout'.
+        """
+        complexity = [template.get('average_complexity', 0) for template in templates]
+        categories = [template_category(name) for name in template_names]
+        evaluator = ModelEvaluator(backend=backend, k=min(5, len(templates)), seed=seed)
+        
+        results = {'k_fold': evaluator.cross_validate(X, complexity, categories, n_folds)}
+        if repeats:
+            results['repeated_holdout'] = evaluator.repeated_holdout(X, complexity, categories, repeats)
+        return results
+    
+    def discover_patterns(self, X: List[List[float]], k: int = 5, seed: Optional[int] = None):
+        """Discover patterns using clustering (reproducible when seed is given)"""
+        self.pattern_clusterer = ClusteringAnalyzer(k=k, seed=seed)
         self.pattern_clusterer.fit(X)
         
         # Analyze cluster characteristics
@@ -587,8 +1187,90 @@ class MLAnalysisEngine:
             'cluster_sizes': Counter(self.pattern_clusterer.labels)
         }
     
-    def run_complete_analysis(self, analysis_results_file: str, output_file: str):
-        """Run complete ML analysis pipeline"""
+    def train_on_components(self, dataset: ComponentDataset, k: int = 5, seed: Optional[int] = None,
+                            model_file: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Train all models on component-level data, one chunk at a time
+        
+        Three streaming passes: min/max for normalization, partial_fit of the
+        regressor, classifier and (mini-batch) clusterer, then evaluation.
+        Only one chunk is in memory at a time.
+        """
+        self.complexity_predictor = LinearRegressor(seed=seed)
+        self.category_classifier = NaiveBayesClassifier()
+        self.pattern_clusterer = ClusteringAnalyzer(k=k, algorithm='minibatch', seed=seed)
+        
+        # Pass 1: normalization parameters
+        mins, maxs = None, None
+        n_components = 0
+        for chunk in dataset:
+            params = self.feature_extractor.fit_normalization(chunk.features)
+            mins = params['min'] if mins is None else np.minimum(mins, params['min'])
+            maxs = params['max'] if maxs is None else np.maximum(maxs, params['max'])
+            n_components += len(chunk.targets)
+        
+        if not n_components:
+            logger.warning("No component records to train on")
+            return {}
+        self.normalization_params = {'min': mins, 'max': maxs}
+        
+        # Pass 2: incremental training
+        n_chunks = 0
+        for chunk in dataset:
+            X = self.feature_extractor.apply_normalization(chunk.features, self.normalization_params)
+            self.complexity_predictor.partial_fit(X, chunk.targets)
+            self.category_classifier.partial_fit(X, chunk.labels)
+            self.pattern_clusterer.partial_fit(X)
+            n_chunks += 1
+        
+        # Pass 3: streaming evaluation
+        target_sum, target_square_sum, squared_error, correct = 0.0, 0.0, 0.0, 0
+        category_distribution, cluster_sizes = Counter(), Counter()
+        for chunk in dataset:
+            X = self.feature_extractor.apply_normalization(chunk.features, self.normalization_params)
+            residual = self.complexity_predictor.predict_batch(X) - chunk.targets
+            squared_error += float(residual @ residual)
+            target_sum += float(chunk.targets.sum())
+            target_square_sum += float(chunk.targets @ chunk.targets)
+            
+            predictions = self.category_classifier.predict_batch(X)
+            correct += sum(1 for actual, pred in zip(chunk.labels, predictions) if actual == pred)
+            category_distribution.update(chunk.labels)
+            cluster_sizes.update(self.pattern_clusterer.predict_batch(X).tolist())
+        
+        total_variance = target_square_sum - target_sum ** 2 / n_components
+        results = {
+            'analysis_metadata': {
+                'n_components': n_components,
+                'n_chunks': n_chunks,
+                'n_features': len(self.feature_extractor.feature_names),
+                'feature_names': self.feature_extractor.feature_names
+            },
+            'complexity_prediction': {
+                'r_squared': 1 - squared_error / total_variance if total_variance > 0 else 0,
+                'mse': squared_error / n_components,
+                'feature_importance': self.complexity_predictor.get_feature_importance()
+            },
+            'category_classification': {
+                'accuracy': correct / n_components,
+                'categories': list(category_distribution),
+                'category_distribution': category_distribution
+            },
+            'pattern_discovery': {
+                'cluster_sizes': cluster_sizes
+            }
+        }
+        
+        if model_file:
+            self.save_models(model_file)
+            results['analysis_metadata']['model_file'] = model_file
+        
+        logger.info(f"Trained on {n_components} components in {n_chunks} chunks")
+        return results
+    
+    def run_complete_analysis(self, analysis_results_file: str, output_file: str,
+                              model_file: Optional[str] = None):
+        """Run complete ML analysis pipeline (trained models are saved to model_file, default <output>.models.npz)"""
         logger.info("Starting ML analysis pipeline...")
         
         # Load data
@@ -600,7 +1282,7 @@ class MLAnalysisEngine:
             return
         
         # Prepare features
-        X, feature_objects = self.prepare_features(components)
+        X, raw_features = self.prepare_features(components)
         logger.info(f"Extracted {len(self.feature_extractor.feature_names)} features")
         
         # Train models
@@ -627,29 +1309,160 @@ class MLAnalysisEngine:
         pattern_results = self.discover_patterns(X, k=min(5, len(components)))
         results['pattern_discovery'] = pattern_results
         
+        # Out-of-sample evaluation (the metrics above are measured on the training data)
+        logger.info("Cross-validating models...")
+        results['cross_validation'] = self.evaluate_models(X, components, template_names,
+                                                           n_folds=min(10, len(components)))
+        
         # Template-specific predictions
-        template_predictions = []
-        for i, (template_name, x) in enumerate(zip(template_names, X)):
-            pred_complexity = self.complexity_predictor.predict(x)
-            pred_category = self.category_classifier.predict(x)
-            pred_cluster = self.pattern_clusterer.predict(x)
-            
-            template_predictions.append({
-                'template_name': template_name,
-                'predicted_complexity': pred_complexity,
-                'predicted_category': pred_category,
-                'pattern_cluster': pred_cluster,
-                'actual_complexity': components[i].get('average_complexity', 0)
-            })
+        template_predictions = self._score_matrix(X, template_names)
+        for prediction, component in zip(template_predictions, components):
+            prediction['actual_complexity'] = component.get('average_complexity', 0)
         
         results['template_predictions'] = template_predictions
         
+        # Save trained models for predict_apps()
+        if model_file is None:
+            model_file = str(Path(output_file).with_suffix('.models.npz'))
+        self.save_models(model_file)
+        results['analysis_metadata']['model_file'] = model_file
+        
+        # Nearest-neighbor index over the same normalized vectors for find_similar()
+        index_file = str(Path(output_file).with_suffix('.index.npz'))
+        self.build_similarity_index(X, template_names).save(index_file)
+        results['analysis_metadata']['similarity_index_file'] = index_file
+        
         # Save results
         with open(output_file, 'w') as f:
             json.dump(results, f, indent=2, default=str)
         
         logger.info(f"ML analysis completed. Results saved to {output_file}")
         return results
+    
+    def build_similarity_index(self, X: np.ndarray, names: List[str], mode: str = MODE_EXACT,
+                               seed: Optional[int] = None) -> SimilarityIndex:
+        """Index normalized feature vectors by name (cosine similarity)"""
+        self.similarity_index = SimilarityIndex(mode=mode, seed=seed).add(names, X)
+        return self.similarity_index
+    
+    def find_similar(self, app_name: str, k: int = 10,
+                     index_file: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Apps whose feature vectors are closest to app_name's
+        
+        Args:
+            app_name: Name of an indexed template or app
+            k: Number of neighbors
+            index_file: Saved index to load (otherwise the one built by the last analysis)
+        """
+        if index_file is not None:
+            self.similarity_index = SimilarityIndex.load(index_file)
+        if self.similarity_index is None:
+            raise RuntimeError("No similarity index; run the analysis or pass index_file")
+        
+        return [{'name': name, 'similarity': similarity}
+                for name, similarity in self.similarity_index.find_similar(app_name, k)]
+    
+    def _score_matrix(self, X: np.ndarray, names: List[str]) -> List[Dict[str, Any]]:
+        """Run all three models over a normalized feature matrix"""
+        complexities = self.complexity_predictor.predict_batch(X)
+        probabilities = self.category_classifier.predict_proba_batch(X)
+        clusters = self.pattern_clusterer.predict_batch(X)
+        best = probabilities.argmax(axis=1)
+        
+        return [{
+            'template_name': name,
+            'predicted_complexity': float(complexities[i]),
+            'predicted_category': self.category_classifier.classes[best[i]],
+            'category_confidence': float(probabilities[i, best[i]]),
+            'pattern_cluster': int(clusters[i])
+        } for i, name in enumerate(names)]
+    
+    def save_models(self, model_file: str):
+        """Save trained models and normalization parameters to a versioned .npz file"""
+        Path(model_file).parent.mkdir(parents=True, exist_ok=True)
+        classifier = self.category_classifier
+        
+        with open(model_file, 'wb') as f:
+            np.savez_compressed(
+                f,
+                format_version=np.int32(self.MODEL_FORMAT_VERSION),
+                feature_names=np.asarray(self.feature_extractor.feature_names),
+                normalization_min=self.normalization_params['min'],
+                normalization_max=self.normalization_params['max'],
+                regressor_weights=np.asarray(self.complexity_predictor.weights, dtype=np.float64),
+                regressor_bias=np.float64(self.complexity_predictor.bias),
+                classifier_classes=np.asarray(classifier.classes, dtype=str),
+                classifier_log_priors=classifier.class_log_priors,
+                classifier_theta=classifier.theta,
+                classifier_var=classifier.var,
+                classifier_var_smoothing=np.float64(classifier.var_smoothing),
+                cluster_centroids=np.asarray(self.pattern_clusterer.centroids, dtype=np.float64)
+            )
+        
+        logger.info(f"Saved ML models to {model_file}")
+    
+    def load_models(self, model_file: str):
+        """Load models written by save_models (no retraining)"""
+        with np.load(model_file, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != self.MODEL_FORMAT_VERSION:
+                raise ValueError(f"Unsupported model format version {version} in {model_file}")
+            
+            feature_names = data['feature_names'].tolist()
+            if feature_names != self.feature_extractor.feature_names:
+                raise ValueError(f"Feature set in {model_file} does not match this FeatureExtractor")
+            
+            self.normalization_params = {'min': data['normalization_min'], 'max': data['normalization_max']}
+            
+            self.complexity_predictor.weights = data['regressor_weights']
+            self.complexity_predictor.bias = float(data['regressor_bias'])
+            
+            classifier = NaiveBayesClassifier(var_smoothing=float(data['classifier_var_smoothing']))
+            classifier.classes = data['classifier_classes'].tolist()
+            classifier.class_log_priors = data['classifier_log_priors']
+            classifier.theta = data['classifier_theta']
+            classifier.var = data['classifier_var']
+            self.category_classifier = classifier
+            
+            centroids = data['cluster_centroids']
+            self.pattern_clusterer = ClusteringAnalyzer(k=len(centroids))
+            self.pattern_clusterer.centroids = centroids
+        
+        self.loaded_model_file = model_file
+        logger.info(f"Loaded ML models from {model_file}")
+        return self
+    
+    def predict_apps(self, records: Dict[str, Dict], model_file: Optional[str] = None,
+                     level: str = 'template') -> List[Dict[str, Any]]:
+        """
+        Score new templates or components with saved models, without retraining
+        
+        Args:
+            records: name -> template summary (level='template') or component
+                analysis record (level='component')
+            model_file: Saved models; loaded once and reused by later calls
+            level: Record shape, 'template' or 'component'
+            
+        Returns:
+            One prediction dict per record, in input order
+        """
+        if model_file is not None and model_file != self.loaded_model_file:
+            self.load_models(model_file)
+        if not self.normalization_params:
+            raise RuntimeError("No trained models; run the analysis or pass model_file")
+        
+        names = list(records)
+        rows = [records[name] for name in names]
+        if level == 'template':
+            raw_features = self.build_template_matrix(rows)
+        elif level == 'component':
+            raw_features = self.feature_extractor.build_feature_matrix(rows)
+        else:
+            raise ValueError(f"Unknown record level: {level}")
+        
+        X = self.feature_extractor.apply_normalization(raw_features, self.normalization_params)
+        return self._score_matrix(X, names)
 
 
 def main():
@@ -12,6 +12,8 @@ from collections import defaultdict, Counter
 from datetime import datetime
 import logging
 
+from utils.ranking import spearman_rho
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -241,34 +243,7 @@ class CommunityCodeCorrelationModel:
         if len(x) != len(y) or len(x) < 3:
             return 0.0
         
-        # Rank the values
-        x_ranked = self._rank_values(x)
-        y_ranked = self._rank_values(y)
-        
-        # Calculate Spearman's rho
-        n = len(x)
-        d_squared_sum = sum((x_rank - y_rank) ** 2 for x_rank, y_rank in zip(x_ranked, y_ranked))
-        
-        if n > 1:
-            rho = 1 - (6 * d_squared_sum) / (n * (n ** 2 - 1))
-        else:
-            rho = 0
-        
-        return rho
-    
-    def _rank_values(self, values: List[float]) -> List[float]:
-        """Assign ranks to values, handling ties with average ranks"""
-        sorted_values = sorted(values)
-        ranks = []
-        
-        for value in values:
-            # Find all positions of this value
-            positions = [i for i, v in enumerate(sorted_values) if v == value]
-            # Calculate average rank (1-based)
-            avg_rank = sum(pos + 1 for pos in positions) / len(positions)
-            ranks.append(avg_rank)
-        
-        return ranks
+        return spearman_rho(x, y)
     
     def _generate_correlation_insights(self, correlations: Dict[str, float]) -> List[str]:
         """Generate insights from correlation analysis"""
@@ -0,0 +1,296 @@
+"""
+Similarity Index for Base44 Applications
+Nearest-neighbor search over app feature vectors (exact blocked matmul or random-projection LSH)
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODE_EXACT = "exact"
+MODE_LSH = "lsh"
+
+METRIC_COSINE = "cosine"
+METRIC_EUCLIDEAN = "euclidean"
+
+class SimilarityIndex:
+    """Incremental, persistable k-nearest-neighbor index keyed by app name"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, mode: str = MODE_EXACT, metric: str = METRIC_COSINE,
+                 n_tables: int = 8, n_bits: int = 12, block_size: int = 16384,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            mode: 'exact' (blocked matrix products over all vectors) or 'lsh'
+                (random-hyperplane buckets, exact re-ranking of the candidates)
+            metric: 'cosine' (higher is more similar) or 'euclidean' (distance, lower is more similar)
+            n_tables: LSH hash tables; more tables find more true neighbors
+            n_bits: Hyperplanes per table; more bits give smaller buckets
+            block_size: Rows scored per matrix product in exact mode
+            seed: Seed for the LSH hyperplanes
+        """
+        if mode not in (MODE_EXACT, MODE_LSH):
+            raise ValueError(f"Unknown index mode: {mode}")
+        if metric not in (METRIC_COSINE, METRIC_EUCLIDEAN):
+            raise ValueError(f"Unknown similarity metric: {metric}")
+        if not 0 < n_bits < 63:
+            raise ValueError("n_bits must be between 1 and 62")
+
+        self.mode = mode
+        self.metric = metric
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.block_size = block_size
+        self.seed = seed
+
+        self.names: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = None  # (capacity x dimensions), allocated on first insert and grown by doubling
+        self._squared_norms = np.zeros(0, dtype=np.float32)
+        self._size = 0
+
+        # LSH state: hyperplanes, per-row codes, and per-table sorted code order (rebuilt lazily)
+        self._planes = None
+        self._center = None
+        self._codes = np.zeros((0, n_tables), dtype=np.int64)
+        self._sorted = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Stored vectors (rows in insertion order, as transformed for the metric)"""
+        if self._vectors is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._vectors[:self._size]
+
+    def add(self, names: Sequence[str], vectors: Union[np.ndarray, List[List[float]]]) -> 'SimilarityIndex':
+        """
+        Insert or replace vectors
+
+        Args:
+            names: One unique key per row
+            vectors: (rows x dimensions) matrix
+        """
+        if not len(names):
+            return self
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(names) != len(vectors):
+            raise ValueError("names and vectors must have the same length")
+        if self._vectors is not None and vectors.shape[1] != self._vectors.shape[1]:
+            raise ValueError(f"Expected {self._vectors.shape[1]}-dimensional vectors, got {vectors.shape[1]}")
+
+        vectors = self._prepare(vectors)
+        rows = np.empty(len(names), dtype=np.int64)
+        for i, name in enumerate(names):
+            row = self._rows.get(name)
+            if row is None:
+                row = self._rows[name] = len(self.names)
+                self.names.append(name)
+            rows[i] = row
+
+        self._reserve(len(self.names), vectors.shape[1])
+        self._vectors[rows] = vectors
+        self._squared_norms[rows] = (vectors * vectors).sum(axis=1)
+        self._size = len(self.names)
+
+        if self.mode == MODE_LSH:
+            if self._planes is None:
+                rng = np.random.default_rng(self.seed)
+                self._planes = rng.standard_normal((self.n_tables, self.n_bits, vectors.shape[1])).astype(np.float32)
+                # Hash around the first batch's mean so buckets split the data rather than the origin
+                self._center = vectors.mean(axis=0)
+            self._codes[rows] = self._hash(vectors)
+            self._sorted = None
+
+        return self
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Unit-normalize for cosine so similarity is a plain dot product"""
+        if self.metric != METRIC_COSINE:
+            return vectors
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def _reserve(self, rows: int, dimensions: int):
+        """Grow storage geometrically so repeated inserts stay amortized O(1)"""
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, 2 * capacity, 64)
+
+        vectors = np.zeros((new_capacity, dimensions), dtype=np.float32)
+        if self._vectors is not None:
+            vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+
+        squared_norms = np.zeros(new_capacity, dtype=np.float32)
+        squared_norms[:self._size] = self._squared_norms[:self._size]
+        self._squared_norms = squared_norms
+
+        codes = np.zeros((new_capacity, self.n_tables), dtype=np.int64)
+        codes[:self._size] = self._codes[:self._size]
+        self._codes = codes
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        """(rows x tables) bucket codes from the sign pattern against each table's hyperplanes"""
+        weights = np.left_shift(np.int64(1), np.arange(self.n_bits, dtype=np.int64))
+        centered = vectors - self._center
+        codes = np.empty((len(vectors), self.n_tables), dtype=np.int64)
+        for table in range(self.n_tables):
+            bits = (centered @ self._planes[table].T) > 0
+            codes[:, table] = bits.astype(np.int64) @ weights
+        return codes
+
+    def _ensure_sorted(self):
+        """Per-table (sorted codes, row order) for bucket lookups by binary search"""
+        if self._sorted is not None:
+            return
+        codes = self._codes[:self._size]
+        order = np.argsort(codes, axis=0, kind='stable')
+        self._sorted = (np.take_along_axis(codes, order, axis=0), order)
+
+    def _scores(self, rows: Union[slice, np.ndarray], query: np.ndarray) -> np.ndarray:
+        """Similarity (cosine) or squared distance (euclidean) of the query to the given rows"""
+        dots = self._vectors[rows] @ query
+        if self.metric == METRIC_COSINE:
+            return dots
+        return np.maximum(self._squared_norms[rows] - 2.0 * dots + query @ query, 0.0)
+
+    def _top(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Positions of the k best scores, best first"""
+        keyed = -scores if self.metric == METRIC_COSINE else scores
+        if k < len(keyed):
+            candidates = np.argpartition(keyed, k - 1)[:k]
+        else:
+            candidates = np.arange(len(keyed))
+        return candidates[np.argsort(keyed[candidates], kind='stable')]
+
+    def _exact_search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Blocked scan: each block's top k is merged into a running top k"""
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+
+        for start in range(0, self._size, self.block_size):
+            stop = min(start + self.block_size, self._size)
+            # Contiguous slices keep each block a view, so the product streams through memory
+            scores = self._scores(slice(start, stop), query)
+            top = self._top(scores, k)
+
+            best_rows = np.concatenate([best_rows, start + top])
+            best_scores = np.concatenate([best_scores, scores[top]])
+            keep = self._top(best_scores, k)
+            best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        return best_rows, best_scores
+
+    def _lsh_candidates(self, query: np.ndarray) -> np.ndarray:
+        """Rows sharing a bucket with the query in any table"""
+        self._ensure_sorted()
+        sorted_codes, order = self._sorted
+        query_codes = self._hash(query[None, :])[0]
+
+        candidates = []
+        for table in range(self.n_tables):
+            column = sorted_codes[:, table]
+            low = np.searchsorted(column, query_codes[table], side='left')
+            high = np.searchsorted(column, query_codes[table], side='right')
+            candidates.append(order[low:high, table])
+        return np.unique(np.concatenate(candidates)) if candidates else np.zeros(0, dtype=np.int64)
+
+    def query(self, vector: Union[np.ndarray, List[float]], k: int = 10,
+              exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        k most similar stored entries for a raw vector
+
+        Returns:
+            (name, score) pairs, best first; scores are cosine similarities or
+            euclidean distances depending on the metric
+        """
+        if not self._size or k <= 0:
+            return []
+        query = self._prepare(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        wanted = k + (1 if exclude in self._rows else 0)
+
+        rows = scores = None
+        if self.mode == MODE_LSH:
+            candidates = self._lsh_candidates(query)
+            # Too few bucket neighbors to fill k: fall back to the exact scan
+            if len(candidates) >= wanted:
+                candidate_scores = self._scores(candidates, query)
+                top = self._top(candidate_scores, wanted)
+                rows, scores = candidates[top], candidate_scores[top]
+        if rows is None:
+            rows, scores = self._exact_search(query, wanted)
+
+        results = []
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            name = self.names[row]
+            if name == exclude:
+                continue
+            results.append((name, float(np.sqrt(score)) if self.metric == METRIC_EUCLIDEAN else float(score)))
+        return results[:k]
+
+    def find_similar(self, app_name: str, k: int = 10) -> List[Tuple[str, float]]:
+        """k apps most similar to an indexed app (the app itself excluded)"""
+        row = self._rows.get(app_name)
+        if row is None:
+            raise KeyError(f"{app_name} is not in the similarity index")
+        # Stored vectors are already prepared (unit normalization is idempotent)
+        return self.query(self._vectors[row], k, exclude=app_name)
+
+    def save(self, index_file: Union[str, Path]):
+        """Write the index to a compressed .npz file"""
+        Path(index_file).parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            'format_version': np.int32(self.FORMAT_VERSION),
+            'mode': np.asarray(self.mode),
+            'metric': np.asarray(self.metric),
+            'params': np.asarray([self.n_tables, self.n_bits, self.block_size], dtype=np.int64),
+            'names': np.asarray(self.names, dtype=str),
+            'vectors': self.vectors
+        }
+        if self._planes is not None:
+            arrays.update(planes=self._planes, center=self._center, codes=self._codes[:self._size])
+
+        with open(index_file, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        logger.info(f"Saved similarity index ({self._size} entries) to {index_file}")
+
+    @classmethod
+    def load(cls, index_file: Union[str, Path]) -> 'SimilarityIndex':
+        """Read an index written by save(); inserts can continue afterwards"""
+        with np.load(index_file, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported similarity index version {version} in {index_file}")
+
+            n_tables, n_bits, block_size = data['params'].tolist()
+            index = cls(mode=str(data['mode']), metric=str(data['metric']),
+                        n_tables=n_tables, n_bits=n_bits, block_size=block_size)
+
+            names = data['names'].tolist()
+            vectors = data['vectors']
+            index.names = names
+            index._rows = {name: row for row, name in enumerate(names)}
+            index._size = len(names)
+            index._vectors = vectors.astype(np.float32)
+            index._squared_norms = (index._vectors * index._vectors).sum(axis=1)
+            index._codes = np.zeros((len(names), n_tables), dtype=np.int64)
+
+            if 'planes' in data:
+                index._planes = data['planes']
+                index._center = data['center']
+                index._codes = data['codes']
+
+        return index
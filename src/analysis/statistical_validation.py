@@ -5,14 +5,28 @@ Rigorous statistical testing and validation metrics
 
 import json
 import math
+import random
 from typing import Dict, List, Tuple, Any, Optional
 from collections import defaultdict, Counter
 import statistics
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
 
+import numpy as np
+
+from utils.parallel_executor import BACKEND_THREAD
+from utils.ranking import rank_data, spearman_rho
+from utils.resampling import (
+    ResamplingEngine, mann_whitney_permutation, kruskal_wallis_permutation,
+    spearman_permutation, spearman_bootstrap, cronbach_permutation, cronbach_bootstrap
+)
+
 logger = logging.getLogger(__name__)
 
+_SILHOUETTE_TILE = 512  # Side of the square distance tiles used for full silhouette passes
+_EXACT_U_MAX_SIZE = 20  # Largest group size for which Mann-Whitney p-values come from the exact distribution
+
 @dataclass
 class ValidationResults:
     """Results from statistical validation"""
@@ -25,12 +39,126 @@ class ValidationResults:
     confidence_interval: Optional[Tuple[float, float]] = None
     interpretation: str = ""
 
+def _pairwise_distances(X_left: np.ndarray, X_right: np.ndarray, left_norms: np.ndarray,
+                        right_norms: np.ndarray) -> np.ndarray:
+    """Euclidean distance block via the ||x||^2 + ||y||^2 - 2xy expansion"""
+    distances = X_left @ X_right.T
+    distances *= -2.0
+    distances += left_norms[:, None]
+    distances += right_norms[None, :]
+    np.maximum(distances, 0.0, out=distances)
+    return np.sqrt(distances, out=distances)
+
+def _silhouette_samples(X: np.ndarray, codes: np.ndarray, rows: Optional[np.ndarray] = None,
+                        block_bytes: int = 64 * 1024 * 1024) -> np.ndarray:
+    """
+    Silhouette coefficient of the given rows (all points if None) against all points
+    
+    Distances are computed in blocks bounded by block_bytes and reduced straight
+    to per-cluster distance sums with a one-hot matmul. For all points only the
+    upper-triangle blocks are computed and each block is credited to both sides.
+    """
+    n = len(X)
+    n_clusters = int(codes.max()) + 1
+    counts = np.bincount(codes, minlength=n_clusters).astype(np.float64)
+    membership = np.zeros((n, n_clusters), dtype=np.float32)
+    membership[np.arange(n), codes] = 1.0
+    
+    # Center in float64 first: distances are translation-invariant, and the norm
+    # expansion below cancels catastrophically in float32 for data far from the origin
+    X = (X - X.mean(axis=0)).astype(np.float32)
+    squared_norms = np.einsum('ij,ij->i', X, X)
+    
+    if rows is None:
+        rows = np.arange(n)
+        sums = np.zeros((n, n_clusters), dtype=np.float64)
+        # Square tiles small enough to stay cache-resident beat larger ones here
+        block_size = max(1, min(_SILHOUETTE_TILE, int(math.sqrt(block_bytes // 4))))
+        for left in range(0, n, block_size):
+            left_rows = slice(left, min(left + block_size, n))
+            for right in range(left, n, block_size):
+                right_rows = slice(right, min(right + block_size, n))
+                distances = _pairwise_distances(X[left_rows], X[right_rows],
+                                                squared_norms[left_rows], squared_norms[right_rows])
+                if left == right:
+                    np.fill_diagonal(distances, 0.0)
+                sums[left_rows] += distances @ membership[right_rows]
+                if left != right:
+                    sums[right_rows] += distances.T @ membership[left_rows]
+    else:
+        sums = np.empty((len(rows), n_clusters), dtype=np.float64)
+        block_size = max(1, block_bytes // (4 * max(n, 1)))
+        for start in range(0, len(rows), block_size):
+            block_rows = rows[start:start + block_size]
+            distances = _pairwise_distances(X[block_rows], X, squared_norms[block_rows], squared_norms)
+            distances[np.arange(len(block_rows)), block_rows] = 0.0
+            sums[start:start + len(block_rows)] = distances @ membership
+    
+    positions = np.arange(len(rows))
+    own = codes[rows]
+    own_counts = counts[own] - 1
+    
+    # Mean distance to the rest of the own cluster (0 for singletons)
+    a = np.divide(sums[positions, own], own_counts, out=np.zeros(len(rows)), where=own_counts > 0)
+    
+    # Smallest mean distance to another non-empty cluster
+    means = np.divide(sums, counts, out=np.full_like(sums, np.inf), where=counts > 0)
+    means[positions, own] = np.inf
+    b = means.min(axis=1)
+    b[np.isinf(b)] = 0.0
+    
+    denominator = np.maximum(a, b)
+    return np.divide(b - a, denominator, out=np.zeros(len(rows)), where=denominator > 0)
+
+@lru_cache(maxsize=None)
+def _exact_u_table(n1: int, n2: int) -> np.ndarray:
+    """
+    P(U <= u) for u = 0..n1*n2 under H0 without ties, memoized per process
+    
+    The number of arrangements with a given U is the coefficient of q^U in the
+    Gaussian binomial [n1+n2 choose n1]_q, built by dynamic programming from
+    prod_i (1 - q^(n2+i)) / (1 - q^i): each factor is one pass over the counts.
+    Call with n1 <= n2 so both orders share one entry.
+    """
+    counts = np.zeros(n1 * n2 + 1, dtype=np.int64)
+    counts[0] = 1
+    degree = 0
+    for i in range(1, n1 + 1):
+        # Multiply by (1 - q^(n2+i)), high terms first so each uses the old value
+        degree += n2 + i
+        for u in range(min(degree, n1 * n2), n2 + i - 1, -1):
+            counts[u] -= counts[u - n2 - i]
+        # Divide by (1 - q^i): running sums with stride i
+        for u in range(i, n1 * n2 + 1):
+            counts[u] += counts[u - i]
+    table = np.cumsum(counts) / counts.sum()
+    table.flags.writeable = False
+    return table
+
+def exact_mann_whitney_p_value(u_stat: float, n1: int, n2: int) -> float:
+    """Exact two-sided p-value for the smaller U statistic of untied samples"""
+    table = _exact_u_table(min(n1, n2), max(n1, n2))
+    return float(min(1.0, 2 * table[int(math.floor(u_stat))]))
+
 class StatisticalValidator:
     """Comprehensive statistical validation framework"""
     
-    def __init__(self, alpha: float = 0.05):
+    def __init__(self, alpha: float = 0.05, n_resamples: Optional[int] = None, seed: Optional[int] = None,
+                 backend: str = BACKEND_THREAD, max_workers: Optional[int] = None):
+        """
+        Args:
+            alpha: Significance level
+            n_resamples: If set, p-values come from this many permutations and
+                correlation/reliability statistics get bootstrap confidence intervals
+                instead of the closed-form approximations
+            seed: Seed for the resampling
+            backend: Executor backend for resampling shards
+            max_workers: Worker count for resampling
+        """
         self.alpha = alpha  # Significance level
         self.results = []
+        self.resampler = ResamplingEngine(n_resamples, seed=seed, backend=backend,
+                                          max_workers=max_workers) if n_resamples else None
     
     def mann_whitney_u_test(self, group1: List[float], group2: List[float]) -> ValidationResults:
         """
@@ -46,27 +174,13 @@ class StatisticalValidator:
                 significant=False, interpretation="Empty groups"
             )
         
-        # Combine and rank all values
-        combined = [(val, 0) for val in group1] + [(val, 1) for val in group2]
-        combined.sort()
-        
-        # Assign ranks (handling ties)
-        ranks = []
-        i = 0
-        while i < len(combined):
-            j = i
-            # Find all ties
-            while j < len(combined) and combined[j][0] == combined[i][0]:
-                j += 1
-            # Assign average rank to all tied values
-            avg_rank = (i + j - 1) / 2 + 1  # +1 for 1-based indexing
-            for k in range(i, j):
-                ranks.append((combined[k][0], combined[k][1], avg_rank))
-            i = j
+        # Rank the pooled sample once (average ranks for ties)
+        ranked = rank_data(np.concatenate([np.asarray(group1, dtype=np.float64),
+                                           np.asarray(group2, dtype=np.float64)]))
         
         # Calculate rank sums
-        rank_sum_1 = sum(rank for val, group, rank in ranks if group == 0)
-        rank_sum_2 = sum(rank for val, group, rank in ranks if group == 1)
+        rank_sum_1 = float(ranked.ranks[:n1].sum())
+        rank_sum_2 = float(ranked.ranks[n1:].sum())
         
         # Calculate U statistics
         u1 = rank_sum_1 - n1 * (n1 + 1) / 2
@@ -75,19 +189,28 @@ class StatisticalValidator:
         # Test statistic is the smaller U
         u_stat = min(u1, u2)
         
-        # For large samples, use normal approximation
-        if n1 > 20 or n2 > 20:
-            mean_u = n1 * n2 / 2
-            std_u = math.sqrt(n1 * n2 * (n1 + n2 + 1) / 12)
-            z_score = (u_stat - mean_u) / std_u if std_u > 0 else 0
-            
+        # Normal approximation; z also feeds the effect size on every path
+        mean_u = n1 * n2 / 2
+        n = n1 + n2
+        # Variance shrinks with ties: sum(t^3 - t) over tie groups
+        std_u = math.sqrt(n1 * n2 / 12 * ((n + 1) - ranked.tie_term / (n * (n - 1))))
+        z_score = (u_stat - mean_u) / std_u if std_u > 0 else 0
+        
+        if n1 <= _EXACT_U_MAX_SIZE and n2 <= _EXACT_U_MAX_SIZE and ranked.n_tie_groups == 0:
+            # Small untied samples: exact distribution (a table lookup after the first use of n1, n2)
+            table = _exact_u_table(min(n1, n2), max(n1, n2))
+            p_value = exact_mann_whitney_p_value(u_stat, n1, n2)
+            # Largest U still significant at alpha (-1 when no U is at these sizes)
+            critical_value = float(np.searchsorted(table, self.alpha / 2, side='right') - 1)
+        elif self.resampler:
+            # Permutation test on |U - n1 n2 / 2| over reassignments of the pooled ranks
+            p_value = self.resampler.permutation_p_value(mann_whitney_permutation, abs(u1 - mean_u),
+                                                         ranked.ranks, n1)
+            critical_value = 1.96
+        else:
             # Two-tailed p-value using normal approximation
             p_value = 2 * (1 - self._normal_cdf(abs(z_score)))
             critical_value = 1.96  # For alpha = 0.05
-        else:
-            # For small samples, use approximation
-            p_value = 0.05 if u_stat < n1 * n2 * 0.3 else 0.5
-            critical_value = n1 * n2 * 0.3
         
         # Effect size (r = Z / sqrt(N))
         effect_size = abs(z_score) / math.sqrt(n1 + n2) if n1 + n2 > 0 else 0
@@ -125,43 +248,19 @@ class StatisticalValidator:
                 significant=False, interpretation="Need at least 2 non-empty groups"
             )
         
-        # Combine all values and rank them
-        all_values = []
-        group_labels = []
-        for i, group in enumerate(groups):
-            all_values.extend(group)
-            group_labels.extend([i] * len(group))
-        
-        n_total = len(all_values)
-        
-        # Sort and rank
-        sorted_indices = sorted(range(len(all_values)), key=lambda i: all_values[i])
-        ranks = [0] * len(all_values)
-        
-        i = 0
-        while i < len(sorted_indices):
-            j = i
-            # Find ties
-            while j < len(sorted_indices) and all_values[sorted_indices[j]] == all_values[sorted_indices[i]]:
-                j += 1
-            # Assign average rank
-            avg_rank = (i + j + 1) / 2  # 1-based ranking
-            for k in range(i, j):
-                ranks[sorted_indices[k]] = avg_rank
-            i = j
-        
-        # Calculate rank sums for each group
-        rank_sums = [0] * len(groups)
-        for i, group_label in enumerate(group_labels):
-            rank_sums[group_label] += ranks[i]
+        # Rank the pooled values once and sum ranks per group
+        sizes = np.array([len(group) for group in groups])
+        n_total = int(sizes.sum())
+        ranked = rank_data(np.concatenate([np.asarray(group, dtype=np.float64) for group in groups]))
+        rank_sums = np.bincount(np.repeat(np.arange(len(groups)), sizes), weights=ranked.ranks)
         
         # Calculate H statistic
-        h_stat = 0
-        for i, group in enumerate(groups):
-            if len(group) > 0:
-                h_stat += (rank_sums[i] ** 2) / len(group)
+        h_stat = float((12 / (n_total * (n_total + 1))) * np.sum(rank_sums ** 2 / sizes) - 3 * (n_total + 1))
         
-        h_stat = (12 / (n_total * (n_total + 1))) * h_stat - 3 * (n_total + 1)
+        # Tie correction
+        tie_correction = 1 - ranked.tie_term / (n_total ** 3 - n_total) if n_total > 1 else 1
+        if tie_correction > 0:
+            h_stat /= tie_correction
         
         # Degrees of freedom
         df = len(groups) - 1
@@ -169,10 +268,15 @@ class StatisticalValidator:
         # Critical value (chi-square distribution approximation)
         critical_value = self._chi_square_critical(df, self.alpha)
         
-        # P-value approximation
-        p_value = 1 - self._chi_square_cdf(h_stat, df)
-        
-        significant = h_stat > critical_value
+        if self.resampler:
+            # Permutation test over reassignments of the pooled ranks to groups of the same sizes
+            p_value = self.resampler.permutation_p_value(kruskal_wallis_permutation, h_stat,
+                                                         ranked.ranks, sizes, tie_correction)
+            significant = p_value < self.alpha
+        else:
+            # P-value approximation
+            p_value = 1 - self._chi_square_cdf(h_stat, df)
+            significant = h_stat > critical_value
         
         return ValidationResults(
             test_name="Kruskal-Wallis Test",
@@ -197,13 +301,8 @@ class StatisticalValidator:
         
         n = len(x)
         
-        # Rank the values
-        x_ranks = self._rank_values(x)
-        y_ranks = self._rank_values(y)
-        
-        # Calculate Spearman's rho
-        d_squared_sum = sum((x_rank - y_rank) ** 2 for x_rank, y_rank in zip(x_ranks, y_ranks))
-        rho = 1 - (6 * d_squared_sum) / (n * (n ** 2 - 1))
+        # Spearman's rho (tie-corrected: Pearson correlation of average ranks)
+        rho = spearman_rho(x, y)
         
         # Test significance using t-distribution approximation
         if n > 3:
@@ -222,8 +321,17 @@ class StatisticalValidator:
         
         significant = abs(rho) > critical_value / math.sqrt(n) if n > 0 else False
         
+        if self.resampler:
+            # Permutation p-value over shuffled pairings, percentile bootstrap interval over resampled pairs
+            x_values = np.asarray(x, dtype=np.float64)
+            y_values = np.asarray(y, dtype=np.float64)
+            p_value = self.resampler.permutation_p_value(spearman_permutation, abs(rho),
+                                                         rank_data(x_values).ranks, rank_data(y_values).ranks)
+            significant = p_value < self.alpha
+            confidence_interval = self.resampler.bootstrap_interval(spearman_bootstrap, x_values, y_values,
+                                                                    confidence=1 - self.alpha)
         # Confidence interval (rough approximation)
-        if n > 10:
+        elif n > 10:
             se = 1 / math.sqrt(n - 3)
             z_rho = 0.5 * math.log((1 + rho) / (1 - rho)) if rho != 1 and rho != -1 else 0
             z_lower = z_rho - 1.96 * se
@@ -312,18 +420,38 @@ class StatisticalValidator:
         
         significant = alpha >= 0.7
         
+        # Without resampling there is no p-value; with it, test alpha against items shuffled independently
+        p_value = 0.0
+        confidence_interval = None
+        if self.resampler:
+            item_matrix = np.asarray(items, dtype=np.float64)
+            p_value = self.resampler.permutation_p_value(cronbach_permutation, alpha, item_matrix)
+            confidence_interval = self.resampler.bootstrap_interval(cronbach_bootstrap, item_matrix,
+                                                                    confidence=1 - self.alpha)
+        
         return ValidationResults(
             test_name="Cronbach's Alpha",
             statistic=alpha,
-            p_value=0.0,  # Not applicable
+            p_value=p_value,
             critical_value=0.7,
             significant=significant,
+            confidence_interval=confidence_interval,
             interpretation=f"{interpretation} (α={alpha:.3f})"
         )
     
-    def silhouette_analysis(self, data: List[List[float]], labels: List[int]) -> ValidationResults:
+    def silhouette_analysis(self, data: List[List[float]], labels: List[int],
+                            sample_size: Optional[int] = None, seed: Optional[int] = None,
+                            block_bytes: int = 64 * 1024 * 1024) -> ValidationResults:
         """
         Calculate silhouette coefficient for cluster validation
+        
+        Args:
+            data: Points (n x dimensions)
+            labels: Cluster label per point
+            sample_size: If set and smaller than n, average the exact silhouette of a
+                random sample of points and report a confidence interval for the mean
+            seed: Seed for the sample
+            block_bytes: Memory budget for one block of pairwise distances
         """
         if len(set(labels)) < 2:
             return ValidationResults(
@@ -332,36 +460,25 @@ class StatisticalValidator:
                 significant=False, interpretation="Need at least 2 clusters"
             )
         
-        silhouette_scores = []
+        X = np.asarray(data, dtype=np.float64).reshape(len(labels), -1)
+        _, codes = np.unique(np.asarray(labels), return_inverse=True)
+        n = len(X)
         
-        for i, point in enumerate(data):
-            # Calculate intra-cluster distance (a)
-            same_cluster_points = [data[j] for j, label in enumerate(labels) if label == labels[i] and j != i]
-            if same_cluster_points:
-                a = statistics.mean(self._euclidean_distance(point, other) for other in same_cluster_points)
-            else:
-                a = 0
-            
-            # Calculate inter-cluster distance (b)
-            min_avg_dist = float('inf')
-            for cluster_label in set(labels):
-                if cluster_label != labels[i]:
-                    other_cluster_points = [data[j] for j, label in enumerate(labels) if label == cluster_label]
-                    if other_cluster_points:
-                        avg_dist = statistics.mean(self._euclidean_distance(point, other) for other in other_cluster_points)
-                        min_avg_dist = min(min_avg_dist, avg_dist)
-            
-            b = min_avg_dist if min_avg_dist != float('inf') else 0
-            
-            # Calculate silhouette score for this point
-            if max(a, b) > 0:
-                silhouette_score = (b - a) / max(a, b)
-            else:
-                silhouette_score = 0
-            
-            silhouette_scores.append(silhouette_score)
+        sampled = sample_size is not None and sample_size < n
+        rows = None
+        if sampled:
+            rows = np.sort(np.random.default_rng(seed).choice(n, size=sample_size, replace=False))
         
-        avg_silhouette = statistics.mean(silhouette_scores) if silhouette_scores else 0
+        silhouette_scores = _silhouette_samples(X, codes, rows, block_bytes)
+        avg_silhouette = float(silhouette_scores.mean()) if len(silhouette_scores) else 0
+        
+        # Normal-approximation interval for the sample mean (finite population corrected)
+        confidence_interval = None
+        if sampled and len(silhouette_scores) > 1:
+            z = statistics.NormalDist().inv_cdf(1 - self.alpha / 2)
+            standard_error = (silhouette_scores.std(ddof=1) / math.sqrt(len(silhouette_scores))
+                              * math.sqrt((n - len(silhouette_scores)) / (n - 1)))
+            confidence_interval = (float(avg_silhouette - z * standard_error), float(avg_silhouette + z * standard_error))
         
         # Interpretation
         if avg_silhouette >= 0.7:
@@ -381,7 +498,9 @@ class StatisticalValidator:
             p_value=0.0,  # Not applicable
             critical_value=0.5,
             significant=significant,
-            interpretation=f"{interpretation} (avg={avg_silhouette:.3f})"
+            confidence_interval=confidence_interval,
+            interpretation=(f"{interpretation} (avg={avg_silhouette:.3f}"
+                            f"{f', sampled {len(silhouette_scores)} of {n}' if sampled else ''})")
         )
     
     def validate_complexity_rubric(self, rubric_scores: List[float], external_measures: List[List[float]]) -> Dict[str, ValidationResults]:
@@ -405,14 +524,18 @@ class StatisticalValidator:
         return validation_results
     
     def validate_clustering(self, data: List[List[float]], labels: List[int], 
-                          ground_truth_labels: Optional[List[int]] = None) -> Dict[str, ValidationResults]:
+                          ground_truth_labels: Optional[List[int]] = None,
+                          silhouette_sample_size: Optional[int] = None) -> Dict[str, ValidationResults]:
         """
         Comprehensive clustering validation
+        
+        silhouette_sample_size switches the silhouette to a sampled estimate with a
+        confidence interval (see silhouette_analysis).
         """
         validation_results = {}
         
         # Silhouette analysis
-        silhouette_result = self.silhouette_analysis(data, labels)
+        silhouette_result = self.silhouette_analysis(data, labels, sample_size=silhouette_sample_size)
         validation_results['silhouette'] = silhouette_result
         
         # If ground truth is available, calculate adjusted rand index
@@ -540,20 +663,6 @@ class StatisticalValidator:
         return report
     
     # Helper methods for statistical calculations
-    def _rank_values(self, values: List[float]) -> List[float]:
-        """Rank values handling ties with average ranks"""
-        sorted_values = sorted(values)
-        ranks = []
-        
-        for value in values:
-            # Find all positions of this value
-            positions = [i for i, v in enumerate(sorted_values) if v == value]
-            # Calculate average rank (1-based)
-            avg_rank = sum(pos + 1 for pos in positions) / len(positions)
-            ranks.append(avg_rank)
-        
-        return ranks
-    
     def _euclidean_distance(self, p1: List[float], p2: List[float]) -> float:
         """Calculate Euclidean distance between two points"""
         return math.sqrt(sum((a - b) ** 2 for a, b in zip(p1, p2)))
@@ -658,7 +767,7 @@ class StatisticalValidator:
 
 def main():
     """Run statistical validation on analysis results"""
-    validator = StatisticalValidator()
+    validator = StatisticalValidator(n_resamples=10000, seed=42)
     
     # Load analysis results
     results_file = "/data/data/com.termux/files/home/base44_analysis/data/processed/regex_analysis_results.json"
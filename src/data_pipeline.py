@@ -3,12 +3,15 @@ Integrated Data Processing Pipeline for Base44 Ecosystem Analysis
 Orchestrates all analyzers to create comprehensive analysis of 59 Base44 applications
 """
 
+import copy
 import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 import logging
+from collections import Counter
 from datetime import datetime
 import time
 
@@ -18,6 +21,9 @@ from extractors.ast_analyzer import ASTAnalyzer, ComponentAnalysis
 from extractors.sdk_profiler import SDKProfiler, SDKUsageProfile
 from extractors.content_extractor import ContentExtractor, AppContent
 from extractors.dependency_analyzer import DependencyAnalyzer, DependencyProfile
+from analysis.similarity_index import SimilarityIndex, METRIC_EUCLIDEAN
+from utils.clone_detector import CloneDetector, CloneFamily, file_digest
+from utils.accumulators import Histogram, StreamingSummary
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -56,6 +62,96 @@ class IntegratedAppProfile:
     business_domain: str = ""
     app_type: str = ""  # dashboard, tool, social, ecommerce, etc.
 
+class EcosystemStatistics:
+    """
+    Mergeable ecosystem-wide aggregates over summary rows (one row per app)
+    
+    Numeric columns keep moments and a quantile digest, categorical columns keep
+    counts. Statistics from separate runs or workers merge without their
+    profiles, and persist as JSON.
+    """
+    
+    NUMERIC_COLUMNS = ('overall_complexity_score', 'technical_sophistication', 'base44_integration_level',
+                       'user_experience_complexity', 'total_dependencies', 'sdk_adherence_score',
+                       'page_count', 'jsx_elements')
+    CATEGORICAL_COLUMNS = ('business_domain', 'app_type', 'predicted_category')
+    COMPLEXITY_EDGES = (0.3, 0.6)
+    COMPLEXITY_LEVELS = ('low_complexity', 'medium_complexity', 'high_complexity')
+    
+    def __init__(self):
+        self.apps: Set[str] = set()
+        self.columns: Dict[str, StreamingSummary] = {column: StreamingSummary() for column in self.NUMERIC_COLUMNS}
+        self.categories: Dict[str, Counter] = {column: Counter() for column in self.CATEGORICAL_COLUMNS}
+        self.complexity_levels = Histogram(self.COMPLEXITY_EDGES, self.COMPLEXITY_LEVELS)
+        self.typescript_apps = 0
+    
+    def __len__(self) -> int:
+        return len(self.apps)
+    
+    def add(self, row: Dict[str, Any]):
+        """Fold in one summary row; columns missing from the row are skipped"""
+        if row['app_name'] in self.apps:
+            raise ValueError(f"{row['app_name']} is already included in the ecosystem statistics")
+        self.apps.add(row['app_name'])
+        for column in self.NUMERIC_COLUMNS:
+            if row.get(column) is not None:
+                self.columns[column].add(row[column])
+        for column in self.CATEGORICAL_COLUMNS:
+            self.categories[column][row[column]] += 1
+        self.complexity_levels.add(row['overall_complexity_score'])
+        self.typescript_apps += bool(row.get('uses_typescript'))
+    
+    def merge(self, other: 'EcosystemStatistics') -> 'EcosystemStatistics':
+        """Fold in statistics over a disjoint set of apps"""
+        overlap = self.apps & other.apps
+        if overlap:
+            raise ValueError(f"Ecosystem statistics overlap on {len(overlap)} apps, e.g. {sorted(overlap)[0]}")
+        self.apps |= other.apps
+        for column in self.NUMERIC_COLUMNS:
+            self.columns[column].merge(other.columns[column])
+        for column in self.CATEGORICAL_COLUMNS:
+            self.categories[column].update(other.categories[column])
+        self.complexity_levels.merge(other.complexity_levels)
+        self.typescript_apps += other.typescript_apps
+        return self
+    
+    def mean(self, column: str) -> float:
+        """Mean over apps with the column (0 if none)"""
+        return self.columns[column].moments.mean
+    
+    def value_counts(self, column: str) -> Dict[str, int]:
+        """Category -> count, most common first"""
+        return dict(self.categories[column].most_common())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'apps': sorted(self.apps),
+            'columns': {column: summary.to_dict() for column, summary in self.columns.items()},
+            'categories': {column: dict(counts) for column, counts in self.categories.items()},
+            'complexity_levels': self.complexity_levels.to_dict(),
+            'typescript_apps': self.typescript_apps
+        }
+    
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'EcosystemStatistics':
+        stats = cls()
+        stats.apps = set(state['apps'])
+        stats.columns.update({column: StreamingSummary.from_dict(summary)
+                              for column, summary in state['columns'].items()})
+        stats.categories.update({column: Counter(counts) for column, counts in state['categories'].items()})
+        stats.complexity_levels = Histogram.from_dict(state['complexity_levels'])
+        stats.typescript_apps = state['typescript_apps']
+        return stats
+    
+    def save(self, stats_file: Path):
+        with open(stats_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+    
+    @classmethod
+    def load(cls, stats_file: Path) -> 'EcosystemStatistics':
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
 class Base44EcosystemPipeline:
     """Main pipeline for comprehensive Base44 ecosystem analysis"""
     
@@ -74,15 +170,23 @@ class Base44EcosystemPipeline:
         # Results storage
         self.integrated_profiles: List[IntegratedAppProfile] = []
         self.processing_stats = {}
+        self.similarity_index: Optional[SimilarityIndex] = None
+        self.clone_families: List[CloneFamily] = []
+        self.ecosystem_stats = EcosystemStatistics()
         
         logger.info("Base44 Ecosystem Pipeline initialized")
     
-    def run_full_analysis(self, limit: Optional[int] = None) -> List[IntegratedAppProfile]:
+    def run_full_analysis(self, limit: Optional[int] = None, dedupe_clones: bool = False,
+                          clone_threshold: float = 0.8) -> List[IntegratedAppProfile]:
         """
         Run comprehensive analysis on all Base44 applications
         
         Args:
             limit: Optional limit on number of applications to analyze (for testing)
+            dedupe_clones: Group near-duplicate apps (MinHash) first; a clone reuses its
+                family representative's results for every analyzer whose inputs are
+                byte-identical, and reruns the others
+            clone_threshold: Minimum estimated Jaccard similarity between clones
             
         Returns:
             List of IntegratedAppProfile objects with complete analysis
@@ -99,13 +203,23 @@ class Base44EcosystemPipeline:
         
         logger.info(f"Discovered {len(apps_metadata)} applications to analyze")
         
+        # Representatives go first so their clones can reuse their results
+        clone_plan = {}
+        if dedupe_clones:
+            clone_plan = self._plan_clone_reuse(apps_metadata, clone_threshold)
+            apps_metadata = sorted(apps_metadata, key=lambda metadata: metadata.app_name in clone_plan)
+        analyzed = {}
+        
         # Process each application
         for i, app_metadata in enumerate(apps_metadata):
             logger.info(f"Processing application {i+1}/{len(apps_metadata)}: {app_metadata.app_name}")
             
             try:
-                profile = self._analyze_single_application(app_metadata)
+                representative, reusable = clone_plan.get(app_metadata.app_name, (None, set()))
+                profile = self._analyze_single_application(app_metadata, analyzed.get(representative), reusable)
                 self.integrated_profiles.append(profile)
+                self.ecosystem_stats.add(self._summary_row(profile))
+                analyzed[profile.app_name] = profile
                 
                 # Log progress every 10 applications
                 if (i + 1) % 10 == 0:
@@ -124,6 +238,10 @@ class Base44EcosystemPipeline:
             'analysis_date': datetime.now().isoformat(),
             'successful_analyses': len([p for p in self.integrated_profiles if p.component_analysis is not None])
         }
+        if dedupe_clones:
+            self.processing_stats['clone_families'] = sum(1 for family in self.clone_families
+                                                          if len(family.members) > 1)
+            self.processing_stats['reused_analyses'] = sum(len(reusable) for _, reusable in clone_plan.values())
         
         logger.info(f"Completed analysis of {len(self.integrated_profiles)} applications in {total_time:.2f} seconds")
         
@@ -132,8 +250,69 @@ class Base44EcosystemPipeline:
         
         return self.integrated_profiles
     
-    def _analyze_single_application(self, app_metadata) -> IntegratedAppProfile:
-        """Analyze a single application using all analyzers"""
+    def _plan_clone_reuse(self, apps_metadata, clone_threshold: float) -> Dict[str, Tuple[str, Set[str]]]:
+        """
+        Detect clone families and decide what each clone can take from its representative
+        
+        Returns:
+            Clone app name -> (representative app name, profile fields whose analyzer
+            inputs are identical to the representative's)
+        """
+        app_dirs = {metadata.app_name: Path(metadata.app_path) for metadata in apps_metadata}
+        detector = CloneDetector(threshold=clone_threshold)
+        self.clone_families = detector.detect(app_dirs)
+        
+        def digest(app_name: str, file_name: str) -> Optional[str]:
+            path = app_dirs[app_name] / file_name
+            return file_digest(path.read_bytes()) if path.exists() else None
+        
+        def source_files(app_name: str) -> Dict[str, str]:
+            # What the SDK profiler and content extractor read: src/**/*.js(x)
+            return {path: digest for path, digest in detector.manifests[app_name].items()
+                    if path.startswith('src/') and path.endswith(('.js', '.jsx'))}
+        
+        plan = {}
+        for family in self.clone_families:
+            representative = family.representative
+            for member in family.members:
+                if member == representative:
+                    continue
+                reusable = set()
+                if digest(member, 'src/App.jsx') == digest(representative, 'src/App.jsx'):
+                    reusable.add('component_analysis')
+                same_sources = source_files(member) == source_files(representative)
+                if same_sources and digest(member, 'package.json') == digest(representative, 'package.json'):
+                    reusable.add('sdk_profile')
+                if same_sources and digest(member, 'README.md') == digest(representative, 'README.md'):
+                    reusable.add('content_profile')
+                plan[member] = (representative, reusable)
+        
+        return plan
+    
+    def _reuse_result(self, result: Any, representative_path: str, app_metadata) -> Any:
+        """Copy a representative's analyzer result onto a clone (name and file paths rebased)"""
+        result = copy.deepcopy(result)
+        if hasattr(result, 'app_name'):
+            result.app_name = app_metadata.app_name
+        for attribute in ('file_path', 'files_skipped', 'files_bounded'):
+            value = getattr(result, attribute, None)
+            if isinstance(value, str):
+                setattr(result, attribute, value.replace(representative_path, app_metadata.app_path, 1))
+            elif isinstance(value, list):
+                setattr(result, attribute, [path.replace(representative_path, app_metadata.app_path, 1)
+                                            for path in value])
+        return result
+    
+    def _analyze_single_application(self, app_metadata, representative: Optional[IntegratedAppProfile] = None,
+                                    reusable: Set[str] = frozenset()) -> IntegratedAppProfile:
+        """
+        Analyze a single application using all analyzers
+        
+        Args:
+            app_metadata: Application to analyze
+            representative: Already analyzed clone-family representative, if any
+            reusable: Profile fields to copy from the representative instead of recomputing
+        """
         start_time = time.time()
         
         profile = IntegratedAppProfile(
@@ -143,9 +322,17 @@ class Base44EcosystemPipeline:
         
         app_path = app_metadata.app_path
         
+        # Delta analysis: take over results whose inputs match the representative byte for byte
+        if representative is not None:
+            representative_path = str(Path(app_path).parent / representative.app_name)
+            for field_name in reusable:
+                result = getattr(representative, field_name)
+                if result is not None:
+                    setattr(profile, field_name, self._reuse_result(result, representative_path, app_metadata))
+        
         # Run AST analysis
         try:
-            if app_metadata.jsx_files:
+            if profile.component_analysis is None and app_metadata.jsx_files:
                 # Analyze the main App.jsx file if it exists
                 main_file_path = Path(app_path) / "src" / "App.jsx"
                 if main_file_path.exists():
@@ -158,13 +345,15 @@ class Base44EcosystemPipeline:
         
         # Run SDK profiling
         try:
-            profile.sdk_profile = self.sdk_profiler.profile_application(app_path, app_metadata.app_name)
+            if profile.sdk_profile is None:
+                profile.sdk_profile = self.sdk_profiler.profile_application(app_path, app_metadata.app_name)
         except Exception as e:
             logger.warning(f"SDK profiling failed for {app_metadata.app_name}: {e}")
         
         # Run content extraction
         try:
-            profile.content_profile = self.content_extractor.extract_application_content(app_path, app_metadata.app_name)
+            if profile.content_profile is None:
+                profile.content_profile = self.content_extractor.extract_application_content(app_path, app_metadata.app_name)
         except Exception as e:
             logger.warning(f"Content extraction failed for {app_metadata.app_name}: {e}")
         
@@ -349,6 +538,9 @@ class Base44EcosystemPipeline:
             'processing_stats': self.processing_stats,
             'profiles': profiles_data
         }
+        if self.clone_families:
+            comprehensive_results['clone_families'] = [asdict(family) for family in self.clone_families
+                                                       if len(family.members) > 1]
         
         comprehensive_path = self.output_dir / "comprehensive_analysis.json"
         with open(comprehensive_path, 'w', encoding='utf-8') as f:
@@ -357,40 +549,7 @@ class Base44EcosystemPipeline:
         logger.info(f"Saved comprehensive analysis to {comprehensive_path}")
         
         # Create summary DataFrame
-        summary_data = []
-        for profile in self.integrated_profiles:
-            row = {
-                'app_name': profile.app_name,
-                'overall_complexity_score': profile.overall_complexity_score,
-                'technical_sophistication': profile.technical_sophistication,
-                'base44_integration_level': profile.base44_integration_level,
-                'user_experience_complexity': profile.user_experience_complexity,
-                'predicted_category': profile.predicted_category,
-                'business_domain': profile.business_domain,
-                'app_type': profile.app_type,
-                'category_confidence': profile.category_confidence,
-                'processing_time': profile.processing_time_seconds
-            }
-            
-            # Add key metrics from sub-analyses
-            if profile.dependency_profile:
-                row['total_dependencies'] = profile.dependency_profile.total_dependencies
-                row['uses_typescript'] = profile.dependency_profile.uses_typescript
-            
-            if profile.sdk_profile:
-                row['entities_used'] = len(profile.sdk_profile.entities_used)
-                row['api_calls_total'] = profile.sdk_profile.api_calls_total
-                row['sdk_adherence_score'] = profile.sdk_profile.sdk_adherence_score
-            
-            if profile.content_profile:
-                row['unique_words'] = profile.content_profile.unique_words
-                row['page_count'] = len(profile.content_profile.page_names)
-            
-            if profile.component_analysis:
-                row['jsx_elements'] = profile.component_analysis.jsx_elements_count
-                row['hooks_used'] = profile.component_analysis.total_hooks
-            
-            summary_data.append(row)
+        summary_data = [self._summary_row(profile) for profile in self.integrated_profiles]
         
         # Save as CSV for easy analysis
         df = pd.DataFrame(summary_data)
@@ -398,45 +557,115 @@ class Base44EcosystemPipeline:
         df.to_csv(csv_path, index=False)
         logger.info(f"Saved ecosystem summary to {csv_path}")
         
-        # Generate ecosystem report
-        self._generate_ecosystem_report(df)
+        # Generate ecosystem report from the running statistics, and keep them for later merges
+        self.ecosystem_stats.save(self.output_dir / "ecosystem_stats.json")
+        self._generate_ecosystem_report()
+        
+        # Save similar-app index over the integrated scores
+        index_path = self.output_dir / "similarity_index.npz"
+        self.build_similarity_index().save(index_path)
+    
+    def _summary_row(self, profile: IntegratedAppProfile) -> Dict[str, Any]:
+        """Flat per-app row for the summary CSV and the ecosystem statistics"""
+        row = {
+            'app_name': profile.app_name,
+            'overall_complexity_score': profile.overall_complexity_score,
+            'technical_sophistication': profile.technical_sophistication,
+            'base44_integration_level': profile.base44_integration_level,
+            'user_experience_complexity': profile.user_experience_complexity,
+            'predicted_category': profile.predicted_category,
+            'business_domain': profile.business_domain,
+            'app_type': profile.app_type,
+            'category_confidence': profile.category_confidence,
+            'processing_time': profile.processing_time_seconds
+        }
+        
+        # Add key metrics from sub-analyses
+        if profile.dependency_profile:
+            row['total_dependencies'] = profile.dependency_profile.total_dependencies
+            row['uses_typescript'] = profile.dependency_profile.uses_typescript
+        
+        if profile.sdk_profile:
+            row['entities_used'] = len(profile.sdk_profile.entities_used)
+            row['api_calls_total'] = profile.sdk_profile.api_calls_total
+            row['sdk_adherence_score'] = profile.sdk_profile.sdk_adherence_score
+        
+        if profile.content_profile:
+            row['unique_words'] = profile.content_profile.unique_words
+            row['page_count'] = len(profile.content_profile.page_names)
+        
+        if profile.component_analysis:
+            row['jsx_elements'] = profile.component_analysis.jsx_elements_count
+            row['hooks_used'] = profile.component_analysis.total_hooks
+        
+        return row
+    
+    def merge_ecosystem_statistics(self, stats_file: str) -> EcosystemStatistics:
+        """
+        Fold in ecosystem statistics saved by another run over different apps
+        (e.g. a separate worker or a later batch) and regenerate the report
+        
+        Only the saved aggregates are read, not the other run's profiles.
+        """
+        self.ecosystem_stats.merge(EcosystemStatistics.load(Path(stats_file)))
+        self.ecosystem_stats.save(self.output_dir / "ecosystem_stats.json")
+        self._generate_ecosystem_report()
+        return self.ecosystem_stats
+    
+    def build_similarity_index(self) -> SimilarityIndex:
+        """Nearest-neighbor index over each app's integrated scores (all on a 0-1 scale)"""
+        vectors = np.array([[profile.overall_complexity_score,
+                             profile.technical_sophistication,
+                             profile.base44_integration_level,
+                             profile.user_experience_complexity] for profile in self.integrated_profiles],
+                           dtype=np.float32).reshape(-1, 4)
+        self.similarity_index = SimilarityIndex(metric=METRIC_EUCLIDEAN).add(
+            [profile.app_name for profile in self.integrated_profiles], vectors)
+        return self.similarity_index
+    
+    def find_similar(self, app_name: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Apps with the closest integrated scores to app_name"""
+        if self.similarity_index is None:
+            self.build_similarity_index()
+        return [{'app_name': name, 'distance': distance}
+                for name, distance in self.similarity_index.find_similar(app_name, k)]
     
-    def _generate_ecosystem_report(self, df: pd.DataFrame):
+    def _generate_ecosystem_report(self):
         """Generate comprehensive ecosystem analysis report"""
+        stats = self.ecosystem_stats
+        total = len(stats)
+        sdk_adherence = stats.columns['sdk_adherence_score']
         
         report = {
             'ecosystem_overview': {
-                'total_applications': len(df),
-                'analysis_date': self.processing_stats['analysis_date'],
-                'processing_time_seconds': self.processing_stats['total_processing_time_seconds'],
-                'successful_analyses': self.processing_stats['successful_analyses']
+                'total_applications': total,
+                'analysis_date': self.processing_stats.get('analysis_date'),
+                'processing_time_seconds': self.processing_stats.get('total_processing_time_seconds'),
+                'successful_analyses': self.processing_stats.get('successful_analyses')
             },
             'complexity_analysis': {
-                'average_overall_complexity': float(df['overall_complexity_score'].mean()),
-                'complexity_distribution': {
-                    'high_complexity': int(len(df[df['overall_complexity_score'] > 0.6])),
-                    'medium_complexity': int(len(df[(df['overall_complexity_score'] > 0.3) & (df['overall_complexity_score'] <= 0.6)])),
-                    'low_complexity': int(len(df[df['overall_complexity_score'] <= 0.3]))
-                }
+                'average_overall_complexity': stats.mean('overall_complexity_score'),
+                # Highest level first
+                'complexity_distribution': dict(reversed(stats.complexity_levels.as_dict().items()))
             },
             'technology_analysis': {
-                'average_technical_sophistication': float(df['technical_sophistication'].mean()),
-                'typescript_adoption_rate': float(df['uses_typescript'].sum() / len(df)) if 'uses_typescript' in df.columns else 0,
-                'average_dependencies': float(df['total_dependencies'].mean()) if 'total_dependencies' in df.columns else 0
+                'average_technical_sophistication': stats.mean('technical_sophistication'),
+                'typescript_adoption_rate': stats.typescript_apps / total if total else 0,
+                'average_dependencies': stats.mean('total_dependencies')
             },
             'base44_integration': {
-                'average_integration_level': float(df['base44_integration_level'].mean()),
-                'sdk_adherence_distribution': df['sdk_adherence_score'].describe().to_dict() if 'sdk_adherence_score' in df.columns else {}
+                'average_integration_level': stats.mean('base44_integration_level'),
+                'sdk_adherence_distribution': sdk_adherence.describe() if sdk_adherence.count else {}
             },
             'application_categories': {
-                'business_domains': df['business_domain'].value_counts().to_dict(),
-                'app_types': df['app_type'].value_counts().to_dict(),
-                'predicted_categories': df['predicted_category'].value_counts().to_dict()
+                'business_domains': stats.value_counts('business_domain'),
+                'app_types': stats.value_counts('app_type'),
+                'predicted_categories': stats.value_counts('predicted_category')
             },
             'user_experience': {
-                'average_ux_complexity': float(df['user_experience_complexity'].mean()),
-                'average_page_count': float(df['page_count'].mean()) if 'page_count' in df.columns else 0,
-                'average_jsx_elements': float(df['jsx_elements'].mean()) if 'jsx_elements' in df.columns else 0
+                'average_ux_complexity': stats.mean('user_experience_complexity'),
+                'average_page_count': stats.mean('page_count'),
+                'average_jsx_elements': stats.mean('jsx_elements')
             }
         }
         
@@ -13,10 +13,17 @@ import logging
 from collections import defaultdict, Counter
 import re
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import pickle
 from datetime import datetime
 
+from utils.source_guard import SourceGuard, MODE_FULL, MODE_BOUNDED, MODE_SKIPPED
+from utils.code_kernels import classify_lines, max_brace_depth
+from utils.work_queue import FileWorkQueue, FileTask, BACKEND_THREAD, BACKEND_PROCESS
+from utils.result_cache import MemoryBudgetLRU
+from utils.component_records import write_component_records
+from utils.clone_detector import CloneDetector, plan_clone_tasks, apply_reused_results
+from utils.accumulators import RunningMoments, StreamingSummary
+
 try:
     from tree_sitter import Language, Parser, Node
     import tree_sitter_javascript as tsjs
@@ -134,6 +141,8 @@ class AdvancedComponentMetrics:
     # Processing metadata
     analysis_timestamp: str = ""
     parsing_errors: List[str] = field(default_factory=list)
+    analysis_mode: str = MODE_FULL  # full, bounded, skipped
+    source_flags: List[str] = field(default_factory=list)  # minified, generated, ...
 
 @dataclass
 class ApplicationArchitecture:
@@ -170,15 +179,23 @@ class ApplicationArchitecture:
     # Code quality metrics
     overall_quality_score: float = 0.0
     technical_debt_indicators: Dict[str, int] = field(default_factory=dict)
+    
+    # Files routed away from the full analysis path
+    bounded_files: List[str] = field(default_factory=list)
+    skipped_files: List[str] = field(default_factory=list)
 
 class AdvancedASTAnalyzer:
     """Advanced multi-dimensional AST analyzer with ML feature extraction"""
     
-    def __init__(self):
+    def __init__(self, source_guard: Optional[SourceGuard] = None,
+                 cache_max_bytes: int = 128 * 1024 * 1024):
         self.parser = None
         self.language = None
         self.setup_parser()
         
+        # Minified/generated file detection and per-file time budget
+        self.source_guard = source_guard or SourceGuard()
+        
         # Enhanced pattern recognition
         self.react_hooks = {
             'useState', 'useEffect', 'useContext', 'useReducer', 'useCallback',
@@ -218,8 +235,21 @@ class AdvancedASTAnalyzer:
             'jsx_expression_container': 0.5
         }
         
-        # Cache for performance
-        self.analysis_cache = {}
+        # Cache for performance (LRU bounded by an approximate memory budget)
+        self.analysis_cache = MemoryBudgetLRU(max_bytes=cache_max_bytes)
+    
+    def __getstate__(self):
+        """Pickle without the parser and cache (rebuilt in process-pool workers)"""
+        state = self.__dict__.copy()
+        state['parser'] = None
+        state['language'] = None
+        state['analysis_cache'] = self.analysis_cache.empty_copy()
+        return state
+    
+    def __setstate__(self, state):
+        """Restore state and re-create the Tree-sitter parser"""
+        self.__dict__.update(state)
+        self.setup_parser()
         
     def setup_parser(self):
         """Initialize Tree-sitter parser with error handling"""
@@ -243,9 +273,10 @@ class AdvancedASTAnalyzer:
         file_hash = hashlib.md5(content.encode()).hexdigest()
         cache_key = f"{file_path}:{file_hash}"
         
-        if cache_key in self.analysis_cache:
+        cached = self.analysis_cache.get(cache_key)
+        if cached is not None:
             logger.debug(f"Using cached analysis for {file_path}")
-            return self.analysis_cache[cache_key]
+            return cached
         
         metrics = AdvancedComponentMetrics(
             file_path=file_path,
@@ -253,26 +284,51 @@ class AdvancedASTAnalyzer:
             analysis_timestamp=datetime.now().isoformat()
         )
         
+        # Route minified, generated and oversized sources away from the full path
+        source_profile = self.source_guard.inspect(file_path, content)
+        metrics.analysis_mode = source_profile.mode
+        metrics.source_flags = source_profile.flags
+        
+        if source_profile.mode == MODE_SKIPPED:
+            metrics.total_lines = source_profile.line_count
+            self.analysis_cache.put(cache_key, metrics)
+            return metrics
+        
+        if source_profile.mode == MODE_BOUNDED:
+            content = self.source_guard.bound_content(content)
+        
         # Basic line analysis
         self._analyze_lines(content, metrics)
         
-        if self.parser is None:
-            # Fallback analysis
+        if self.parser is None or source_profile.mode == MODE_BOUNDED:
+            # Fallback analysis (also the bounded path for minified/generated files)
             self._regex_fallback_analysis(content, metrics)
         else:
+            deadline = self.source_guard.start_budget()
             try:
                 tree = self.parser.parse(bytes(content, "utf8"))
                 root_node = tree.root_node
                 
                 # Comprehensive AST analysis
-                self._analyze_imports(root_node, content, metrics)
-                self._analyze_components_and_jsx(root_node, content, metrics)
-                self._analyze_hooks_and_react_patterns(root_node, content, metrics)
-                self._analyze_functions_and_complexity(root_node, content, metrics)
-                self._analyze_data_structures(root_node, content, metrics)
-                self._analyze_api_patterns(root_node, content, metrics)
-                self._analyze_code_quality(root_node, content, metrics)
-                self._extract_semantic_features(root_node, content, metrics)
+                ast_passes = [
+                    self._analyze_imports,
+                    self._analyze_components_and_jsx,
+                    self._analyze_hooks_and_react_patterns,
+                    self._analyze_functions_and_complexity,
+                    self._analyze_data_structures,
+                    self._analyze_api_patterns,
+                    self._analyze_code_quality,
+                    self._extract_semantic_features,
+                ]
+                for ast_pass in ast_passes:
+                    if deadline.expired():
+                        metrics.analysis_mode = MODE_BOUNDED
+                        metrics.source_flags.append('time_budget_exceeded')
+                        metrics.parsing_errors.append(
+                            f"Time budget of {deadline.budget_seconds}s exceeded for {file_path} "
+                            f"before {ast_pass.__name__}")
+                        break
+                    ast_pass(root_node, content, metrics)
                 
                 # Calculate derived metrics
                 self._calculate_complexity_metrics(metrics)
@@ -286,25 +342,19 @@ class AdvancedASTAnalyzer:
                 self._regex_fallback_analysis(content, metrics)
         
         # Cache the result
-        self.analysis_cache[cache_key] = metrics
+        self.analysis_cache.put(cache_key, metrics)
         return metrics
     
     def _analyze_lines(self, content: str, metrics: AdvancedComponentMetrics):
         """Analyze different types of lines in the code"""
-        lines = content.splitlines()
-        metrics.total_lines = len(lines)
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                metrics.blank_lines += 1
-            elif stripped.startswith('//') or stripped.startswith('/*'):
-                metrics.comment_lines += 1
-            elif any(jsx_indicator in stripped for jsx_indicator in ['<', '/>', 'jsx', 'JSX']):
-                metrics.jsx_lines += 1
-                metrics.code_lines += 1
-            else:
-                metrics.code_lines += 1
+        counts = classify_lines(content,
+                                comment_prefixes=('//', '/*'),
+                                jsx_indicators=('<', '/>', 'jsx', 'JSX'))
+        metrics.total_lines = counts.total_lines
+        metrics.blank_lines += counts.blank_lines
+        metrics.comment_lines += counts.comment_lines
+        metrics.code_lines += counts.code_lines
+        metrics.jsx_lines += counts.jsx_lines
     
     def _analyze_imports(self, node: Node, content: str, metrics: AdvancedComponentMetrics):
         """Enhanced import analysis with categorization"""
@@ -556,16 +606,49 @@ class AdvancedASTAnalyzer:
             if any(keyword.lower() in content.lower() for keyword in keywords):
                 metrics.design_patterns.append(pattern)
     
-    def analyze_application_architecture(self, app_path: str) -> ApplicationArchitecture:
-        """Analyze the overall architecture of a Base44 application"""
-        app_name = Path(app_path).name
-        architecture = ApplicationArchitecture(app_name=app_name)
-        
-        # Find all component files
+    def _analyze_file(self, file_path: str) -> AdvancedComponentMetrics:
+        """Read and analyze a single file (work queue entry point)"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return self.analyze_component(file_path, content)
+    
+    def _find_component_files(self, app_path: str) -> List[Path]:
+        """Find all component files of an application"""
         component_files = []
         for ext in ['.jsx', '.js', '.tsx', '.ts']:
             component_files.extend(Path(app_path).rglob(f"*{ext}"))
+        return component_files
+    
+    def _run_work_queue(self, tasks: List[FileTask], backend: str,
+                        max_workers: Optional[int]) -> Tuple[Dict[str, List[AdvancedComponentMetrics]], Dict[str, Any]]:
+        """Drain file tasks through one shared queue and return results grouped by task group"""
+        queue = FileWorkQueue(backend=backend, max_workers=max_workers)
+        grouped = queue.run(tasks, self._analyze_file)
+        
+        # Results computed in worker processes never touched this instance's cache
+        if backend == BACKEND_PROCESS:
+            for component_metrics in grouped.values():
+                for metrics in component_metrics:
+                    self.analysis_cache.put(f"{metrics.file_path}:{metrics.file_hash}", metrics)
+        
+        stats = asdict(queue.last_run_stats)
+        stats.pop('errors')
+        return grouped, stats
+    
+    def analyze_application_architecture(self, app_path: str, backend: str = BACKEND_THREAD,
+                                         max_workers: Optional[int] = None) -> ApplicationArchitecture:
+        """Analyze the overall architecture of a Base44 application"""
+        component_files = self._find_component_files(app_path)
+        tasks = [FileTask(group=app_path, file_path=str(file_path)) for file_path in component_files]
+        grouped, _ = self._run_work_queue(tasks, backend, max_workers)
         
+        return self._build_architecture(app_path, component_files, grouped.get(app_path, []))
+    
+    def _build_architecture(self, app_path: str, component_files: List[Path],
+                            component_metrics: List[AdvancedComponentMetrics]) -> ApplicationArchitecture:
+        """Aggregate per-file metrics into the application architecture"""
+        app_name = Path(app_path).name
+        architecture = ApplicationArchitecture(app_name=app_name)
         architecture.total_files = len(component_files)
         
         # Analyze directory structure
@@ -581,34 +664,20 @@ class AdvancedASTAnalyzer:
             architecture.depth_analysis[depth] = \
                 architecture.depth_analysis.get(depth, 0) + 1
         
-        # Analyze individual components and aggregate metrics
+        # Aggregate individual component metrics
         total_complexity = 0
-        component_metrics = []
         
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_file = {}
+        for metrics in component_metrics:
+            total_complexity += metrics.cognitive_complexity
             
-            for file_path in component_files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    future = executor.submit(self.analyze_component, str(file_path), content)
-                    future_to_file[future] = file_path
-                except Exception as e:
-                    logger.warning(f"Could not read {file_path}: {e}")
+            if metrics.analysis_mode == MODE_BOUNDED:
+                architecture.bounded_files.append(metrics.file_path)
+            elif metrics.analysis_mode == MODE_SKIPPED:
+                architecture.skipped_files.append(metrics.file_path)
             
-            for future in as_completed(future_to_file):
-                try:
-                    metrics = future.result()
-                    component_metrics.append(metrics)
-                    total_complexity += metrics.cognitive_complexity
-                    
-                    # Aggregate technology usage
-                    architecture.frameworks_used.update(metrics.third_party_imports)
-                    architecture.base44_features_used.update(metrics.base44_imports)
-                    
-                except Exception as e:
-                    logger.error(f"Analysis failed for {future_to_file[future]}: {e}")
+            # Aggregate technology usage
+            architecture.frameworks_used.update(metrics.third_party_imports)
+            architecture.base44_features_used.update(metrics.base44_imports)
         
         # Calculate aggregated metrics
         if component_metrics:
@@ -641,8 +710,29 @@ class AdvancedASTAnalyzer:
         
         return architecture
     
-    def batch_analyze_templates(self, templates_dir: str, output_file: str = None) -> Dict[str, Any]:
-        """Analyze all Base44 templates in batch with progress tracking"""
+    def batch_analyze_templates(self, templates_dir: str, output_file: str = None,
+                                backend: str = BACKEND_THREAD,
+                                max_workers: Optional[int] = None,
+                                components_file: Optional[str] = None,
+                                dedupe_clones: bool = False,
+                                clone_threshold: float = 0.8) -> Dict[str, Any]:
+        """
+        Analyze all Base44 templates in batch with progress tracking
+        
+        Files from every template go through one shared work queue instead of nested
+        per-template pools; architectures are aggregated after the queue has drained.
+        
+        Args:
+            templates_dir: Directory containing the template directories
+            output_file: Optional JSON path for the results
+            backend: Work queue backend, 'thread' or 'process'
+            max_workers: Upper bound on workers (auto-tuned from per-file cost)
+            components_file: Optional JSON-lines path for the per-file metrics
+                (one record per component, see utils.component_records)
+            dedupe_clones: Group near-duplicate templates (MinHash) and analyze only
+                the files of each clone that differ from its family representative
+            clone_threshold: Minimum estimated Jaccard similarity between clones
+        """
         results = {
             'analysis_metadata': {
                 'timestamp': datetime.now().isoformat(),
@@ -662,26 +752,53 @@ class AdvancedASTAnalyzer:
         
         logger.info(f"Starting batch analysis of {len(template_dirs)} templates...")
         
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_to_template = {}
-            
-            for template_dir in template_dirs:
-                future = executor.submit(self.analyze_application_architecture, str(template_dir))
-                future_to_template[future] = template_dir.name
+        # One global file queue across all templates
+        template_files = {template_dir.name: self._find_component_files(str(template_dir))
+                          for template_dir in template_dirs}
+        if dedupe_clones:
+            template_paths = {template_dir.name: template_dir for template_dir in template_dirs}
+            detector = CloneDetector(threshold=clone_threshold)
+            families = detector.detect(template_paths)
+            tasks, reused = plan_clone_tasks(families, template_files, template_paths, detector.manifests)
+        else:
+            tasks = [FileTask(group=template_name, file_path=str(file_path))
+                     for template_name, component_files in template_files.items()
+                     for file_path in component_files]
+        
+        grouped, queue_stats = self._run_work_queue(tasks, backend, max_workers)
+        results['analysis_metadata']['work_queue'] = queue_stats
+        
+        # Clone files identical to their representative's copy reuse its result
+        if dedupe_clones:
+            results['analysis_metadata']['clone_detection'] = {
+                'threshold': clone_threshold,
+                'families': sum(1 for family in families if len(family.members) > 1),
+                'files_analyzed': len(tasks),
+                'files_reused': apply_reused_results(grouped, reused, template_files)
+            }
+            results['clone_families'] = [asdict(family) for family in families if len(family.members) > 1]
+        cache_stats = self.analysis_cache.stats()
+        results['analysis_metadata']['result_cache'] = dict(asdict(cache_stats), hit_rate=cache_stats.hit_rate)
+        
+        # Per-file metrics for component-level consumers (e.g. the ML dataset)
+        if components_file:
+            write_component_records(components_file, grouped)
+            results['analysis_metadata']['components_file'] = components_file
+        
+        for i, template_dir in enumerate(template_dirs, 1):
+            template_name = template_dir.name
             
-            for i, future in enumerate(as_completed(future_to_template), 1):
-                template_name = future_to_template[future]
+            try:
+                architecture = self._build_architecture(str(template_dir), template_files[template_name],
+                                                        grouped.get(template_name, []))
+                results['applications'][template_name] = asdict(architecture)
+                results['analysis_metadata']['successful_analyses'] += 1
+                
+                logger.info(f"Completed {i}/{len(template_dirs)}: {template_name}")
                 
-                try:
-                    architecture = future.result()
-                    results['applications'][template_name] = asdict(architecture)
-                    results['analysis_metadata']['successful_analyses'] += 1
-                    
-                    logger.info(f"Completed {i}/{len(template_dirs)}: {template_name}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to analyze {template_name}: {e}")
-                    results['analysis_metadata']['failed_analyses'] += 1
+            except Exception as e:
+                logger.error(f"Failed to analyze {template_name}: {e}")
+                results['analysis_metadata']['failed_analyses'] += 1
         
         # Generate aggregated insights
         self._generate_aggregated_insights(results)
@@ -709,15 +826,15 @@ class AdvancedASTAnalyzer:
         }
         
         # Complexity patterns
-        all_complexities = [app['average_complexity'] for app in applications.values() 
-                           if app['average_complexity'] > 0]
+        complexities = StreamingSummary.of(app['average_complexity'] for app in applications.values()
+                                           if app['average_complexity'] > 0)
         
-        if all_complexities:
+        if complexities.count:
             insights['complexity_patterns'] = {
-                'mean_complexity': np.mean(all_complexities),
-                'std_complexity': np.std(all_complexities),
-                'median_complexity': np.median(all_complexities),
-                'complexity_range': [min(all_complexities), max(all_complexities)]
+                'mean_complexity': complexities.moments.mean,
+                'std_complexity': complexities.moments.std(ddof=0),
+                'median_complexity': complexities.digest.median(),
+                'complexity_range': [complexities.moments.minimum, complexities.moments.maximum]
             }
         
         # Technology adoption
@@ -732,12 +849,18 @@ class AdvancedASTAnalyzer:
         insights['architectural_patterns'] = dict(arch_patterns)
         
         # Base44 usage patterns
-        base44_scores = [app['base44_integration_score'] for app in applications.values()]
-        if base44_scores:
+        base44_scores = RunningMoments()
+        high_integration = low_integration = 0
+        for app in applications.values():
+            score = app['base44_integration_score']
+            base44_scores.add(score)
+            high_integration += score > 0.7
+            low_integration += score < 0.3
+        if base44_scores.count:
             insights['base44_usage_patterns'] = {
-                'average_integration': np.mean(base44_scores),
-                'high_integration_apps': sum(1 for score in base44_scores if score > 0.7),
-                'low_integration_apps': sum(1 for score in base44_scores if score < 0.3)
+                'average_integration': base44_scores.mean,
+                'high_integration_apps': high_integration,
+                'low_integration_apps': low_integration
             }
         
         results['aggregated_insights'] = insights
@@ -867,6 +990,9 @@ class AdvancedASTAnalyzer:
         
         metrics.cyclomatic_complexity = 1 + if_statements + for_loops + while_loops
         metrics.cognitive_complexity = metrics.cyclomatic_complexity
+        
+        # Nesting depth approximated from brace structure (no AST available)
+        metrics.nesting_depth = max(metrics.nesting_depth, max_brace_depth(content))
 
 
 def main():
@@ -5,11 +5,14 @@ Extracts user-facing textual content from JSX files for NLP analysis and taxonom
 
 import re
 import json
-from typing import Dict, List, Set, Optional, Tuple
+from typing import Dict, List, Set, Optional, Tuple, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 import logging
 
+from utils.source_guard import SourceGuard, MODE_BOUNDED, MODE_SKIPPED
+from utils.parallel_executor import ParallelExecutor, BACKEND_PROCESS, find_application_dirs
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,6 +44,8 @@ class AppContent:
     total_text_length: int = 0
     unique_words: int = 0
     files_processed: int = 0
+    files_bounded: List[str] = field(default_factory=list)  # Minified/generated, cheap path only
+    files_skipped: List[str] = field(default_factory=list)  # Oversized, not extracted
     
     # Categorization hints
     app_category_hints: List[str] = field(default_factory=list)  # Hints about app category
@@ -50,7 +55,10 @@ class AppContent:
 class ContentExtractor:
     """Main content extractor for Base44 applications"""
     
-    def __init__(self):
+    def __init__(self, source_guard: Optional[SourceGuard] = None):
+        # Minified/generated file detection and per-file time budget
+        self.source_guard = source_guard or SourceGuard()
+        
         # Patterns for different types of content
         self.jsx_patterns = {
             'button_text': [
@@ -207,6 +215,19 @@ class ContentExtractor:
     def _extract_file_content(self, file_content: str, file_path: Path, content: AppContent):
         """Extract content from a single file"""
         
+        # Minified/generated files skip the DOTALL JSX patterns; oversized files are skipped
+        source_profile = self.source_guard.inspect(str(file_path), file_content)
+        if source_profile.mode == MODE_SKIPPED:
+            content.files_skipped.append(str(file_path))
+            return
+        
+        bounded = source_profile.mode == MODE_BOUNDED
+        if bounded:
+            content.files_bounded.append(str(file_path))
+            file_content = self.source_guard.bound_content(file_content)
+        
+        deadline = self.source_guard.start_budget()
+        
         # Extract component name from filename
         component_name = file_path.stem
         if component_name not in ['index', 'App', 'main']:
@@ -218,6 +239,8 @@ class ContentExtractor:
         
         # Extract different types of text content using regex patterns
         for content_type, patterns in self.jsx_patterns.items():
+            if bounded or deadline.expired():
+                break
             for pattern in patterns:
                 matches = re.findall(pattern, file_content, re.DOTALL | re.IGNORECASE)
                 
@@ -238,6 +261,13 @@ class ContentExtractor:
                         elif content_type == 'alt_text':
                             content.descriptions.append(text)
         
+        if deadline.expired():
+            logger.warning(f"Time budget of {deadline.budget_seconds}s exceeded for {file_path}, "
+                           f"skipping remaining extraction")
+            if not bounded:
+                content.files_bounded.append(str(file_path))
+            return
+        
         # Extract string literals that might be user-facing text
         string_literals = re.findall(r'["\']([^"\']{3,50})["\']', file_content)
         for literal in string_literals:
@@ -389,23 +419,42 @@ class ContentExtractor:
         else:
             content.app_category_hints.append('simple_app')
     
-    def extract_multiple_applications(self, base_path: str) -> List[AppContent]:
-        """Extract content from multiple applications"""
-        base_path_obj = Path(base_path)
-        contents = []
+    def extract_multiple_applications(self, base_path: str, backend: str = BACKEND_PROCESS,
+                                      max_workers: Optional[int] = None,
+                                      chunk_size: Optional[int] = None) -> List[AppContent]:
+        """
+        Extract content from multiple applications
         
-        if not base_path_obj.exists():
-            logger.error(f"Base path {base_path} does not exist")
-            return contents
+        Args:
+            base_path: Directory containing the application directories
+            backend: Executor backend, 'serial', 'thread' or 'process' (all cores)
+            max_workers: Worker count (defaults to the CPU count)
+            chunk_size: Applications per process-pool task
+            
+        Returns:
+            Results in directory listing order
+        """
+        app_dirs = find_application_dirs(base_path)
+        if app_dirs is None:
+            return []
         
-        for app_dir in base_path_obj.iterdir():
-            if app_dir.is_dir() and not app_dir.name.startswith('.'):
-                content = self.extract_application_content(str(app_dir), app_dir.name)
-                contents.append(content)
+        executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=chunk_size)
+        contents = executor.map(self.extract_application_content, app_dirs)
         
         logger.info(f"Extracted content from {len(contents)} applications")
         return contents
     
+    def stream_extract_multiple_applications(self, base_path: str, backend: str = BACKEND_PROCESS,
+                                             max_workers: Optional[int] = None,
+                                             chunk_size: Optional[int] = None) -> Iterator[AppContent]:
+        """Extract content from multiple applications, yielding each result as soon as it completes"""
+        app_dirs = find_application_dirs(base_path)
+        if app_dirs is None:
+            return
+        
+        executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=chunk_size)
+        yield from executor.imap_unordered(self.extract_application_content, app_dirs)
+    
     def export_content(self, contents: List[AppContent], output_path: str):
         """Export extracted content to JSON file for NLP processing"""
         output_data = []
@@ -428,6 +477,8 @@ class ContentExtractor:
                 'total_text_length': content.total_text_length,
                 'unique_words': content.unique_words,
                 'files_processed': content.files_processed,
+                'files_bounded': content.files_bounded,
+                'files_skipped': content.files_skipped,
                 'app_category_hints': content.app_category_hints,
                 'business_domain': content.business_domain,
                 'complexity_indicators': content.complexity_indicators
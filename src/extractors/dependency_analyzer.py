@@ -5,12 +5,20 @@ Analyzes package.json and components.json to understand technical complexity and
 
 import json
 import re
-from typing import Dict, List, Set, Optional, Tuple
+import sys
+from typing import Dict, List, Set, Optional, Tuple, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 from collections import Counter
 import logging
 
+from utils.parallel_executor import ParallelExecutor, BACKEND_PROCESS, find_application_dirs
+from utils.semver import min_satisfying_version, parse_version, satisfies
+from utils.package_index import PackageMetadataIndex
+from utils.pattern_trie import PatternTrie
+from extractors.lockfile_analyzer import LockfileAnalyzer
+from extractors.dependency_matrix import DependencyMatrix
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -62,11 +70,32 @@ class DependencyProfile:
     uses_testing: bool = False
     uses_bundler: bool = False
     has_proper_scripts: bool = False
+    
+    # Lockfile analysis (resolved transitive tree)
+    lockfile_type: str = ""  # npm, pnpm, yarn; empty when no lockfile
+    resolved_packages: int = 0  # Distinct name@version pairs
+    transitive_dependencies: int = 0
+    duplicate_packages: int = 0
+    duplicate_versions: int = 0
+    dependency_tree_depth: int = 0
+    
+    # Registry metadata (offline package index)
+    registry_checked_dependencies: int = 0  # Dependencies found in the index
+    outdated_dependencies: List[str] = field(default_factory=list)  # Range excludes the latest release
+    deprecated_dependencies: List[str] = field(default_factory=list)
+    stale_dependencies: List[str] = field(default_factory=list)  # No release for STALE_AFTER_DAYS before the snapshot
 
 class DependencyAnalyzer:
     """Main dependency analyzer for Base44 applications"""
     
-    def __init__(self):
+    STALE_AFTER_DAYS = 730
+    
+    def __init__(self, package_index_path: Optional[str] = None):
+        """
+        Args:
+            package_index_path: Offline registry metadata index (see utils.package_index);
+                when given, every dependency is scored against it
+        """
         # Dependency categorization patterns
         self.dependency_categories = {
             'ui_libraries': [
@@ -107,6 +136,10 @@ class DependencyAnalyzer:
             ]
         }
         
+        # Compiled categorization rules and corpus-wide name -> category cache
+        self._category_trie = self._build_category_trie()
+        self._category_cache: Dict[str, Optional[str]] = {}
+        
         # Modern versions for scoring
         self.modern_versions = {
             'react': '18.0.0',
@@ -122,6 +155,12 @@ class DependencyAnalyzer:
             'moderate': ['lint', 'test', 'preview', 'format'],
             'complex': ['analyze', 'storybook', 'e2e', 'deploy', 'docker']
         }
+        
+        # Streaming lockfile reader for transitive dependency metrics
+        self.lockfile_analyzer = LockfileAnalyzer()
+        
+        # Memory-mapped registry snapshot (optional)
+        self.package_index = PackageMetadataIndex(package_index_path) if package_index_path else None
     
     def analyze_application(self, app_path: str, app_name: str = None) -> DependencyProfile:
         """
@@ -204,26 +243,92 @@ class DependencyAnalyzer:
             profile.uses_bundler = any(tool in all_deps for tool in ['vite', 'webpack', 'rollup', 'parcel'])
             profile.has_proper_scripts = len(profile.available_scripts) >= 3
             
+            # Transitive dependency tree from the lockfile
+            self._analyze_lockfile(app_path, all_deps.keys(), profile)
+            
+            # Latest/deprecated/stale status from the offline registry snapshot
+            self._analyze_registry_metadata(all_deps, profile)
+            
         except (json.JSONDecodeError, FileNotFoundError) as e:
             logger.warning(f"Could not parse package.json for {profile.app_name}: {e}")
     
+    def _analyze_lockfile(self, app_path: Path, direct_dependencies, profile: DependencyProfile):
+        """Analyze package-lock.json, pnpm-lock.yaml or yarn.lock (streamed)"""
+        lockfile_metrics = self.lockfile_analyzer.analyze(app_path, direct_dependencies)
+        if lockfile_metrics is None:
+            return
+        
+        profile.lockfile_type = lockfile_metrics.lockfile_type
+        profile.resolved_packages = lockfile_metrics.total_packages
+        profile.transitive_dependencies = lockfile_metrics.transitive_dependencies
+        profile.duplicate_packages = lockfile_metrics.duplicate_packages
+        profile.duplicate_versions = lockfile_metrics.duplicate_versions
+        profile.dependency_tree_depth = lockfile_metrics.max_depth
+    
+    def _analyze_registry_metadata(self, dependencies: Dict[str, str], profile: DependencyProfile):
+        """Score every dependency against the package index in one batch lookup"""
+        if self.package_index is None or not dependencies:
+            return
+        
+        registry = self.package_index.lookup_batch(dependencies)
+        stale_before = self.package_index.snapshot_time - self.STALE_AFTER_DAYS * 86400
+        
+        for dep_name in sorted(registry):
+            metadata = registry[dep_name]
+            profile.registry_checked_dependencies += 1
+            
+            if metadata.deprecated:
+                profile.deprecated_dependencies.append(dep_name)
+            if metadata.modified and metadata.modified < stale_before:
+                profile.stale_dependencies.append(dep_name)
+            
+            version = str(dependencies[dep_name])
+            minimum = min_satisfying_version(version)
+            latest = parse_version(metadata.latest_version)
+            if (minimum is not None and latest is not None and minimum < latest
+                    and not satisfies(metadata.latest_version, version)):
+                profile.outdated_dependencies.append(dep_name)
+    
     def _categorize_dependencies(self, dependencies: Dict[str, str], profile: DependencyProfile):
         """Categorize dependencies by their purpose"""
         
         for dep_name, version in dependencies.items():
-            categorized = False
+            # Identical range strings (e.g. '^18.2.0') are shared across the corpus
+            if isinstance(version, str):
+                version = sys.intern(version)
             
-            for category, patterns in self.dependency_categories.items():
-                if any(pattern in dep_name for pattern in patterns):
-                    category_dict = getattr(profile, category)
-                    category_dict[dep_name] = version
-                    categorized = True
-                    break
+            category = self._categorize_name(dep_name)
+            if category is not None:
+                getattr(profile, category)[dep_name] = version
             
             # If not categorized, it's a utility library
-            if not categorized and not dep_name.startswith('@types/'):
+            elif not dep_name.startswith('@types/'):
                 profile.utility_libraries[dep_name] = version
     
+    def _build_category_trie(self) -> PatternTrie:
+        """
+        Compile dependency_categories into a single pattern trie
+        
+        Precedence is explicit: the longest (most specific) matching pattern wins, so
+        'vitest' is a testing library rather than 'vite' and '@tanstack/react-query' is
+        state management rather than 'react'; equal lengths fall back to category order.
+        """
+        trie = PatternTrie()
+        category_count = len(self.dependency_categories)
+        
+        for category_index, (category, patterns) in enumerate(self.dependency_categories.items()):
+            for pattern in patterns:
+                trie.add(pattern, category, priority=(len(pattern), category_count - category_index))
+        
+        trie.build()
+        return trie
+    
+    def _categorize_name(self, dep_name: str) -> Optional[str]:
+        """Category of a package name (computed once per distinct name)"""
+        if dep_name not in self._category_cache:
+            self._category_cache[dep_name] = self._category_trie.best_match(dep_name)
+        return self._category_cache[dep_name]
+    
     def _analyze_components_json(self, app_path: Path, profile: DependencyProfile):
         """Analyze components.json file (shadcn/ui configuration)"""
         components_json_path = app_path / "components.json"
@@ -301,14 +406,17 @@ class DependencyAnalyzer:
             for dep_dict in [profile.ui_libraries, profile.build_tools, profile.styling_tools]:
                 if lib in dep_dict:
                     modern_checks += 1
-                    # Simple version comparison (could be more sophisticated)
-                    current_version = dep_dict[lib].replace('^', '').replace('~', '')
-                    if self._is_version_modern(current_version, modern_version):
+                    if self._is_version_modern(dep_dict[lib], modern_version):
                         modernity_score += 1
                     break
         
         profile.tech_stack_modernity = modernity_score / max(modern_checks, 1)
         
+        # With a registry snapshot, modernity covers every dependency found in it
+        if profile.registry_checked_dependencies:
+            behind = set(profile.outdated_dependencies) | set(profile.deprecated_dependencies)
+            profile.tech_stack_modernity = 1.0 - len(behind) / profile.registry_checked_dependencies
+        
         # Configuration complexity
         config_indicators = [
             profile.uses_typescript,
@@ -331,47 +439,62 @@ class DependencyAnalyzer:
             profile.build_complexity = "simple"
     
     def _is_version_modern(self, current: str, modern: str) -> bool:
-        """Simple version comparison - could be more sophisticated"""
-        try:
-            current_parts = [int(x) for x in current.split('.')]
-            modern_parts = [int(x) for x in modern.split('.')]
-            
-            # Compare major.minor
-            return (current_parts[0] > modern_parts[0] or 
-                   (current_parts[0] == modern_parts[0] and current_parts[1] >= modern_parts[1]))
-        except (ValueError, IndexError):
+        """
+        Check whether a version range only admits versions at or above the modern baseline
+        
+        The range is reduced to its minimum satisfying version (memoized per distinct
+        range string); dist-tags, URLs and unsatisfiable ranges are not modern.
+        """
+        minimum = min_satisfying_version(current)
+        baseline = parse_version(modern)
+        if minimum is None or baseline is None:
             return False
+        return minimum >= baseline
     
-    def analyze_multiple_applications(self, base_path: str) -> List[DependencyProfile]:
-        """Analyze dependencies for multiple applications"""
-        base_path_obj = Path(base_path)
-        profiles = []
+    def analyze_multiple_applications(self, base_path: str, backend: str = BACKEND_PROCESS,
+                                      max_workers: Optional[int] = None,
+                                      chunk_size: Optional[int] = None) -> List[DependencyProfile]:
+        """
+        Analyze dependencies for multiple applications
         
-        if not base_path_obj.exists():
-            logger.error(f"Base path {base_path} does not exist")
-            return profiles
+        Args:
+            base_path: Directory containing the application directories
+            backend: Executor backend, 'serial', 'thread' or 'process' (all cores)
+            max_workers: Worker count (defaults to the CPU count)
+            chunk_size: Applications per process-pool task
+            
+        Returns:
+            Results in directory listing order
+        """
+        app_dirs = find_application_dirs(base_path)
+        if app_dirs is None:
+            return []
         
-        for app_dir in base_path_obj.iterdir():
-            if app_dir.is_dir() and not app_dir.name.startswith('.'):
-                profile = self.analyze_application(str(app_dir), app_dir.name)
-                profiles.append(profile)
+        executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=chunk_size)
+        profiles = executor.map(self.analyze_application, app_dirs)
         
         logger.info(f"Analyzed dependencies for {len(profiles)} applications")
         return profiles
     
+    def stream_analyze_multiple_applications(self, base_path: str, backend: str = BACKEND_PROCESS,
+                                             max_workers: Optional[int] = None,
+                                             chunk_size: Optional[int] = None) -> Iterator[DependencyProfile]:
+        """Analyze dependencies for multiple applications, yielding each result as soon as it completes"""
+        app_dirs = find_application_dirs(base_path)
+        if app_dirs is None:
+            return
+        
+        executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=chunk_size)
+        yield from executor.imap_unordered(self.analyze_application, app_dirs)
+    
     def generate_ecosystem_report(self, profiles: List[DependencyProfile]) -> Dict:
         """Generate ecosystem-wide dependency analysis report"""
         
         # Aggregate statistics
         total_apps = len(profiles)
         
-        # Most common dependencies
-        all_dependencies = Counter()
-        for profile in profiles:
-            all_deps = {**profile.ui_libraries, **profile.build_tools, 
-                       **profile.styling_tools, **profile.utility_libraries}
-            for dep in all_deps.keys():
-                all_dependencies[dep] += 1
+        # Sparse app x package incidence matrix shared by all adoption statistics
+        matrix = self.build_dependency_matrix(profiles)
         
         # Technology adoption rates
         tech_adoption = {
@@ -391,33 +514,58 @@ class DependencyAnalyzer:
         # Base44 SDK adoption
         base44_adoption = sum(1 for p in profiles if p.base44_dependencies) / total_apps
         
+        # Transitive tree size (only apps that ship a lockfile)
+        locked_profiles = [p for p in profiles if p.lockfile_type]
+        
+        # Registry health (only apps scored against the package index)
+        checked_profiles = [p for p in profiles if p.registry_checked_dependencies]
+        
         report = {
             'ecosystem_overview': {
                 'total_applications': total_apps,
                 'average_dependencies_per_app': sum(p.total_dependencies for p in profiles) / total_apps,
                 'average_complexity_score': avg_complexity,
-                'base44_sdk_adoption_rate': base44_adoption
+                'base44_sdk_adoption_rate': base44_adoption,
+                'apps_with_lockfile': len(locked_profiles),
+                'average_transitive_dependencies': (
+                    sum(p.transitive_dependencies for p in locked_profiles) / len(locked_profiles)
+                    if locked_profiles else 0.0)
             },
-            'most_common_dependencies': dict(all_dependencies.most_common(20)),
+            'most_common_dependencies': matrix.top_packages(
+                20, ['ui_libraries', 'build_tools', 'styling_tools', 'utility_libraries']),
             'technology_adoption_rates': tech_adoption,
             'build_complexity_distribution': dict(build_complexity_dist),
-            'top_ui_libraries': self._get_top_category_items(profiles, 'ui_libraries'),
-            'top_styling_tools': self._get_top_category_items(profiles, 'styling_tools'),
-            'top_build_tools': self._get_top_category_items(profiles, 'build_tools'),
+            'top_ui_libraries': self._get_top_category_items(matrix, 'ui_libraries'),
+            'top_styling_tools': self._get_top_category_items(matrix, 'styling_tools'),
+            'top_build_tools': self._get_top_category_items(matrix, 'build_tools'),
+            'dependency_co_occurrence': matrix.top_pairs(top_n=20, min_support=max(2, total_apps // 100)),
+            'version_spread': matrix.version_spread(top_n=10),
         }
         
+        if checked_profiles:
+            report['registry_health'] = {
+                'apps_checked': len(checked_profiles),
+                'average_outdated_share': sum(
+                    len(p.outdated_dependencies) / p.registry_checked_dependencies
+                    for p in checked_profiles) / len(checked_profiles),
+                'apps_with_deprecated_dependencies': sum(1 for p in checked_profiles if p.deprecated_dependencies),
+                'most_outdated_dependencies': dict(Counter(
+                    dep for p in checked_profiles for dep in p.outdated_dependencies).most_common(10)),
+                'most_deprecated_dependencies': dict(Counter(
+                    dep for p in checked_profiles for dep in p.deprecated_dependencies).most_common(10)),
+                'most_stale_dependencies': dict(Counter(
+                    dep for p in checked_profiles for dep in p.stale_dependencies).most_common(10))
+            }
+        
         return report
     
-    def _get_top_category_items(self, profiles: List[DependencyProfile], category: str) -> Dict[str, int]:
+    def build_dependency_matrix(self, profiles: List[DependencyProfile]) -> DependencyMatrix:
+        """Build the sparse app x package incidence matrix over all dependency categories"""
+        return DependencyMatrix(profiles, list(self.dependency_categories))
+    
+    def _get_top_category_items(self, matrix: DependencyMatrix, category: str) -> Dict[str, int]:
         """Get top items in a specific dependency category"""
-        category_counter = Counter()
-        
-        for profile in profiles:
-            category_dict = getattr(profile, category, {})
-            for item in category_dict.keys():
-                category_counter[item] += 1
-        
-        return dict(category_counter.most_common(10))
+        return matrix.top_packages(10, [category])
     
     def export_profiles(self, profiles: List[DependencyProfile], output_path: str):
         """Export dependency profiles to JSON"""
@@ -450,7 +598,17 @@ class DependencyAnalyzer:
                 'uses_linting': profile.uses_linting,
                 'uses_testing': profile.uses_testing,
                 'uses_bundler': profile.uses_bundler,
-                'has_proper_scripts': profile.has_proper_scripts
+                'has_proper_scripts': profile.has_proper_scripts,
+                'lockfile_type': profile.lockfile_type,
+                'resolved_packages': profile.resolved_packages,
+                'transitive_dependencies': profile.transitive_dependencies,
+                'duplicate_packages': profile.duplicate_packages,
+                'duplicate_versions': profile.duplicate_versions,
+                'dependency_tree_depth': profile.dependency_tree_depth,
+                'registry_checked_dependencies': profile.registry_checked_dependencies,
+                'outdated_dependencies': profile.outdated_dependencies,
+                'deprecated_dependencies': profile.deprecated_dependencies,
+                'stale_dependencies': profile.stale_dependencies
             }
             output_data.append(profile_dict)
         
@@ -0,0 +1,139 @@
+"""
+Dependency Matrix for Base44 Applications
+Sparse app x package incidence matrix for adoption, co-occurrence, lift and version spread
+"""
+
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+from scipy import sparse
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DependencyMatrix:
+    """CSR incidence matrix (apps x packages) built once from dependency profiles"""
+
+    def __init__(self, profiles: Sequence, categories: Sequence[str]):
+        """
+        Build the incidence matrix
+
+        Args:
+            profiles: DependencyProfile objects (one matrix row each)
+            categories: Names of the profile dicts to include (one column category each)
+        """
+        self.app_names: List[str] = [profile.app_name for profile in profiles]
+        self.categories: List[str] = list(categories)
+
+        package_index: Dict[str, int] = {}
+        version_index: Dict[str, int] = {}
+        package_categories: List[int] = []
+        rows, cols, version_codes = [], [], []
+
+        for row, profile in enumerate(profiles):
+            for category_index, category in enumerate(self.categories):
+                for package, version in getattr(profile, category, {}).items():
+                    col = package_index.get(package)
+                    if col is None:
+                        col = package_index[package] = len(package_index)
+                        package_categories.append(category_index)
+                    rows.append(row)
+                    cols.append(col)
+                    version_codes.append(version_index.setdefault(str(version), len(version_index)))
+
+        self.packages: List[str] = list(package_index)
+        self.package_index = package_index
+        self.versions: List[str] = list(version_index)
+        self.package_category = np.asarray(package_categories, dtype=np.int32)
+
+        shape = (len(self.app_names), len(self.packages))
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+
+        # Duplicates (a package listed in two sections of one app) collapse to 1
+        self.incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+        self.incidence.data[:] = 1.0
+
+        self._cols = cols
+        self._version_codes = np.asarray(version_codes, dtype=np.int64)
+        self.adoption = np.asarray(self.incidence.sum(axis=0)).ravel().astype(np.int64)
+
+        logger.info(f"Built dependency matrix: {shape[0]} apps x {shape[1]} packages, "
+                    f"{self.incidence.nnz} entries")
+
+    @property
+    def app_count(self) -> int:
+        return len(self.app_names)
+
+    def _category_mask(self, categories: Optional[Sequence[str]]) -> np.ndarray:
+        """Boolean column mask for the given categories (all columns if None)"""
+        if categories is None:
+            return np.ones(len(self.packages), dtype=bool)
+        wanted = [self.categories.index(category) for category in categories if category in self.categories]
+        return np.isin(self.package_category, wanted)
+
+    def _ranked_columns(self, mask: np.ndarray, top_n: int) -> np.ndarray:
+        """Column indices ordered by adoption (desc), then package name"""
+        columns = np.flatnonzero(mask & (self.adoption > 0))
+        names = np.asarray(self.packages, dtype=object)[columns]
+        order = np.lexsort((names, -self.adoption[columns]))
+        return columns[order[:top_n]]
+
+    def top_packages(self, top_n: int = 10, categories: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        """Most adopted packages, optionally restricted to categories"""
+        columns = self._ranked_columns(self._category_mask(categories), top_n)
+        return {self.packages[col]: int(self.adoption[col]) for col in columns}
+
+    def adoption_rates(self, categories: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Share of apps using each package"""
+        columns = np.flatnonzero(self._category_mask(categories))
+        total = max(self.app_count, 1)
+        return {self.packages[col]: float(self.adoption[col]) / total for col in columns}
+
+    def co_occurrence(self, columns: Optional[np.ndarray] = None) -> sparse.csr_matrix:
+        """Package x package co-occurrence counts (A^T A) over the selected columns"""
+        matrix = self.incidence if columns is None else self.incidence[:, columns]
+        return (matrix.T @ matrix).tocsr()
+
+    def top_pairs(self, top_n: int = 20, min_support: int = 2, max_packages: int = 500,
+                  categories: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Package pairs that travel together, ranked by lift
+
+        Lift = P(a and b) / (P(a) * P(b)); only pairs seen together in at least
+        min_support apps among the max_packages most adopted packages are scored.
+        """
+        columns = self._ranked_columns(self._category_mask(categories), max_packages)
+        if len(columns) < 2:
+            return []
+
+        counts = sparse.triu(self.co_occurrence(columns), k=1).tocoo()
+        keep = counts.data >= min_support
+        left, right, together = counts.row[keep], counts.col[keep], counts.data[keep].astype(np.float64)
+        if not len(together):
+            return []
+
+        adoption = self.adoption[columns].astype(np.float64)
+        lift = together * self.app_count / (adoption[left] * adoption[right])
+        order = np.lexsort((-together, -lift))[:top_n]
+
+        return [{
+            'packages': [self.packages[columns[left[i]]], self.packages[columns[right[i]]]],
+            'co_occurrence': int(together[i]),
+            'support': float(together[i]) / self.app_count,
+            'lift': float(lift[i])
+        } for i in order]
+
+    def version_spread(self, top_n: int = 10) -> Dict[str, int]:
+        """Packages declared with the most distinct version specifiers across apps"""
+        if not len(self._cols):
+            return {}
+
+        pairs = np.unique(self._cols * len(self.versions) + self._version_codes)
+        spread = np.bincount(pairs // len(self.versions), minlength=len(self.packages))
+        columns = np.flatnonzero(spread > 1)
+        names = np.asarray(self.packages, dtype=object)[columns]
+        order = np.lexsort((names, -spread[columns]))[:top_n]
+        return {self.packages[columns[i]]: int(spread[columns[i]]) for i in order}
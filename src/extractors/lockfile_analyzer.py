@@ -0,0 +1,404 @@
+"""
+Lockfile Analyzer for Base44 Applications
+Streams package-lock.json, pnpm-lock.yaml and yarn.lock to measure the transitive dependency tree
+"""
+
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from pathlib import Path
+from collections import defaultdict, deque
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+@dataclass
+class LockfileMetrics:
+    """Transitive dependency metrics computed from a lockfile"""
+    lockfile_type: str = ""  # npm, pnpm, yarn
+    lockfile_path: str = ""
+    lockfile_version: str = ""
+
+    # Resolved dependency tree
+    total_packages: int = 0  # Distinct name@version pairs
+    unique_packages: int = 0  # Distinct package names
+    transitive_dependencies: int = 0  # Unique packages not declared directly
+    duplicate_packages: int = 0  # Names resolved to more than one version
+    duplicate_versions: int = 0  # Extra versions beyond the first, summed over names
+    max_depth: int = 0  # Longest shortest path from the app (direct deps = 1)
+    average_depth: float = 0.0
+
+    parse_errors: List[str] = field(default_factory=list)
+
+class _DependencyGraph:
+    """Compact package graph accumulated while a lockfile is streamed"""
+
+    def __init__(self):
+        self.versions: Dict[str, Set[str]] = defaultdict(set)
+        self.edges: Dict[str, Set[str]] = defaultdict(set)
+        self.roots: Set[str] = set()
+
+    def add_package(self, name: str, version: Optional[str], dependencies: Iterable[str] = ()):
+        """Record one resolved package and the names it depends on"""
+        if not name:
+            return
+        versions = self.versions[name]
+        if version:
+            versions.add(version)
+        self.edges[name].update(dependencies)
+
+    def finalize(self, metrics: LockfileMetrics, direct_dependencies: Iterable[str]):
+        """Compute tree metrics from the accumulated graph"""
+        roots = (self.roots | set(direct_dependencies)) & set(self.versions)
+        if not roots:
+            # No root information: packages nothing depends on are the entry points
+            depended_on = set().union(*self.edges.values()) if self.edges else set()
+            roots = set(self.versions) - depended_on
+
+        metrics.unique_packages = len(self.versions)
+        metrics.total_packages = sum(max(len(versions), 1) for versions in self.versions.values())
+        metrics.transitive_dependencies = sum(1 for name in self.versions if name not in roots)
+
+        duplicates = [len(versions) for versions in self.versions.values() if len(versions) > 1]
+        metrics.duplicate_packages = len(duplicates)
+        metrics.duplicate_versions = sum(count - 1 for count in duplicates)
+
+        # Breadth-first search gives each package its shortest distance from the app
+        depths = {name: 1 for name in roots}
+        queue = deque(roots)
+        while queue:
+            name = queue.popleft()
+            for dependency in self.edges.get(name, ()):
+                if dependency not in depths and dependency in self.versions:
+                    depths[dependency] = depths[name] + 1
+                    queue.append(dependency)
+
+        if depths:
+            metrics.max_depth = max(depths.values())
+            metrics.average_depth = sum(depths.values()) / len(depths)
+
+class _JSONStream:
+    """Incremental JSON reader that walks objects member by member"""
+
+    def __init__(self, handle, chunk_size: int = 1 << 16):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Append the next chunk, discarding consumed input"""
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """Consume a structural character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' in lockfile")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number or literal ending exactly at the buffer edge may continue
+                if end == len(self.buffer) and self._fill():
+                    continue
+                self.pos = end
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def iter_keys(self) -> Iterator[str]:
+        """Yield object keys; the caller must consume each value before resuming"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Unexpected '{separator}' in lockfile object")
+
+    def skip_value(self):
+        """Consume the next value without materializing containers"""
+        char = self.peek()
+        if char == '{':
+            for _ in self.iter_keys():
+                self.skip_value()
+        elif char == '[':
+            self.pos += 1
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            while True:
+                self.skip_value()
+                separator = self.peek()
+                self.pos += 1
+                if separator == ']':
+                    return
+                if separator != ',':
+                    raise ValueError(f"Unexpected '{separator}' in lockfile array")
+        else:
+            self.value()
+
+def _split_yaml_key(text: str) -> Tuple[str, str]:
+    """Split 'key: value' / 'key value' lines used by pnpm and yarn lockfiles"""
+    if text[:1] in ('"', "'"):
+        end = text.find(text[0], 1)
+        if end == -1:
+            return text.strip('"\''), ""
+        return text[1:end], text[end + 1:].lstrip(':').strip()
+
+    for i, char in enumerate(text):
+        if char == ' ':
+            return text[:i], text[i + 1:].strip()
+        if char == ':' and (i + 1 == len(text) or text[i + 1] == ' '):
+            return text[:i], text[i + 1:].strip()
+    return text, ""
+
+def _unquote(value: str) -> str:
+    """Strip YAML quotes from a scalar"""
+    return value.strip().strip('"\'')
+
+def _split_package_spec(spec: str) -> str:
+    """Package name from 'name@range' (scoped names keep their leading '@')"""
+    at = spec.find('@', 1) if spec.startswith('@') else spec.find('@')
+    return spec[:at] if at > 0 else spec
+
+class LockfileAnalyzer:
+    """Streams lockfiles and computes transitive dependency metrics"""
+
+    def __init__(self, chunk_size: int = 1 << 16):
+        # Lockfiles in priority order
+        self.lockfile_names = [
+            ('package-lock.json', 'npm'),
+            ('npm-shrinkwrap.json', 'npm'),
+            ('pnpm-lock.yaml', 'pnpm'),
+            ('yarn.lock', 'yarn')
+        ]
+        self.chunk_size = chunk_size
+
+    def find_lockfile(self, app_path: Path) -> Optional[Tuple[Path, str]]:
+        """Locate the lockfile of an application"""
+        for file_name, lockfile_type in self.lockfile_names:
+            lockfile_path = app_path / file_name
+            if lockfile_path.exists():
+                return lockfile_path, lockfile_type
+        return None
+
+    def analyze(self, app_path: Path, direct_dependencies: Iterable[str] = ()) -> Optional[LockfileMetrics]:
+        """
+        Analyze the lockfile of an application
+
+        Args:
+            app_path: Application directory
+            direct_dependencies: Dependency names declared in package.json
+
+        Returns:
+            LockfileMetrics, or None when the application has no lockfile
+        """
+        found = self.find_lockfile(Path(app_path))
+        if found is None:
+            return None
+
+        lockfile_path, lockfile_type = found
+        metrics = LockfileMetrics(lockfile_type=lockfile_type, lockfile_path=str(lockfile_path))
+        graph = _DependencyGraph()
+
+        readers = {
+            'npm': self._read_npm_lockfile,
+            'pnpm': self._read_pnpm_lockfile,
+            'yarn': self._read_yarn_lockfile
+        }
+
+        try:
+            with open(lockfile_path, 'r', encoding='utf-8') as handle:
+                readers[lockfile_type](handle, graph, metrics)
+        except (ValueError, UnicodeDecodeError, OSError) as e:
+            error_msg = f"Could not parse {lockfile_path}: {e}"
+            metrics.parse_errors.append(error_msg)
+            logger.warning(error_msg)
+
+        graph.finalize(metrics, direct_dependencies)
+        return metrics
+
+    def _read_npm_lockfile(self, handle, graph: _DependencyGraph, metrics: LockfileMetrics):
+        """Stream package-lock.json (v1 'dependencies' tree or v2/v3 'packages' map)"""
+        stream = _JSONStream(handle, self.chunk_size)
+        seen_packages = False
+
+        for key in stream.iter_keys():
+            if key == 'lockfileVersion':
+                metrics.lockfile_version = str(stream.value())
+            elif key == 'packages':
+                seen_packages = True
+                for package_path in stream.iter_keys():
+                    self._add_npm_package(package_path, stream.value(), graph)
+            elif key == 'dependencies' and not seen_packages:
+                for name in stream.iter_keys():
+                    self._add_npm_v1_dependency(name, stream.value(), graph)
+            else:
+                stream.skip_value()
+
+    def _add_npm_package(self, package_path: str, entry: Dict, graph: _DependencyGraph):
+        """Record one entry of the v2/v3 'packages' map"""
+        dependency_names = set(entry.get('dependencies', {})) | set(entry.get('optionalDependencies', {}))
+
+        if package_path == "":
+            # Root project: its declared dependencies are the tree roots
+            graph.roots.update(dependency_names)
+            graph.roots.update(entry.get('devDependencies', {}))
+            graph.roots.update(entry.get('peerDependencies', {}))
+            return
+
+        if entry.get('link'):
+            return
+
+        name = entry.get('name') or package_path.rsplit('node_modules/', 1)[-1]
+        graph.add_package(name, entry.get('version'), dependency_names)
+
+    def _add_npm_v1_dependency(self, name: str, entry: Dict, graph: _DependencyGraph):
+        """Record a v1 'dependencies' entry and its nested node_modules"""
+        pending = [(name, entry)]
+        while pending:
+            name, entry = pending.pop()
+            graph.add_package(name, entry.get('version'), entry.get('requires', {}).keys())
+            pending.extend(entry.get('dependencies', {}).items())
+
+    def _read_pnpm_lockfile(self, handle, graph: _DependencyGraph, metrics: LockfileMetrics):
+        """Stream pnpm-lock.yaml line by line (v5 through v9 layouts)"""
+        root_sections = {'dependencies', 'devDependencies', 'optionalDependencies'}
+        section = None
+        importer = None
+        current = None
+        subsection = None
+
+        for raw_line in handle:
+            line = raw_line.rstrip()
+            stripped = line.lstrip(' ')
+            if not stripped or stripped.startswith('#'):
+                continue
+            indent = len(line) - len(stripped)
+            key, value = _split_yaml_key(stripped)
+
+            if indent == 0:
+                section = key
+                current = None
+                if key == 'lockfileVersion':
+                    metrics.lockfile_version = _unquote(value)
+                continue
+
+            if section in root_sections and indent == 2:
+                graph.roots.add(key)
+            elif section == 'importers':
+                if indent == 2:
+                    importer = key
+                elif indent == 4:
+                    subsection = key
+                elif indent == 6 and importer == '.' and subsection in root_sections:
+                    graph.roots.add(key)
+            elif section in ('packages', 'snapshots'):
+                if indent == 2:
+                    name, version = self._parse_pnpm_package_id(key)
+                    graph.add_package(name, version)
+                    current = name
+                    subsection = None
+                elif indent == 4 and current:
+                    subsection = key
+                elif indent == 6 and current and subsection in ('dependencies', 'optionalDependencies'):
+                    graph.edges[current].add(key)
+
+    def _parse_pnpm_package_id(self, package_id: str) -> Tuple[str, Optional[str]]:
+        """Split '/name@1.0.0(peer@2)', 'name@1.0.0' or v5 '/name/1.0.0_peer' ids"""
+        package_id = package_id.lstrip('/').split('(', 1)[0]
+        # v5 ids put the version in its own path segment ('name/1.0.0', '@scope/name/1.0.0'),
+        # and their '_peer@2' suffixes contain '@', so the layout is checked before any '@' split
+        name_segments = 2 if package_id.startswith('@') else 1
+        if package_id.count('/') >= name_segments:
+            parts = package_id.split('/')
+            return '/'.join(parts[:name_segments]), parts[name_segments].split('_', 1)[0] or None
+        if '@' in package_id[1:]:
+            name, _, version = package_id.rpartition('@')
+            return name, version
+        return package_id, None
+
+    def _read_yarn_lockfile(self, handle, graph: _DependencyGraph, metrics: LockfileMetrics):
+        """Stream yarn.lock line by line (classic v1 and berry formats)"""
+        current = None
+        version = None
+        dependencies: Set[str] = set()
+        is_workspace = False
+        subsection = None
+        metrics.lockfile_version = "1"
+
+        def flush():
+            if current is None:
+                return
+            if is_workspace:
+                graph.roots.update(dependencies)
+            else:
+                graph.add_package(current, version, dependencies)
+
+        for raw_line in handle:
+            line = raw_line.rstrip()
+            stripped = line.lstrip(' ')
+            if not stripped or stripped.startswith('#'):
+                continue
+            indent = len(line) - len(stripped)
+
+            if indent == 0:
+                flush()
+                header = stripped.rstrip(':')
+                specs = [_unquote(spec) for spec in header.split(', ')]
+                current = None if header.startswith('__metadata') else _split_package_spec(specs[0])
+                is_workspace = any('@workspace:' in spec for spec in specs)
+                version = None
+                dependencies = set()
+                subsection = None
+                if header.startswith('__metadata'):
+                    metrics.lockfile_version = "berry"
+                continue
+
+            key, value = _split_yaml_key(stripped)
+            if indent == 2:
+                subsection = key
+                if key == 'version' and current is not None:
+                    version = _unquote(value)
+            elif indent == 4 and subsection in ('dependencies', 'optionalDependencies'):
+                dependencies.add(key)
+
+        flush()
@@ -14,9 +14,16 @@ from pathlib import Path
 import logging
 from collections import defaultdict, Counter
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from utils.source_guard import SourceGuard, MODE_FULL, MODE_BOUNDED, MODE_SKIPPED
+from utils.code_kernels import classify_lines, max_brace_depth
+from utils.work_queue import FileWorkQueue, FileTask, BACKEND_THREAD, BACKEND_PROCESS
+from utils.result_cache import MemoryBudgetLRU
+from utils.component_records import write_component_records
+from utils.clone_detector import CloneDetector, plan_clone_tasks, apply_reused_results
+from utils.accumulators import RunningMoments, StreamingSummary
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -121,11 +128,14 @@ class EnhancedComponentMetrics:
     # Analysis metadata
     analysis_timestamp: str = ""
     analysis_errors: List[str] = field(default_factory=list)
+    analysis_mode: str = MODE_FULL  # full, bounded, skipped
+    source_flags: List[str] = field(default_factory=list)  # minified, generated, ...
 
 class RegexCodeAnalyzer:
     """Enhanced regex-based code analyzer for JavaScript/JSX files"""
     
-    def __init__(self):
+    def __init__(self, source_guard: Optional[SourceGuard] = None,
+                 cache_max_bytes: int = 128 * 1024 * 1024):
         # Pattern definitions
         self.react_hooks = {
             'useState', 'useEffect', 'useContext', 'useReducer', 'useCallback',
@@ -133,6 +143,9 @@ class RegexCodeAnalyzer:
             'useDebugValue', 'useId', 'useTransition', 'useDeferredValue'
         }
         
+        # Minified/generated file detection and per-file time budget
+        self.source_guard = source_guard or SourceGuard()
+        
         self.base44_patterns = {
             '@base44/sdk', 'base44', 'sdk', '@/api/entities', '@/api', '@base44',
             'base44Client', 'entities', 'integrations'
@@ -146,8 +159,14 @@ class RegexCodeAnalyzer:
         # Compiled regex patterns for performance
         self._compile_patterns()
         
-        # Cache for analysis results
-        self.cache = {}
+        # Cache for analysis results (LRU bounded by an approximate memory budget)
+        self.cache = MemoryBudgetLRU(max_bytes=cache_max_bytes)
+    
+    def __getstate__(self):
+        """Pickle without the result cache (process-pool workers start empty)"""
+        state = self.__dict__.copy()
+        state['cache'] = self.cache.empty_copy()
+        return state
     
     def _compile_patterns(self):
         """Pre-compile regex patterns for better performance"""
@@ -184,8 +203,9 @@ class RegexCodeAnalyzer:
         file_hash = hashlib.md5(content.encode()).hexdigest()
         cache_key = f"{file_path}:{file_hash}"
         
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         metrics = EnhancedComponentMetrics(
             file_path=file_path,
@@ -193,42 +213,34 @@ class RegexCodeAnalyzer:
             analysis_timestamp=datetime.now().isoformat()
         )
         
+        # Route minified, generated and oversized sources away from the full path
+        source_profile = self.source_guard.inspect(file_path, content)
+        metrics.analysis_mode = source_profile.mode
+        metrics.source_flags = source_profile.flags
+        
+        if source_profile.mode == MODE_SKIPPED:
+            metrics.total_lines = source_profile.line_count
+            self.cache.put(cache_key, metrics)
+            return metrics
+        
+        if source_profile.mode == MODE_BOUNDED:
+            content = self.source_guard.bound_content(content)
+            analysis_passes = self._bounded_analysis_passes()
+        else:
+            analysis_passes = self._full_analysis_passes()
+        
+        deadline = self.source_guard.start_budget()
+        
         try:
-            # Basic line analysis
-            self._analyze_lines(content, metrics)
-            
-            # Import analysis
-            self._analyze_imports(content, metrics)
-            
-            # JSX analysis
-            self._analyze_jsx_patterns(content, metrics)
-            
-            # React patterns
-            self._analyze_react_patterns(content, metrics)
-            
-            # Function analysis
-            self._analyze_functions(content, metrics)
-            
-            # Complexity analysis
-            self._analyze_complexity(content, metrics)
-            
-            # API patterns
-            self._analyze_api_patterns(content, metrics)
-            
-            # Data structures
-            self._analyze_data_structures(content, metrics)
-            
-            # Code quality
-            self._analyze_code_quality(content, metrics)
-            
-            # String analysis
-            self._analyze_strings(content, metrics)
-            
-            # Performance patterns
-            self._analyze_performance_patterns(content, metrics)
-            
-            # Component type detection
-            self._detect_component_type(content, metrics)
+            for analysis_pass in analysis_passes:
+                if deadline.expired():
+                    metrics.analysis_mode = MODE_BOUNDED
+                    metrics.source_flags.append('time_budget_exceeded')
+                    metrics.analysis_errors.append(
+                        f"Time budget of {deadline.budget_seconds}s exceeded for {file_path} "
+                        f"before {analysis_pass.__name__}")
+                    break
+                analysis_pass(content, metrics)
             
             # Calculate derived metrics
             self._calculate_derived_metrics(metrics)
@@ -239,25 +251,46 @@ class RegexCodeAnalyzer:
             logger.warning(error_msg)
         
         # Cache the result
-        self.cache[cache_key] = metrics
+        self.cache.put(cache_key, metrics)
         return metrics
     
+    def _full_analysis_passes(self) -> List:
+        """Analysis passes run on ordinary source files, in order"""
+        return [
+            self._analyze_lines,                 # Basic line analysis
+            self._analyze_imports,               # Import analysis
+            self._analyze_jsx_patterns,          # JSX analysis
+            self._analyze_react_patterns,        # React patterns
+            self._analyze_functions,             # Function analysis
+            self._analyze_complexity,            # Complexity analysis
+            self._analyze_api_patterns,          # API patterns
+            self._analyze_data_structures,       # Data structures
+            self._analyze_code_quality,          # Code quality
+            self._analyze_strings,               # String analysis
+            self._analyze_performance_patterns,  # Performance patterns
+            self._detect_component_type,         # Component type detection
+        ]
+    
+    def _bounded_analysis_passes(self) -> List:
+        """Cheap linear-time passes used for minified or generated sources"""
+        return [
+            self._analyze_lines,
+            self._analyze_imports,
+            self._analyze_react_patterns,
+            self._analyze_functions,
+            self._analyze_performance_patterns,
+        ]
+    
     def _analyze_lines(self, content: str, metrics: EnhancedComponentMetrics):
         """Analyze different types of lines"""
-        lines = content.splitlines()
-        metrics.total_lines = len(lines)
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                metrics.blank_lines += 1
-            elif stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
-                metrics.comment_lines += 1
-            elif any(jsx_indicator in stripped for jsx_indicator in ['<', '/>', 'jsx', 'return (']):
-                metrics.jsx_lines += 1
-                metrics.code_lines += 1
-            else:
-                metrics.code_lines += 1
+        counts = classify_lines(content,
+                                comment_prefixes=('//', '/*', '*'),
+                                jsx_indicators=('<', '/>', 'jsx', 'return ('))
+        metrics.total_lines = counts.total_lines
+        metrics.blank_lines += counts.blank_lines
+        metrics.comment_lines += counts.comment_lines
+        metrics.code_lines += counts.code_lines
+        metrics.jsx_lines += counts.jsx_lines
     
     def _analyze_imports(self, content: str, metrics: EnhancedComponentMetrics):
         """Analyze import statements"""
@@ -391,17 +424,7 @@ class RegexCodeAnalyzer:
         metrics.cyclomatic_complexity = 1 + metrics.conditional_statements + metrics.loops
         
         # Nesting depth (approximate by counting nested braces)
-        max_nesting = 0
-        current_nesting = 0
-        
-        for char in content:
-            if char == '{':
-                current_nesting += 1
-                max_nesting = max(max_nesting, current_nesting)
-            elif char == '}':
-                current_nesting = max(0, current_nesting - 1)
-        
-        metrics.nesting_depth = max_nesting
+        metrics.nesting_depth = max_brace_depth(content)
     
     def _analyze_api_patterns(self, content: str, metrics: EnhancedComponentMetrics):
         """Analyze API usage patterns"""
@@ -530,50 +553,80 @@ class RegexCodeAnalyzer:
         # Store as a simple attribute (can be added to dataclass if needed)
         setattr(metrics, 'complexity_score', complexity_score)
     
+    def _analyze_file(self, file_path: str) -> EnhancedComponentMetrics:
+        """Read and analyze a single file (work queue entry point)"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return self.analyze_component(file_path, content)
+    
+    def _collect_files(self, directory_path: Path, file_extensions: List[str]) -> List[Path]:
+        """Find all files with the given extensions under a directory"""
+        files_to_analyze = []
+        for ext in file_extensions:
+            files_to_analyze.extend(directory_path.rglob(f"*{ext}"))
+        return files_to_analyze
+    
+    def _run_work_queue(self, tasks: List[FileTask], backend: str,
+                        max_workers: Optional[int]) -> Tuple[Dict[str, List[EnhancedComponentMetrics]], Dict[str, Any]]:
+        """Drain file tasks through one shared queue and return results grouped by task group"""
+        queue = FileWorkQueue(backend=backend, max_workers=max_workers)
+        grouped = queue.run(tasks, self._analyze_file)
+        
+        # Results computed in worker processes never touched this instance's cache
+        if backend == BACKEND_PROCESS:
+            for analyses in grouped.values():
+                for metrics in analyses:
+                    self.cache.put(f"{metrics.file_path}:{metrics.file_hash}", metrics)
+        
+        stats = asdict(queue.last_run_stats)
+        stats.pop('errors')
+        return grouped, stats
+    
     def batch_analyze_directory(self, directory_path: str, 
-                               file_extensions: List[str] = ['.jsx', '.js', '.tsx', '.ts']) -> List[EnhancedComponentMetrics]:
+                               file_extensions: List[str] = ['.jsx', '.js', '.tsx', '.ts'],
+                               backend: str = BACKEND_THREAD,
+                               max_workers: Optional[int] = None) -> List[EnhancedComponentMetrics]:
         """Analyze all files in a directory"""
-        results = []
         dir_path = Path(directory_path)
         
         if not dir_path.exists():
             logger.error(f"Directory {directory_path} does not exist")
-            return results
+            return []
         
         # Find all relevant files
-        files_to_analyze = []
-        for ext in file_extensions:
-            files_to_analyze.extend(dir_path.rglob(f"*{ext}"))
-        
+        files_to_analyze = self._collect_files(dir_path, file_extensions)
         logger.info(f"Found {len(files_to_analyze)} files to analyze in {directory_path}")
         
-        # Analyze files with threading
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_file = {}
-            
-            for file_path in files_to_analyze:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    future = executor.submit(self.analyze_component, str(file_path), content)
-                    future_to_file[future] = file_path
-                    
-                except Exception as e:
-                    logger.warning(f"Could not read {file_path}: {e}")
-            
-            for future in as_completed(future_to_file):
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    logger.error(f"Analysis failed for {future_to_file[future]}: {e}")
+        tasks = [FileTask(group=directory_path, file_path=str(file_path)) for file_path in files_to_analyze]
+        grouped, _ = self._run_work_queue(tasks, backend, max_workers)
+        results = grouped.get(directory_path, [])
         
         logger.info(f"Successfully analyzed {len(results)} files")
         return results
     
-    def batch_analyze_templates(self, templates_dir: str, output_file: str = None) -> Dict[str, Any]:
-        """Analyze all Base44 templates in the directory"""
+    def batch_analyze_templates(self, templates_dir: str, output_file: str = None,
+                                backend: str = BACKEND_THREAD,
+                                max_workers: Optional[int] = None,
+                                components_file: Optional[str] = None,
+                                dedupe_clones: bool = False,
+                                clone_threshold: float = 0.8) -> Dict[str, Any]:
+        """
+        Analyze all Base44 templates in the directory
+        
+        Files from every template go through one shared work queue, so a single large
+        template cannot stall the pool; per-template summaries are built afterwards.
+        
+        Args:
+            templates_dir: Directory containing the template directories
+            output_file: Optional JSON path for the results
+            backend: Work queue backend, 'thread' or 'process'
+            max_workers: Upper bound on workers (auto-tuned from per-file cost)
+            components_file: Optional JSON-lines path for the per-file metrics
+                (one record per component, see utils.component_records)
+            dedupe_clones: Group near-duplicate templates (MinHash) and analyze only
+                the files of each clone that differ from its family representative
+            clone_threshold: Minimum estimated Jaccard similarity between clones
+        """
         results = {
             'analysis_metadata': {
                 'timestamp': datetime.now().isoformat(),
@@ -594,16 +647,44 @@ class RegexCodeAnalyzer:
         results['analysis_metadata']['total_templates'] = len(template_dirs)
         logger.info(f"Starting analysis of {len(template_dirs)} templates...")
         
-        for i, template_dir in enumerate(template_dirs, 1):
+        # One global file queue across all templates
+        template_files = {template_dir.name: self._collect_files(template_dir, ['.jsx', '.js', '.tsx', '.ts'])
+                          for template_dir in template_dirs}
+        if dedupe_clones:
+            template_paths = {template_dir.name: template_dir for template_dir in template_dirs}
+            detector = CloneDetector(threshold=clone_threshold)
+            families = detector.detect(template_paths)
+            tasks, reused = plan_clone_tasks(families, template_files, template_paths, detector.manifests)
+        else:
+            tasks = [FileTask(group=template_name, file_path=str(file_path))
+                     for template_name, files in template_files.items() for file_path in files]
+        
+        grouped, queue_stats = self._run_work_queue(tasks, backend, max_workers)
+        results['analysis_metadata']['work_queue'] = queue_stats
+        
+        # Clone files identical to their representative's copy reuse its result
+        if dedupe_clones:
+            results['analysis_metadata']['clone_detection'] = {
+                'threshold': clone_threshold,
+                'families': sum(1 for family in families if len(family.members) > 1),
+                'files_analyzed': len(tasks),
+                'files_reused': apply_reused_results(grouped, reused, template_files)
+            }
+            results['clone_families'] = [asdict(family) for family in families if len(family.members) > 1]
+        cache_stats = self.cache.stats()
+        results['analysis_metadata']['result_cache'] = dict(asdict(cache_stats), hit_rate=cache_stats.hit_rate)
+        
+        # Per-file metrics for component-level consumers (e.g. the ML dataset)
+        if components_file:
+            write_component_records(components_file, grouped)
+            results['analysis_metadata']['components_file'] = components_file
+        
+        # Aggregate template-level metrics once the queue has drained
+        for template_dir in template_dirs:
             template_name = template_dir.name
-            logger.info(f"Analyzing template {i}/{len(template_dirs)}: {template_name}")
             
             try:
-                # Analyze all files in the template
-                component_analyses = self.batch_analyze_directory(str(template_dir))
-                
-                # Aggregate template-level metrics
-                template_summary = self._create_template_summary(template_name, component_analyses)
+                template_summary = self._create_template_summary(template_name, grouped.get(template_name, []))
                 results['templates'][template_name] = template_summary
                 results['analysis_metadata']['successful_analyses'] += 1
                 
@@ -627,6 +708,13 @@ class RegexCodeAnalyzer:
         if not analyses:
             return {'error': 'No files analyzed'}
         
+        # Per-file averages in one pass
+        complexity = RunningMoments()
+        cyclomatic = RunningMoments()
+        for a in analyses:
+            complexity.add(getattr(a, 'complexity_score', 0))
+            cyclomatic.add(a.cyclomatic_complexity)
+        
         summary = {
             'template_name': template_name,
             'total_files': len(analyses),
@@ -634,7 +722,7 @@ class RegexCodeAnalyzer:
             'total_components': len([a for a in analyses if a.component_name]),
             
             # Aggregated complexity
-            'average_complexity': statistics.mean([getattr(a, 'complexity_score', 0) for a in analyses]) if analyses else 0,
+            'average_complexity': complexity.mean,
             'total_jsx_elements': sum(a.jsx_elements_count for a in analyses),
             'total_hooks': sum(a.total_hooks for a in analyses),
             
@@ -648,7 +736,7 @@ class RegexCodeAnalyzer:
             'components_with_effects': sum(a.effect_hooks for a in analyses),
             
             # Code quality
-            'average_cyclomatic_complexity': statistics.mean([a.cyclomatic_complexity for a in analyses]) if analyses else 0,
+            'average_cyclomatic_complexity': cyclomatic.mean,
             'console_logs_total': sum(a.console_logs for a in analyses),
             'todo_comments_total': sum(a.todo_comments for a in analyses),
             
@@ -659,6 +747,10 @@ class RegexCodeAnalyzer:
             # Most used patterns
             'most_used_hooks': self._get_most_common_items([a.hooks_used for a in analyses]),
             'most_used_components': self._get_most_used_components(analyses),
+            
+            # Files routed away from the full analysis path
+            'bounded_files': [a.file_path for a in analyses if a.analysis_mode == MODE_BOUNDED],
+            'skipped_files': [a.file_path for a in analyses if a.analysis_mode == MODE_SKIPPED],
         }
         
         return summary
@@ -696,25 +788,32 @@ class RegexCodeAnalyzer:
         if not templates:
             return
         
-        complexities = [t['average_complexity'] for t in templates.values() if 'average_complexity' in t and t['average_complexity'] > 0]
+        # Mergeable per-template aggregates (median is exact up to the digest's exact_limit templates)
+        complexities = StreamingSummary()
+        integration = RunningMoments()
+        cyclomatic = RunningMoments()
+        for t in templates.values():
+            if t.get('average_complexity', 0) > 0:
+                complexities.add(t['average_complexity'])
+            integration.add(t.get('base44_integration', 0))
+            cyclomatic.add(t.get('average_cyclomatic_complexity', 0))
         
         insights = {
             'complexity_distribution': {
-                'mean': statistics.mean(complexities) if complexities else 0,
-                'std': statistics.stdev(complexities) if len(complexities) > 1 else 0,
-                'median': statistics.median(complexities) if complexities else 0
+                'mean': complexities.moments.mean,
+                'std': complexities.moments.std(),
+                'median': complexities.digest.median()
             },
             
             'base44_adoption': {
                 'templates_using_base44': sum(1 for t in templates.values() if t.get('base44_integration', 0) > 0),
-                'average_integration_level': statistics.mean([t.get('base44_integration', 0) for t in templates.values()]) if templates.values() else 0,
+                'average_integration_level': integration.mean,
                 'high_integration_templates': [name for name, t in templates.items() 
                                              if t.get('base44_integration', 0) > 0.5]
             },
             
             'code_quality_metrics': {
-                'average_cyclomatic_complexity': statistics.mean([t.get('average_cyclomatic_complexity', 0) 
-                                                        for t in templates.values()]) if templates.values() else 0,
+                'average_cyclomatic_complexity': cyclomatic.mean,
                 'templates_with_console_logs': sum(1 for t in templates.values() if t.get('console_logs_total', 0) > 0),
                 'templates_with_todos': sum(1 for t in templates.values() if t.get('todo_comments_total', 0) > 0)
             },
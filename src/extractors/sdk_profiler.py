@@ -5,11 +5,13 @@ Specialized analyzer for Base44 SDK usage patterns and API interactions
 
 import re
 import json
-from typing import Dict, List, Set, Optional, Tuple
+from typing import Dict, List, Set, Optional, Tuple, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 import logging
 
+from utils.parallel_executor import ParallelExecutor, BACKEND_PROCESS, find_application_dirs
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -397,24 +399,42 @@ class SDKProfiler:
         
         profile.api_complexity_score = min(sum(complexity_factors), 10.0) / 10.0  # Normalize to 0-1
     
-    def profile_multiple_applications(self, base_path: str) -> List[SDKUsageProfile]:
-        """Profile multiple applications in a directory"""
-        base_path_obj = Path(base_path)
-        profiles = []
+    def profile_multiple_applications(self, base_path: str, backend: str = BACKEND_PROCESS,
+                                      max_workers: Optional[int] = None,
+                                      chunk_size: Optional[int] = None) -> List[SDKUsageProfile]:
+        """
+        Profile multiple applications in a directory
         
-        if not base_path_obj.exists():
-            logger.error(f"Base path {base_path} does not exist")
-            return profiles
+        Args:
+            base_path: Directory containing the application directories
+            backend: Executor backend, 'serial', 'thread' or 'process' (all cores)
+            max_workers: Worker count (defaults to the CPU count)
+            chunk_size: Applications per process-pool task
+            
+        Returns:
+            Results in directory listing order
+        """
+        app_dirs = find_application_dirs(base_path)
+        if app_dirs is None:
+            return []
         
-        # Find all application directories
-        for app_dir in base_path_obj.iterdir():
-            if app_dir.is_dir() and not app_dir.name.startswith('.'):
-                profile = self.profile_application(str(app_dir), app_dir.name)
-                profiles.append(profile)
+        executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=chunk_size)
+        profiles = executor.map(self.profile_application, app_dirs)
         
         logger.info(f"Profiled {len(profiles)} applications")
         return profiles
     
+    def stream_profile_multiple_applications(self, base_path: str, backend: str = BACKEND_PROCESS,
+                                             max_workers: Optional[int] = None,
+                                             chunk_size: Optional[int] = None) -> Iterator[SDKUsageProfile]:
+        """Profile multiple applications, yielding each result as soon as it completes"""
+        app_dirs = find_application_dirs(base_path)
+        if app_dirs is None:
+            return
+        
+        executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=chunk_size)
+        yield from executor.imap_unordered(self.profile_application, app_dirs)
+    
     def export_profiles(self, profiles: List[SDKUsageProfile], output_path: str):
         """Export SDK profiles to JSON file"""
         output_data = []
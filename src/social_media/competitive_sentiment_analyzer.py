@@ -52,6 +52,102 @@ class CompetitiveSentimentResults:
     sentiment_trend: List[Tuple[datetime, float]] = field(default_factory=list)
     momentum_score: float = 0.0
 
+class RunningMean:
+    """Count and mean of a stream (Welford update, exact pairwise merge)"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+    
+    def add(self, value: float) -> 'RunningMean':
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        return self
+    
+    def merge(self, other: 'RunningMean') -> 'RunningMean':
+        if not self.count:
+            self.count, self.mean = other.count, other.mean
+        elif other.count:
+            count = self.count + other.count
+            self.mean += (other.mean - self.mean) * other.count / count
+            self.count = count
+        return self
+
+class PlatformSentimentAccumulator:
+    """
+    Running per-platform aggregates that absorb mentions one at a time
+    
+    Accumulators built over disjoint batches of mentions (per worker, or per
+    collection run) merge exactly, so results can be updated without keeping
+    every mention in memory.
+    """
+    
+    def __init__(self, platform: str):
+        self.platform = platform
+        self.sentiment = RunningMean()
+        self.sentiment_distribution: Counter = Counter()
+        self.engagement_totals: Counter = Counter()  # Missing engagement keys count as 0
+        self.aspects: Dict[str, RunningMean] = defaultdict(RunningMean)
+        self.competitive_sentiment = RunningMean()
+        self.mentioned_with_competitors: Counter = Counter()
+        self.daily_sentiment: Dict[Any, RunningMean] = defaultdict(RunningMean)
+    
+    def add(self, mention: PlatformMention):
+        sentiment = mention.sentiment_score
+        self.sentiment.add(sentiment)
+        
+        if sentiment > 0.1:
+            category = 'positive'
+        elif sentiment < -0.1:
+            category = 'negative'
+        else:
+            category = 'neutral'
+        self.sentiment_distribution[category] += 1
+        
+        for key, value in mention.engagement_metrics.items():
+            self.engagement_totals[key] += value
+        for aspect, score in mention.aspect_sentiments.items():
+            self.aspects[aspect].add(score)
+        
+        if mention.competitive_context:
+            self.competitive_sentiment.add(sentiment)
+            self.mentioned_with_competitors.update(mention.mentioned_competitors)
+        
+        self.daily_sentiment[mention.timestamp.date()].add(sentiment)
+    
+    def merge(self, other: 'PlatformSentimentAccumulator') -> 'PlatformSentimentAccumulator':
+        self.sentiment.merge(other.sentiment)
+        self.sentiment_distribution.update(other.sentiment_distribution)
+        self.engagement_totals.update(other.engagement_totals)
+        for aspect, moments in other.aspects.items():
+            self.aspects[aspect].merge(moments)
+        self.competitive_sentiment.merge(other.competitive_sentiment)
+        self.mentioned_with_competitors.update(other.mentioned_with_competitors)
+        for date, moments in other.daily_sentiment.items():
+            self.daily_sentiment[date].merge(moments)
+        return self
+    
+    def results(self) -> CompetitiveSentimentResults:
+        """Results for everything accumulated so far (momentum is filled in by the analyzer)"""
+        result = CompetitiveSentimentResults(platform_name=self.platform)
+        result.total_mentions = self.sentiment.count
+        result.average_sentiment = self.sentiment.mean if self.sentiment.count else 0.0
+        result.sentiment_distribution = dict(self.sentiment_distribution)
+        
+        for key, total in self.engagement_totals.items():
+            result.engagement_metrics[f'avg_{key}'] = total / self.sentiment.count
+            result.engagement_metrics[f'total_{key}'] = total
+        
+        result.feature_sentiments = {aspect: moments.mean for aspect, moments in self.aspects.items()}
+        
+        if self.competitive_sentiment.count:
+            result.competitive_advantage_score = self.competitive_sentiment.mean
+            result.mentioned_with_competitors = dict(self.mentioned_with_competitors)
+        
+        # Daily averages in date order
+        result.sentiment_trend = [(date, self.daily_sentiment[date].mean) for date in sorted(self.daily_sentiment)]
+        return result
+
 class CompetitiveSentimentAnalyzer:
     """Advanced sentiment analysis for competitive platform comparison"""
     
@@ -222,96 +318,35 @@ class CompetitiveSentimentAnalyzer:
         competitive_context = has_comparison_keywords and len(mentioned_competitors) > 0
         return competitive_context, mentioned_competitors
     
-    def analyze_competitive_dataset(self, mentions: List[PlatformMention]) -> Dict[str, CompetitiveSentimentResults]:
-        """Analyze complete dataset for competitive insights"""
-        results = {}
-        
-        # Group mentions by platform
-        platform_mentions = defaultdict(list)
+    def accumulate_mentions(self, mentions: List[PlatformMention],
+                            accumulators: Optional[Dict[str, PlatformSentimentAccumulator]] = None
+                            ) -> Dict[str, PlatformSentimentAccumulator]:
+        """Fold mentions into per-platform accumulators (new ones, or existing ones to update)"""
+        accumulators = accumulators if accumulators is not None else {}
         for mention in mentions:
-            platform_mentions[mention.platform].append(mention)
-        
-        # Analyze each platform
-        for platform, platform_mention_list in platform_mentions.items():
-            result = CompetitiveSentimentResults(platform_name=platform)
-            
-            # Basic metrics
-            result.total_mentions = len(platform_mention_list)
-            
-            # Sentiment distribution
-            sentiments = [m.sentiment_score for m in platform_mention_list]
-            result.average_sentiment = statistics.mean(sentiments) if sentiments else 0.0
-            
-            # Categorize sentiments
-            for sentiment in sentiments:
-                if sentiment > 0.1:
-                    category = 'positive'
-                elif sentiment < -0.1:
-                    category = 'negative'
-                else:
-                    category = 'neutral'
-                
-                result.sentiment_distribution[category] = result.sentiment_distribution.get(category, 0) + 1
-            
-            # Engagement metrics
-            if platform_mention_list:
-                engagement_keys = set()
-                for mention in platform_mention_list:
-                    engagement_keys.update(mention.engagement_metrics.keys())
-                
-                for key in engagement_keys:
-                    values = [m.engagement_metrics.get(key, 0) for m in platform_mention_list]
-                    if values:
-                        result.engagement_metrics[f'avg_{key}'] = statistics.mean(values)
-                        result.engagement_metrics[f'total_{key}'] = sum(values)
-            
-            # Aspect-based sentiment analysis
-            aspect_scores = defaultdict(list)
-            for mention in platform_mention_list:
-                for aspect, score in mention.aspect_sentiments.items():
-                    aspect_scores[aspect].append(score)
-            
-            for aspect, scores in aspect_scores.items():
-                if scores:
-                    result.feature_sentiments[aspect] = statistics.mean(scores)
-            
-            # Competitive analysis
-            competitive_mentions = [m for m in platform_mention_list if m.competitive_context]
-            if competitive_mentions:
-                # Calculate competitive advantage score
-                competitive_sentiments = [m.sentiment_score for m in competitive_mentions]
-                result.competitive_advantage_score = statistics.mean(competitive_sentiments)
-                
-                # Track which competitors are mentioned together
-                for mention in competitive_mentions:
-                    for competitor in mention.mentioned_competitors:
-                        result.mentioned_with_competitors[competitor] = \
-                            result.mentioned_with_competitors.get(competitor, 0) + 1
+            if mention.platform not in accumulators:
+                accumulators[mention.platform] = PlatformSentimentAccumulator(mention.platform)
+            accumulators[mention.platform].add(mention)
+        return accumulators
+    
+    def results_from_accumulators(self, accumulators: Dict[str, PlatformSentimentAccumulator]
+                                  ) -> Dict[str, CompetitiveSentimentResults]:
+        """Per-platform results from (possibly merged) accumulators"""
+        results = {}
+        for platform, accumulator in accumulators.items():
+            result = accumulator.results()
             
-            # Temporal analysis
-            if platform_mention_list:
-                # Sort by timestamp
-                sorted_mentions = sorted(platform_mention_list, key=lambda x: x.timestamp)
-                
-                # Create sentiment trend (daily averages)
-                daily_sentiments = defaultdict(list)
-                for mention in sorted_mentions:
-                    date = mention.timestamp.date()
-                    daily_sentiments[date].append(mention.sentiment_score)
-                
-                result.sentiment_trend = [
-                    (date, statistics.mean(sentiments))
-                    for date, sentiments in daily_sentiments.items()
-                ]
-                
-                # Calculate momentum (trend slope)
-                if len(result.sentiment_trend) > 1:
-                    result.momentum_score = self._calculate_momentum(result.sentiment_trend)
+            # Calculate momentum (trend slope)
+            if len(result.sentiment_trend) > 1:
+                result.momentum_score = self._calculate_momentum(result.sentiment_trend)
             
             results[platform] = result
-        
         return results
     
+    def analyze_competitive_dataset(self, mentions: List[PlatformMention]) -> Dict[str, CompetitiveSentimentResults]:
+        """Analyze complete dataset for competitive insights"""
+        return self.results_from_accumulators(self.accumulate_mentions(mentions))
+    
     def _calculate_momentum(self, sentiment_trend: List[Tuple[datetime, float]]) -> float:
         """Calculate sentiment momentum (trend direction and strength)"""
         if len(sentiment_trend) < 2:
@@ -0,0 +1,315 @@
+"""
+Accumulators Utility
+Mergeable streaming statistics (moments, quantile digest, histogram) for incremental and per-worker aggregation
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class RunningMoments:
+    """
+    Count, sum, mean, variance, min and max of a stream
+
+    Values are folded in with Welford's update and partial results are combined
+    with Chan's pairwise formula, so merging per-worker moments is exact up to
+    floating-point rounding.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0  # Plain running sum (stays an int for int inputs)
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> 'RunningMoments':
+        return cls().extend(values)
+
+    def add(self, value: float) -> 'RunningMoments':
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        return self
+
+    def extend(self, values: Iterable[float]) -> 'RunningMoments':
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """Fold another accumulator into this one"""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.total, self.mean, self.m2 = other.count, other.total, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        """Variance with the given delta degrees of freedom (0 when undefined)"""
+        return self.m2 / (self.count - ddof) if self.count > ddof else 0.0
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(max(self.variance(ddof), 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'count': self.count, 'total': self.total, 'mean': self.mean, 'm2': self.m2,
+                'minimum': self.minimum if self.count else None,
+                'maximum': self.maximum if self.count else None}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'RunningMoments':
+        moments = cls()
+        moments.count, moments.total = state['count'], state['total']
+        moments.mean, moments.m2 = state['mean'], state['m2']
+        if moments.count:
+            moments.minimum, moments.maximum = state['minimum'], state['maximum']
+        return moments
+
+class QuantileDigest:
+    """
+    Merging t-digest for streaming quantiles
+
+    Values are kept exactly (and quantiles match numpy's linear interpolation)
+    until more than exact_limit have been seen; after that they are compressed
+    into at most ~compression centroids, small near the tails and larger near
+    the median, and quantiles are interpolated between centroid centers.
+    """
+
+    def __init__(self, compression: float = 100.0, exact_limit: int = 1000):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.exact = True  # False once any centroids were merged
+
+        self._means = np.zeros(0)
+        self._weights = np.zeros(0)
+        self._buffer: List[float] = []
+
+    @classmethod
+    def of(cls, values: Iterable[float], **kwargs) -> 'QuantileDigest':
+        return cls(**kwargs).extend(values)
+
+    def add(self, value: float) -> 'QuantileDigest':
+        self._buffer.append(value)
+        self.count += 1
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if len(self._buffer) >= max(self.exact_limit, 5 * self.compression):
+            self._flush()
+        return self
+
+    def extend(self, values: Iterable[float]) -> 'QuantileDigest':
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: 'QuantileDigest') -> 'QuantileDigest':
+        """Fold another digest in (exact while the combined count stays within exact_limit)"""
+        other._flush()
+        if other.exact:
+            self._buffer.extend(other._means.tolist())
+        else:
+            self._means = np.concatenate([self._means, other._means])
+            self._weights = np.concatenate([self._weights, other._weights])
+            self.exact = False
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._flush()
+        return self
+
+    def _flush(self):
+        """Move buffered values into the centroids, compressing once past exact_limit"""
+        if self._buffer:
+            self._means = np.concatenate([self._means, np.asarray(self._buffer, dtype=np.float64)])
+            self._weights = np.concatenate([self._weights, np.ones(len(self._buffer))])
+            self._buffer = []
+        order = np.argsort(self._means, kind='stable')
+        self._means, self._weights = self._means[order], self._weights[order]
+        if self.count > self.exact_limit:
+            self._compress()
+
+    def _compress(self):
+        """Greedy merge of adjacent centroids under the k1 = delta / (2 pi) asin(2q - 1) scale"""
+        total = self._weights.sum()
+        scale = self.compression / (2 * math.pi)
+
+        means: List[float] = []
+        weights: List[float] = []
+        current_mean, current_weight = self._means[0], self._weights[0]
+        below = 0.0  # Weight before the current centroid
+        k_lower = scale * math.asin(-1.0)
+        for mean, weight in zip(self._means[1:].tolist(), self._weights[1:].tolist()):
+            q_upper = min(1.0, (below + current_weight + weight) / total)
+            if scale * math.asin(2 * q_upper - 1) - k_lower <= 1.0:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                below += current_weight
+                k_lower = scale * math.asin(2 * min(1.0, below / total) - 1)
+                current_mean, current_weight = mean, weight
+        means.append(current_mean)
+        weights.append(current_weight)
+
+        if len(means) < len(self._means):
+            self.exact = False
+        self._means = np.asarray(means)
+        self._weights = np.asarray(weights)
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q in [0, 1] (0 for an empty digest)"""
+        self._flush()
+        if not self.count:
+            return 0.0
+        if self.exact:
+            return float(np.quantile(self._means, q))
+
+        centers = np.cumsum(self._weights) - self._weights / 2
+        positions = np.concatenate(([0.0], centers, [self.count]))
+        values = np.concatenate(([self.minimum], self._means, [self.maximum]))
+        return float(np.interp(q * self.count, positions, values))
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._flush()
+        return {'compression': self.compression, 'exact_limit': self.exact_limit, 'count': self.count,
+                'exact': self.exact, 'means': self._means.tolist(), 'weights': self._weights.tolist(),
+                'minimum': self.minimum if self.count else None,
+                'maximum': self.maximum if self.count else None}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'QuantileDigest':
+        digest = cls(compression=state['compression'], exact_limit=state['exact_limit'])
+        digest.count, digest.exact = state['count'], state['exact']
+        digest._means = np.asarray(state['means'], dtype=np.float64)
+        digest._weights = np.asarray(state['weights'], dtype=np.float64)
+        if digest.count:
+            digest.minimum, digest.maximum = state['minimum'], state['maximum']
+        return digest
+
+class Histogram:
+    """
+    Counts over fixed right-closed bins (-inf, e0], (e0, e1], ..., (e_last, inf)
+
+    Histograms with the same edges merge exactly by adding counts.
+    """
+
+    def __init__(self, edges: Sequence[float], labels: Optional[Sequence[str]] = None):
+        if list(edges) != sorted(edges):
+            raise ValueError("Histogram edges must be sorted")
+        if labels is not None and len(labels) != len(edges) + 1:
+            raise ValueError("Need one label per bin (len(edges) + 1)")
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.labels = list(labels) if labels is not None else [str(i) for i in range(len(edges) + 1)]
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)
+
+    def add(self, value: float) -> 'Histogram':
+        self.counts[np.searchsorted(self.edges, value, side='left')] += 1
+        return self
+
+    def extend(self, values: Iterable[float]) -> 'Histogram':
+        values = np.fromiter(values, dtype=np.float64)
+        self.counts += np.bincount(np.searchsorted(self.edges, values, side='left'), minlength=len(self.counts))
+        return self
+
+    def merge(self, other: 'Histogram') -> 'Histogram':
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different edges")
+        self.counts += other.counts
+        return self
+
+    def as_dict(self) -> Dict[str, int]:
+        """Bin label -> count"""
+        return {label: int(count) for label, count in zip(self.labels, self.counts)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'edges': self.edges.tolist(), 'labels': self.labels, 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'Histogram':
+        histogram = cls(state['edges'], state['labels'])
+        histogram.counts = np.asarray(state['counts'], dtype=np.int64)
+        return histogram
+
+class StreamingSummary:
+    """Moments plus a quantile digest for one metric"""
+
+    def __init__(self, compression: float = 100.0, exact_limit: int = 1000):
+        self.moments = RunningMoments()
+        self.digest = QuantileDigest(compression, exact_limit)
+
+    @classmethod
+    def of(cls, values: Iterable[float], **kwargs) -> 'StreamingSummary':
+        return cls(**kwargs).extend(values)
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def add(self, value: float) -> 'StreamingSummary':
+        self.moments.add(value)
+        self.digest.add(value)
+        return self
+
+    def extend(self, values: Iterable[float]) -> 'StreamingSummary':
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: 'StreamingSummary') -> 'StreamingSummary':
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        return self
+
+    def describe(self) -> Dict[str, float]:
+        """count/mean/std/min/quartiles/max, laid out like pandas' describe()"""
+        if not self.count:
+            return {'count': 0.0}
+        return {
+            'count': float(self.count),
+            'mean': self.moments.mean,
+            'std': self.moments.std() if self.count > 1 else math.nan,
+            'min': float(self.moments.minimum),
+            '25%': self.digest.quantile(0.25),
+            '50%': self.digest.quantile(0.5),
+            '75%': self.digest.quantile(0.75),
+            'max': float(self.moments.maximum)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'moments': self.moments.to_dict(), 'digest': self.digest.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'StreamingSummary':
+        summary = cls()
+        summary.moments = RunningMoments.from_dict(state['moments'])
+        summary.digest = QuantileDigest.from_dict(state['digest'])
+        return summary
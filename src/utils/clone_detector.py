@@ -0,0 +1,288 @@
+"""
+Clone Detector Utility
+MinHash/LSH near-duplicate detection over token shingles of each app's source
+"""
+
+import copy
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+from utils.work_queue import FileTask
+
+logger = logging.getLogger(__name__)
+
+SOURCE_EXTENSIONS = ('.jsx', '.js', '.tsx', '.ts')
+
+# Identifiers, numbers and single punctuation characters; whitespace and layout are ignored
+_TOKEN_PATTERN = re.compile(r'[A-Za-z_$][\w$]*|\d+|\S')
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+@dataclass
+class CloneFamily:
+    """Apps whose sources are near-duplicates of one another"""
+    representative: str  # Fully analyzed member (largest source)
+    members: List[str] = field(default_factory=list)  # All members, representative included
+    similarity: Dict[str, float] = field(default_factory=dict)  # Estimated Jaccard to the representative
+
+def file_digest(content: bytes) -> str:
+    """Content hash matching the analyzers' file_hash (md5 of the source)"""
+    return hashlib.md5(content).hexdigest()
+
+def source_manifest(app_dir: Union[str, Path], files: Optional[Sequence[Path]] = None,
+                    extensions: Sequence[str] = SOURCE_EXTENSIONS) -> Dict[str, str]:
+    """Relative path -> content digest for an app's source files"""
+    app_dir = Path(app_dir)
+    if files is None:
+        files = [path for ext in extensions for path in app_dir.rglob(f"*{ext}")]
+    manifest = {}
+    for path in files:
+        try:
+            manifest[Path(path).relative_to(app_dir).as_posix()] = file_digest(Path(path).read_bytes())
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+    return manifest
+
+def _band_layout(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) whose LSH threshold (1/b)^(1/r) is closest to the requested one"""
+    layouts = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(layouts, key=lambda layout: abs((1.0 / layout[0]) ** (1.0 / layout[1]) - threshold))
+
+class CloneDetector:
+    """Groups apps into clone families by MinHash-estimated Jaccard similarity"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 5,
+                 seed: int = 0, extensions: Sequence[str] = SOURCE_EXTENSIONS):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity for two apps to be clones
+            num_perm: MinHash signature length (estimate error ~ 1/sqrt(num_perm))
+            shingle_size: Tokens per shingle
+            seed: Seed for the hash permutations
+            extensions: Source file extensions to read
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.extensions = tuple(extensions)
+        self.bands, self.rows = _band_layout(num_perm, threshold)
+
+        # Multiply-shift hash family: odd multipliers, take the high 32 bits
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._offsets = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        # Boilerplate files repeat verbatim across apps; shingle each distinct content once
+        self._token_hashes: Dict[str, int] = {}
+        self._signature_cache: Dict[str, Tuple[np.ndarray, int]] = {}
+        self.manifests: Dict[str, Dict[str, str]] = {}  # Source manifests from the last detect()
+
+    def shingles(self, content: str) -> np.ndarray:
+        """Distinct 64-bit hashes of consecutive token windows"""
+        tokens = _TOKEN_PATTERN.findall(content)
+        if not tokens:
+            return np.zeros(0, dtype=np.uint64)
+
+        # Hash each distinct token once, then combine windows with a polynomial rolling hash
+        token_hash = self._token_hashes
+        for token in set(tokens).difference(token_hash):
+            token_hash[token] = zlib.crc32(token.encode('utf-8'))
+        token_hashes = np.fromiter(map(token_hash.__getitem__, tokens), dtype=np.uint64, count=len(tokens))
+
+        width = min(self.shingle_size, len(token_hashes))
+        windows = len(token_hashes) - width + 1
+        combined = np.zeros(windows, dtype=np.uint64)
+        for offset in range(width):
+            combined = combined * _SHINGLE_MULTIPLIER + token_hashes[offset:offset + windows]
+        return np.unique(combined)
+
+    def signature(self, shingles: np.ndarray, block_size: int = 4096) -> np.ndarray:
+        """MinHash signature (num_perm,) of a shingle set"""
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(shingles), block_size):
+            block = shingles[start:start + block_size]
+            hashed = (self._multipliers[:, None] * block[None, :] + self._offsets[:, None]) >> np.uint64(32)
+            np.minimum(signature, hashed.min(axis=1), out=signature)
+        return signature
+
+    def app_signature(self, app_dir: Union[str, Path]) -> Tuple[np.ndarray, int, Dict[str, str]]:
+        """
+        MinHash signature of the union of an app's file shingles, its shingle count,
+        and its source manifest (relative path -> digest)
+
+        The minimum over a union is the minimum of the per-file minima, so each
+        distinct file content is signed once and shared across apps.
+        """
+        app_dir = Path(app_dir)
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        size = 0
+        manifest = {}
+        for ext in self.extensions:
+            for path in app_dir.rglob(f"*{ext}"):
+                try:
+                    content = path.read_bytes()
+                except OSError as e:
+                    logger.warning(f"Could not read {path}: {e}")
+                    continue
+                digest = manifest[path.relative_to(app_dir).as_posix()] = file_digest(content)
+                cached = self._signature_cache.get(digest)
+                if cached is None:
+                    shingles = self.shingles(content.decode('utf-8', errors='replace'))
+                    cached = self._signature_cache[digest] = (self.signature(shingles), len(shingles))
+                np.minimum(signature, cached[0], out=signature)
+                size += cached[1]
+        return signature, size, manifest
+
+    def _candidate_pairs(self, signatures: np.ndarray) -> set:
+        """Pairs of rows that share at least one LSH band bucket"""
+        pairs = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            band_rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for row, key in enumerate(band_rows):
+                buckets.setdefault(key.tobytes(), []).append(row)
+            for rows in buckets.values():
+                pairs.update((rows[i], rows[j]) for i in range(len(rows)) for j in range(i + 1, len(rows)))
+        return pairs
+
+    def detect(self, app_dirs: Dict[str, Union[str, Path]]) -> List[CloneFamily]:
+        """
+        Cluster apps into clone families
+
+        Args:
+            app_dirs: App name -> app directory
+
+        Returns:
+            One family per cluster (singletons included), largest families first
+        """
+        names = list(app_dirs)
+        if not names:
+            return []
+
+        signed = [self.app_signature(app_dirs[name]) for name in names]
+        signatures = np.stack([signature for signature, _, _ in signed])
+        sizes = np.array([size for _, size, _ in signed])
+        self.manifests = {name: manifest for name, (_, _, manifest) in zip(names, signed)}
+
+        # Union-find over candidate pairs whose estimated similarity clears the threshold
+        parent = list(range(len(names)))
+
+        def find(row: int) -> int:
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        for left, right in self._candidate_pairs(signatures):
+            if np.mean(signatures[left] == signatures[right]) >= self.threshold:
+                parent[find(left)] = find(right)
+
+        clusters: Dict[int, List[int]] = {}
+        for row in range(len(names)):
+            clusters.setdefault(find(row), []).append(row)
+
+        families = []
+        for rows in clusters.values():
+            representative = max(rows, key=lambda row: (sizes[row], names[row]))
+            similarity = {names[row]: float(np.mean(signatures[row] == signatures[representative]))
+                          for row in rows}
+            families.append(CloneFamily(representative=names[representative],
+                                        members=sorted(names[row] for row in rows),
+                                        similarity=similarity))
+
+        families.sort(key=lambda family: (-len(family.members), family.representative))
+        clone_count = sum(len(family.members) - 1 for family in families)
+        logger.info(f"Clone detection: {len(names)} apps in {len(families)} families "
+                    f"({clone_count} clones of a representative)")
+        return families
+
+def plan_clone_tasks(families: List[CloneFamily],
+                     app_files: Dict[str, List[Path]],
+                     app_dirs: Dict[str, Path],
+                     manifests: Optional[Dict[str, Dict[str, str]]] = None
+                     ) -> Tuple[List[FileTask], Dict[str, List[Tuple[str, str]]]]:
+    """
+    Split file analysis into work to run and results to copy
+
+    Representatives are analyzed in full. Other members only queue files whose
+    relative path or content differs from the representative's; identical files
+    are listed for reuse of the representative's result.
+
+    Args:
+        families: Output of CloneDetector.detect
+        app_files: App name -> source files to analyze
+        app_dirs: App name -> app directory
+        manifests: App name -> source manifest (CloneDetector.manifests); read
+            from disk for apps not included
+
+    Returns:
+        (tasks to run, app name -> [(file path, representative file path)] to reuse)
+    """
+    manifests = manifests or {}
+    tasks: List[FileTask] = []
+    reused: Dict[str, List[Tuple[str, str]]] = {}
+
+    def manifest_of(app_name: str) -> Dict[str, str]:
+        if app_name not in manifests:
+            return source_manifest(app_dirs[app_name], app_files[app_name])
+        return manifests[app_name]
+
+    for family in families:
+        representative = family.representative
+        representative_dir = app_dirs[representative]
+        representative_manifest = manifest_of(representative)
+        tasks.extend(FileTask(group=representative, file_path=str(path)) for path in app_files[representative])
+
+        for member in family.members:
+            if member == representative:
+                continue
+            member_dir = app_dirs[member]
+            member_manifest = manifest_of(member)
+            for path in app_files[member]:
+                relative_path = Path(path).relative_to(member_dir).as_posix()
+                digest = member_manifest.get(relative_path)
+                if digest is not None and digest == representative_manifest.get(relative_path):
+                    reused.setdefault(member, []).append((str(path), str(representative_dir / relative_path)))
+                else:
+                    tasks.append(FileTask(group=member, file_path=str(path)))
+
+    return tasks, reused
+
+def apply_reused_results(grouped: Dict[str, List[Any]], reused: Dict[str, List[Tuple[str, str]]],
+                         app_files: Optional[Dict[str, List[Path]]] = None) -> int:
+    """
+    Add copies of representative results for the files skipped by plan_clone_tasks
+
+    Args:
+        grouped: App name -> per-file metrics (must contain the representatives' results)
+        reused: Output of plan_clone_tasks
+        app_files: App name -> source files; when given, each clone's results are put
+            back in file order so order-sensitive summaries match a full analysis
+
+    Returns:
+        Number of results copied
+    """
+    by_path = {metrics.file_path: metrics for analyses in grouped.values() for metrics in analyses}
+    copied = 0
+    for member, files in reused.items():
+        for file_path, source_path in files:
+            source = by_path.get(source_path)
+            if source is None:
+                continue  # The representative's analysis of this file failed
+            metrics = copy.copy(source)
+            metrics.file_path = file_path
+            grouped.setdefault(member, []).append(metrics)
+            copied += 1
+
+        if app_files is not None and member in grouped:
+            position = {str(path): i for i, path in enumerate(app_files[member])}
+            grouped[member].sort(key=lambda metrics: position.get(metrics.file_path, len(position)))
+    return copied
@@ -0,0 +1,165 @@
+"""
+Code Kernels Utility
+Vectorized byte-level kernels shared by the code analyzers (brace depth, line classification)
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Sequence
+import logging
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bytes treated as whitespace by the vectorized line kernel
+_WHITESPACE_BYTES = b' \t\r'
+
+# Line breaks and whitespace that str.splitlines()/str.strip() honour beyond ASCII
+# space, tab and newline; files containing them take the exact pure-Python path
+_EXOTIC_WHITESPACE = re.compile('[\x0b\x0c\x1c-\x1f\x85\xa0\u1680\u2000-\u200a'
+                                '\u2028\u2029\u202f\u205f\u3000]')
+
+@dataclass
+class LineCounts:
+    """Line classification counts for a single file"""
+    total_lines: int = 0
+    blank_lines: int = 0
+    comment_lines: int = 0
+    code_lines: int = 0
+    jsx_lines: int = 0
+
+def max_brace_depth(content: str) -> int:
+    """
+    Maximum '{' nesting depth, never letting depth drop below zero
+
+    Uses a floored cumulative sum: depth_t = S_t - min(0, min_{s<=t} S_s),
+    where S is the running sum of +1 for '{' and -1 for '}'.
+    """
+    if not NUMPY_AVAILABLE:
+        return _max_brace_depth_python(content)
+
+    data = np.frombuffer(content.encode('utf-8'), dtype=np.uint8)
+    if data.size == 0:
+        return 0
+
+    steps = (data == ord('{')).astype(np.int32) - (data == ord('}')).astype(np.int32)
+    running = np.cumsum(steps)
+    floor = np.minimum.accumulate(np.minimum(running, 0))
+    return max(int((running - floor).max()), 0)
+
+def classify_lines(content: str,
+                   comment_prefixes: Sequence[str] = ('//', '/*'),
+                   jsx_indicators: Sequence[str] = ('<', '/>', 'jsx')) -> LineCounts:
+    """
+    Classify lines as blank, comment or code (with a JSX sub-count)
+
+    Matches the analyzers' original per-line rules: a stripped line is blank if empty,
+    a comment if it starts with any comment prefix, otherwise code, and JSX code if it
+    contains any of the JSX indicators.
+    """
+    if not NUMPY_AVAILABLE or _EXOTIC_WHITESPACE.search(content):
+        return _classify_lines_python(content, comment_prefixes, jsx_indicators)
+
+    # Old Mac line endings are line breaks for str.splitlines()
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+
+    raw = content.encode('utf-8')
+    data = np.frombuffer(raw, dtype=np.uint8)
+    counts = LineCounts()
+    if data.size == 0:
+        return counts
+
+    # Line boundaries (same line count as str.splitlines)
+    newlines = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [data.size]))
+    if raw.endswith(b'\n'):
+        starts, ends = starts[:-1], ends[:-1]
+    counts.total_lines = int(starts.size)
+
+    # First non-whitespace byte of every line
+    non_space = np.flatnonzero(~np.isin(data, np.frombuffer(_WHITESPACE_BYTES, dtype=np.uint8)))
+    first_idx = np.searchsorted(non_space, starts)
+    first_pos = np.append(non_space, data.size)[first_idx]
+    blank = first_pos >= ends
+
+    # Comment lines: a prefix begins at the first non-whitespace byte
+    comment = np.zeros(starts.size, dtype=bool)
+    for prefix in comment_prefixes:
+        comment |= _starts_with(data, first_pos, ends, prefix.encode('utf-8'))
+    comment &= ~blank
+
+    # JSX lines: any indicator occurs somewhere in the line
+    jsx = np.zeros(starts.size, dtype=bool)
+    for indicator in jsx_indicators:
+        positions = _find_all(data, indicator.encode('utf-8'))
+        if positions.size:
+            jsx[np.searchsorted(starts, positions, side='right') - 1] = True
+
+    code = ~blank & ~comment
+    counts.blank_lines = int(blank.sum())
+    counts.comment_lines = int(comment.sum())
+    counts.code_lines = int(code.sum())
+    counts.jsx_lines = int((code & jsx).sum())
+    return counts
+
+def _starts_with(data, positions, ends, prefix: bytes):
+    """Vectorized check that data[positions:] begins with prefix within each line"""
+    match = positions + len(prefix) <= ends
+    for offset, byte in enumerate(prefix):
+        index = np.minimum(positions + offset, data.size - 1)
+        match &= data[index] == byte
+    return match
+
+def _find_all(data, pattern: bytes):
+    """Start positions of every occurrence of a short byte pattern"""
+    length = len(pattern)
+    if length == 0 or data.size < length:
+        return np.empty(0, dtype=np.int64)
+
+    window = data.size - length + 1
+    match = data[:window] == pattern[0]
+    for offset in range(1, length):
+        match &= data[offset:offset + window] == pattern[offset]
+    return np.flatnonzero(match)
+
+def _max_brace_depth_python(content: str) -> int:
+    """Pure-Python brace depth used when numpy is unavailable"""
+    max_nesting = 0
+    current_nesting = 0
+
+    for char in content:
+        if char == '{':
+            current_nesting += 1
+            max_nesting = max(max_nesting, current_nesting)
+        elif char == '}':
+            current_nesting = max(0, current_nesting - 1)
+
+    return max_nesting
+
+def _classify_lines_python(content: str, comment_prefixes: Sequence[str],
+                           jsx_indicators: Sequence[str]) -> LineCounts:
+    """Pure-Python line classification used when numpy is unavailable"""
+    counts = LineCounts()
+    lines = content.splitlines()
+    counts.total_lines = len(lines)
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            counts.blank_lines += 1
+        elif stripped.startswith(tuple(comment_prefixes)):
+            counts.comment_lines += 1
+        elif any(indicator in stripped for indicator in jsx_indicators):
+            counts.jsx_lines += 1
+            counts.code_lines += 1
+        else:
+            counts.code_lines += 1
+
+    return counts
@@ -0,0 +1,74 @@
+"""
+Component Records Utility
+JSON-lines export and streaming reader for per-file component metrics
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bulky free-text fields that no downstream consumer of the record file needs
+_EXCLUDED_FIELDS = ('string_literals', 'identifier_tokens')
+
+def _json_default(value: Any) -> Any:
+    """Sets become sorted lists; anything else falls back to its string form"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+def metrics_to_record(metrics: Any, template_name: str) -> Dict[str, Any]:
+    """
+    Flatten a metrics dataclass into a plain record
+
+    Uses the instance __dict__, so attributes set after construction (such as
+    complexity_score) are kept.
+    """
+    record = {'template_name': template_name}
+    record.update((key, value) for key, value in vars(metrics).items() if key not in _EXCLUDED_FIELDS)
+    return record
+
+def write_component_records(output_file: Union[str, Path], grouped: Dict[str, List[Any]]) -> int:
+    """
+    Write one JSON line per analyzed file
+
+    Args:
+        output_file: Destination .jsonl path
+        grouped: template name -> list of metrics objects
+
+    Returns:
+        Number of records written
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for template_name, analyses in grouped.items():
+            for metrics in analyses:
+                f.write(json.dumps(metrics_to_record(metrics, template_name), default=_json_default))
+                f.write('\n')
+                written += 1
+
+    logger.info(f"Wrote {written} component records to {output_file}")
+    return written
+
+def iter_component_records(input_file: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """Stream records from a component record file without loading it whole"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping malformed record at {input_file}:{line_number}: {e}")
+
+def iter_metrics_records(grouped: Dict[str, Iterable[Any]]) -> Iterator[Dict[str, Any]]:
+    """Records straight from in-memory analyzer results (no file round trip)"""
+    for template_name, analyses in grouped.items():
+        for metrics in analyses:
+            yield metrics_to_record(metrics, template_name)
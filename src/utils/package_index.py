@@ -0,0 +1,214 @@
+"""
+Package Index Utility
+Offline, memory-mapped registry metadata snapshot with binary-searchable sorted keys
+"""
+
+import json
+import mmap
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# File layout: header | fixed-width entry table sorted by name bytes | string blob
+_MAGIC = b'B44PKGIX'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sIIq')  # magic, format version, entry count, snapshot time (epoch s)
+_ENTRY = struct.Struct('<QIQHBqq')  # name offset/len, latest offset/len, deprecated, created, modified
+
+@dataclass
+class PackageMetadata:
+    """Registry metadata for a single package"""
+    name: str
+    latest_version: str = ""
+    deprecated: bool = False
+    created: int = 0  # First publish (epoch seconds, 0 if unknown)
+    modified: int = 0  # Last publish (epoch seconds, 0 if unknown)
+
+def _to_epoch(value: Any) -> int:
+    """Convert ISO-8601 strings or numbers to epoch seconds"""
+    if not value:
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        return 0
+
+def _normalize_record(record: Dict) -> Optional[PackageMetadata]:
+    """Accept flat snapshot rows or npm registry packuments"""
+    name = record.get('name')
+    if not name:
+        return None
+
+    latest = record.get('latest') or record.get('dist-tags', {}).get('latest', '')
+    times = record.get('time', {})
+    deprecated = record.get('deprecated', False)
+    if not deprecated and latest and isinstance(record.get('versions'), dict):
+        deprecated = record['versions'].get(latest, {}).get('deprecated', False)
+
+    return PackageMetadata(
+        name=name,
+        latest_version=latest,
+        deprecated=bool(deprecated),
+        created=_to_epoch(record.get('created') or times.get('created')),
+        modified=_to_epoch(record.get('modified') or times.get('modified'))
+    )
+
+def build_package_index(records: Iterable[Dict], index_path: Union[str, Path],
+                        snapshot_time: Optional[int] = None) -> int:
+    """
+    Write an index file from metadata records
+
+    Args:
+        records: Flat rows ({'name', 'latest', 'deprecated', 'created', 'modified'})
+            or registry packuments ({'name', 'dist-tags', 'time', 'versions'})
+        index_path: Output file
+        snapshot_time: When the snapshot was taken (epoch seconds, defaults to now)
+
+    Returns:
+        Number of packages written
+    """
+    packages = {}
+    for record in records:
+        metadata = _normalize_record(record)
+        if metadata is not None:
+            packages[metadata.name.encode('utf-8')] = metadata
+
+    names = sorted(packages)
+    blob = bytearray()
+    entries = bytearray()
+
+    for name in names:
+        metadata = packages[name]
+        latest = metadata.latest_version.encode('utf-8')
+        name_offset = len(blob)
+        blob += name
+        latest_offset = len(blob)
+        blob += latest
+        entries += _ENTRY.pack(name_offset, len(name), latest_offset, len(latest),
+                               1 if metadata.deprecated else 0, metadata.created, metadata.modified)
+
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(names),
+                             int(snapshot_time if snapshot_time is not None else time.time())))
+        f.write(entries)
+        f.write(blob)
+
+    logger.info(f"Wrote package index with {len(names)} packages to {index_path}")
+    return len(names)
+
+def build_package_index_from_jsonl(snapshot_path: Union[str, Path], index_path: Union[str, Path],
+                                   snapshot_time: Optional[int] = None) -> int:
+    """Build an index from a JSON-lines snapshot (one record per line)"""
+    def read_records():
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    return build_package_index(read_records(), index_path, snapshot_time)
+
+class PackageMetadataIndex:
+    """Read-only view over an index file; only the pages touched by lookups are loaded"""
+
+    def __init__(self, index_path: Union[str, Path]):
+        self.index_path = Path(index_path)
+        self._open()
+
+    def _open(self):
+        """Map the index file and validate its header"""
+        self._file = open(self.index_path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, count, snapshot_time = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or format_version != _FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{self.index_path} is not a package index (format {_FORMAT_VERSION})")
+
+        self.count = count
+        self.snapshot_time = snapshot_time
+        self._entries_offset = _HEADER.size
+        self._blob_offset = _HEADER.size + count * _ENTRY.size
+
+    def __getstate__(self):
+        """Pickle by path; worker processes re-map the file"""
+        return {'index_path': self.index_path}
+
+    def __setstate__(self, state):
+        self.index_path = state['index_path']
+        self._open()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        """Release the mapping"""
+        self._map.close()
+        self._file.close()
+
+    def _entry(self, position: int):
+        return _ENTRY.unpack_from(self._map, self._entries_offset + position * _ENTRY.size)
+
+    def _name_at(self, position: int) -> bytes:
+        name_offset, name_length = _ENTRY.unpack_from(self._map, self._entries_offset + position * _ENTRY.size)[:2]
+        start = self._blob_offset + name_offset
+        return self._map[start:start + name_length]
+
+    def _search(self, key: bytes, low: int = 0) -> int:
+        """Leftmost position >= key in [low, count)"""
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _metadata_at(self, position: int) -> PackageMetadata:
+        name_offset, name_length, latest_offset, latest_length, deprecated, created, modified = self._entry(position)
+        name_start = self._blob_offset + name_offset
+        latest_start = self._blob_offset + latest_offset
+        return PackageMetadata(
+            name=self._map[name_start:name_start + name_length].decode('utf-8'),
+            latest_version=self._map[latest_start:latest_start + latest_length].decode('utf-8'),
+            deprecated=bool(deprecated),
+            created=created,
+            modified=modified
+        )
+
+    def lookup(self, name: str) -> Optional[PackageMetadata]:
+        """Metadata for one package (None if it is not in the snapshot)"""
+        key = name.encode('utf-8')
+        position = self._search(key)
+        if position < self.count and self._name_at(position) == key:
+            return self._metadata_at(position)
+        return None
+
+    def lookup_batch(self, names: Iterable[str]) -> Dict[str, PackageMetadata]:
+        """
+        Metadata for many packages at once
+
+        Queries are sorted first so each binary search starts where the previous
+        one ended and consecutive lookups touch neighbouring pages.
+        """
+        results = {}
+        low = 0
+        for key in sorted({name.encode('utf-8') for name in names}):
+            low = self._search(key, low)
+            if low >= self.count:
+                break
+            if self._name_at(low) == key:
+                metadata = self._metadata_at(low)
+                results[metadata.name] = metadata
+        return results
@@ -0,0 +1,128 @@
+"""
+Parallel Executor Utility
+Shared serial/thread/process executor with chunking for per-application batch APIs
+"""
+
+import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+BACKEND_SERIAL = "serial"
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
+
+# Function installed once per pool process so it is not pickled with every chunk
+_INSTALLED_FUNCTION: Optional[Callable[[Any], Any]] = None
+
+def _install_function(function: Callable[[Any], Any]):
+    """Process-pool initializer storing the mapped function"""
+    global _INSTALLED_FUNCTION
+    _INSTALLED_FUNCTION = function
+
+def _call_installed(item: Any) -> Any:
+    """Apply the installed function to one item"""
+    return _INSTALLED_FUNCTION(item)
+
+def _call_installed_chunk(chunk: List[Any]) -> List[Any]:
+    """Apply the installed function to a chunk of items"""
+    return [_INSTALLED_FUNCTION(item) for item in chunk]
+
+def find_application_dirs(base_path: str) -> Optional[List[str]]:
+    """List application directories under base_path (None if it does not exist)"""
+    base_path_obj = Path(base_path)
+
+    if not base_path_obj.exists():
+        logger.error(f"Base path {base_path} does not exist")
+        return None
+
+    return [str(app_dir) for app_dir in base_path_obj.iterdir()
+            if app_dir.is_dir() and not app_dir.name.startswith('.')]
+
+class ParallelExecutor:
+    """Maps a function over items with a serial, thread or process backend"""
+
+    def __init__(self,
+                 backend: str = BACKEND_PROCESS,
+                 max_workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None):
+        """
+        Initialize the executor
+
+        Args:
+            backend: 'serial', 'thread' or 'process'
+            max_workers: Worker count (defaults to the CPU count)
+            chunk_size: Items per process-pool task (defaults to ~4 chunks per worker)
+        """
+        if backend not in (BACKEND_SERIAL, BACKEND_THREAD, BACKEND_PROCESS):
+            raise ValueError(f"Unknown executor backend: {backend}")
+
+        self.backend = backend
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def map(self, function: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Apply function to every item and return results in input order
+
+        For the process backend the function (and the object it is bound to)
+        must be picklable; it is sent to each worker process once.
+        """
+        items = list(items)
+        workers = self._workers_for(len(items))
+
+        if workers <= 1:
+            return [function(item) for item in items]
+
+        if self.backend == BACKEND_PROCESS:
+            with self._process_pool(function, workers) as executor:
+                return list(executor.map(_call_installed, items,
+                                         chunksize=self._chunk_size_for(len(items), workers)))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, items))
+
+    def imap_unordered(self, function: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[Any]:
+        """Apply function to every item, yielding results as they complete"""
+        items = list(items)
+        workers = self._workers_for(len(items))
+
+        if workers <= 1:
+            for item in items:
+                yield function(item)
+            return
+
+        if self.backend == BACKEND_PROCESS:
+            chunk_size = self._chunk_size_for(len(items), workers)
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+            with self._process_pool(function, workers) as executor:
+                futures = [executor.submit(_call_installed_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    yield from future.result()
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(function, item) for item in items]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _process_pool(self, function: Callable[[Any], Any], workers: int) -> ProcessPoolExecutor:
+        """Process pool with the function pre-installed in each worker"""
+        return ProcessPoolExecutor(max_workers=workers,
+                                   initializer=_install_function,
+                                   initargs=(function,))
+
+    def _workers_for(self, item_count: int) -> int:
+        """Effective worker count for a batch"""
+        if self.backend == BACKEND_SERIAL:
+            return 1
+        return max(1, min(self.max_workers, item_count))
+
+    def _chunk_size_for(self, item_count: int, workers: int) -> int:
+        """Chunk size for the process backend"""
+        if self.chunk_size:
+            return self.chunk_size
+        return max(1, item_count // (workers * 4))
@@ -0,0 +1,88 @@
+"""
+Pattern Trie Utility
+Aho-Corasick pattern trie that finds the highest-precedence substring rule in one pass
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PatternTrie:
+    """Compiled substring matcher: every rule is found in O(len(text)) regardless of rule count"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Best (priority, value) ending at each node, including suffixes reached via fail links
+        self._best: List[Optional[Tuple[Tuple, Any]]] = [None]
+        self._built = False
+
+    def add(self, pattern: str, value: Any, priority: Tuple):
+        """
+        Register a rule
+
+        Args:
+            pattern: Substring to match
+            value: Payload returned when this rule wins
+            priority: Comparable precedence key; the largest key among matching rules wins
+        """
+        if not pattern:
+            raise ValueError("Empty patterns would match every name")
+
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            node = next_node
+
+        if self._best[node] is None or priority > self._best[node][0]:
+            self._best[node] = (priority, value)
+        self._built = False
+
+    def build(self):
+        """Compute failure links and propagate the best rule along them"""
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            queue.append(node)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited[0] > self._best[child][0]):
+                    self._best[child] = inherited
+
+        self._built = True
+
+    def best_match(self, text: str) -> Optional[Any]:
+        """Value of the highest-priority rule occurring anywhere in text (None if none match)"""
+        if not self._built:
+            self.build()
+
+        node = 0
+        best = None
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            candidate = self._best[node]
+            if candidate is not None and (best is None or candidate[0] > best[0]):
+                best = candidate
+
+        return best[1] if best is not None else None
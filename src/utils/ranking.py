@@ -0,0 +1,72 @@
+"""
+Ranking Utility
+Single argsort-based ranking kernel (average ranks for ties, tie-correction terms) for rank statistics
+"""
+
+from dataclasses import dataclass
+from typing import Sequence, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+@dataclass
+class RankedSample:
+    """Ranks of a sample and the tie structure they were computed from"""
+    ranks: np.ndarray  # 1-based average ranks, in input order
+    tie_term: float  # Sum of t^3 - t over tie groups (0 without ties)
+    n_tie_groups: int  # Tie groups with more than one member
+
+def rank_data(values: ArrayLike) -> RankedSample:
+    """
+    Average ranks in O(n log n)
+
+    One stable argsort; tie groups are the runs of equal values in sorted order,
+    and every member of a run gets the mean of the run's 1-based positions.
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    n = len(values)
+    if n == 0:
+        return RankedSample(ranks=np.zeros(0), tie_term=0.0, n_tie_groups=0)
+
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+
+    # Run boundaries in sorted order
+    starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+    ends = np.append(starts[1:], n)
+    run_lengths = ends - starts
+
+    ranks = np.empty(n, dtype=np.float64)
+    ranks[order] = np.repeat((starts + ends + 1) / 2.0, run_lengths)
+
+    tied = run_lengths[run_lengths > 1].astype(np.float64)
+    return RankedSample(ranks=ranks, tie_term=float(np.sum(tied ** 3 - tied)), n_tie_groups=len(tied))
+
+def average_ranks(values: ArrayLike) -> np.ndarray:
+    """1-based ranks with ties sharing their average rank"""
+    return rank_data(values).ranks
+
+def spearman_rho(x: ArrayLike, y: ArrayLike) -> float:
+    """
+    Spearman's rho as the Pearson correlation of average ranks
+
+    Equal to 1 - 6 sum(d^2) / (n (n^2 - 1)) without ties and tie-corrected otherwise.
+    Returns 0 when either variable is constant.
+    """
+    x_ranks = average_ranks(x)
+    y_ranks = average_ranks(y)
+    if len(x_ranks) != len(y_ranks):
+        raise ValueError("x and y must have the same length")
+    if len(x_ranks) < 2:
+        return 0.0
+
+    x_centered = x_ranks - x_ranks.mean()
+    y_centered = y_ranks - y_ranks.mean()
+    denominator = np.sqrt(np.dot(x_centered, x_centered) * np.dot(y_centered, y_centered))
+    if denominator == 0:
+        return 0.0
+    return float(np.clip(np.dot(x_centered, y_centered) / denominator, -1.0, 1.0))
@@ -0,0 +1,200 @@
+"""
+Resampling Utility
+Seeded, vectorized permutation tests and bootstrap confidence intervals sharded across workers
+"""
+
+from functools import partial
+from typing import Callable, Optional, Tuple
+import logging
+
+import numpy as np
+
+from utils.parallel_executor import ParallelExecutor, BACKEND_THREAD
+
+logger = logging.getLogger(__name__)
+
+# A kernel draws `size` resamples from its arrays and returns one statistic per resample:
+# kernel(rng, size, *arrays) -> (size,) array
+Kernel = Callable[..., np.ndarray]
+
+def _run_shard(kernel: Kernel, arrays: Tuple[np.ndarray, ...],
+               shard: Tuple[np.random.SeedSequence, int]) -> np.ndarray:
+    """Statistics of one shard of resamples (runs in the worker)"""
+    seed_sequence, size = shard
+    return kernel(np.random.default_rng(seed_sequence), size, *arrays)
+
+def _permuted_rows(rng: np.random.Generator, values: np.ndarray, size: int) -> np.ndarray:
+    """(size x n) independent permutations of a vector"""
+    return rng.permuted(np.broadcast_to(values, (size, len(values))), axis=1)
+
+def _bootstrap_counts(rng: np.random.Generator, size: int, n: int) -> np.ndarray:
+    """(size x n) times each observation is drawn in a resample with replacement"""
+    return _row_counts(rng.integers(0, n, size=(size, n)), n).astype(np.float64)
+
+def _row_counts(draws: np.ndarray, n: int) -> np.ndarray:
+    """Per-row occurrence counts of the values 0..n-1 (one offset bincount for all rows)"""
+    size = len(draws)
+    offsets = (np.arange(size) * n)[:, None]
+    return np.bincount((draws + offsets).ravel(), minlength=size * n).reshape(size, n)
+
+def _sort_positions(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(position of each value in stable sorted order, start positions of the tie groups)"""
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    positions = np.empty(len(values), dtype=np.int64)
+    positions[order] = np.arange(len(values))
+    return positions, np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+
+def _resample_doubled_ranks(draw_positions: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Twice the average rank of every draw within its resample
+
+    Ranks within a resample only depend on how many draws land in each tie group,
+    so they are cumulative counts over one fixed sort instead of a sort per
+    resample. Doubling keeps the half ranks of ties integral.
+    """
+    n = draw_positions.shape[1]
+    counts = _row_counts(draw_positions, n)
+    if len(starts) < n:
+        group_counts = np.add.reduceat(counts, starts, axis=1)
+        doubled = 2 * np.cumsum(group_counts, axis=1) - group_counts + 1
+        doubled = np.repeat(doubled, np.diff(np.append(starts, n)), axis=1)
+    else:
+        doubled = 2 * np.cumsum(counts, axis=1) - counts + 1
+    return np.take_along_axis(doubled, draw_positions, axis=1)
+
+def _weighted_variances(counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Sample variance of values within each resample described by counts"""
+    centered = values - values.mean()
+    n = counts.sum(axis=1)
+    first = counts @ centered
+    second = counts @ (centered * centered)
+    return np.maximum(second - first * first / n, 0.0) / (n - 1)
+
+def mann_whitney_permutation(rng: np.random.Generator, size: int, ranks: np.ndarray, n1: int) -> np.ndarray:
+    """|U1 - n1 n2 / 2| with the pooled ranks reassigned to the groups at random"""
+    n2 = len(ranks) - n1
+    rank_sums = _permuted_rows(rng, ranks, size)[:, :n1].sum(axis=1)
+    return np.abs(rank_sums - n1 * (n1 + 1) / 2 - n1 * n2 / 2)
+
+def kruskal_wallis_permutation(rng: np.random.Generator, size: int, ranks: np.ndarray,
+                               sizes: np.ndarray, tie_correction: float) -> np.ndarray:
+    """Tie-corrected H with the pooled ranks reassigned to the groups at random"""
+    n_total = len(ranks)
+    membership = np.zeros((n_total, len(sizes)))
+    membership[np.arange(n_total), np.repeat(np.arange(len(sizes)), sizes)] = 1.0
+    rank_sums = _permuted_rows(rng, ranks, size) @ membership
+    h = 12 / (n_total * (n_total + 1)) * (rank_sums ** 2 / sizes).sum(axis=1) - 3 * (n_total + 1)
+    return h / tie_correction if tie_correction > 0 else h
+
+def spearman_permutation(rng: np.random.Generator, size: int, x_ranks: np.ndarray, y_ranks: np.ndarray) -> np.ndarray:
+    """|rho| with the pairing between x and y shuffled"""
+    x_centered = x_ranks - x_ranks.mean()
+    y_centered = y_ranks - y_ranks.mean()
+    denominator = np.sqrt(np.dot(x_centered, x_centered) * np.dot(y_centered, y_centered))
+    if denominator == 0:
+        return np.zeros(size)
+    return np.abs(_permuted_rows(rng, y_centered, size) @ x_centered / denominator)
+
+def spearman_bootstrap(rng: np.random.Generator, size: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """rho of pairs resampled with replacement (duplicated pairs tie when re-ranked)"""
+    n = len(x)
+    x_positions, x_starts = _sort_positions(x)
+    y_positions, y_starts = _sort_positions(y)
+    draws = rng.integers(0, n, size=(size, n))
+
+    # Average ranks of a size-n sample always have mean (n + 1) / 2
+    x_centered = (_resample_doubled_ranks(x_positions[draws], x_starts) - (n + 1)).astype(np.float64)
+    y_centered = (_resample_doubled_ranks(y_positions[draws], y_starts) - (n + 1)).astype(np.float64)
+    covariance = np.einsum('ij,ij->i', x_centered, y_centered)
+    denominator = np.sqrt(np.einsum('ij,ij->i', x_centered, x_centered) * np.einsum('ij,ij->i', y_centered, y_centered))
+    return np.clip(np.divide(covariance, denominator, out=np.zeros(size), where=denominator > 0), -1.0, 1.0)
+
+def _cronbach(n_items: int, item_variances: np.ndarray, total_variances: np.ndarray) -> np.ndarray:
+    """Alpha from summed item variances and the variance of the total score (0 if the latter is 0)"""
+    ratio = np.divide(item_variances, total_variances, out=np.ones_like(total_variances), where=total_variances > 0)
+    return np.where(total_variances > 0, n_items / (n_items - 1) * (1 - ratio), 0.0)
+
+def cronbach_permutation(rng: np.random.Generator, size: int, items: np.ndarray) -> np.ndarray:
+    """
+    Alpha with every item shuffled independently (no shared variance under the null)
+
+    Shuffling leaves each item's variance unchanged; only the total score's variance
+    is recomputed. The first item stays fixed since only relative order matters.
+    """
+    centered = items - items.mean(axis=1, keepdims=True)
+    totals = np.broadcast_to(centered[0], (size, items.shape[1])).copy()
+    for item in centered[1:]:
+        totals += _permuted_rows(rng, item, size)
+    total_variances = np.einsum('ij,ij->i', totals, totals) / (items.shape[1] - 1)
+    return _cronbach(len(items), np.full(size, items.var(axis=1, ddof=1).sum()), total_variances)
+
+def cronbach_bootstrap(rng: np.random.Generator, size: int, items: np.ndarray) -> np.ndarray:
+    """Alpha of observations resampled with replacement"""
+    counts = _bootstrap_counts(rng, size, items.shape[1])
+    item_variances = sum(_weighted_variances(counts, item) for item in items)
+    return _cronbach(len(items), item_variances, _weighted_variances(counts, items.sum(axis=0)))
+
+class ResamplingEngine:
+    """Monte Carlo permutation p-values and percentile bootstrap intervals"""
+
+    def __init__(self, n_resamples: int = 10000, batch_size: Optional[int] = None,
+                 max_batch_bytes: int = 8 * 1024 * 1024, seed: Optional[int] = None,
+                 backend: str = BACKEND_THREAD, max_workers: Optional[int] = None):
+        """
+        Args:
+            n_resamples: Permutations or bootstrap resamples per call
+            batch_size: Resamples generated together as one matrix (one shard per batch);
+                derived from max_batch_bytes and the sample size when None
+            max_batch_bytes: Budget for one (resamples x n) float64 matrix of a shard;
+                kernels hold a few such matrices at once, per worker
+            seed: Seed for reproducible results; every call draws from the same
+                seeded streams, so a result does not depend on earlier calls
+            backend: 'serial', 'thread' or 'process' executor for the shards; threads
+                avoid a pool spawn per call and numpy releases the GIL in the kernels
+            max_workers: Worker count (defaults to the CPU count)
+        """
+        if n_resamples < 1:
+            raise ValueError("n_resamples must be positive")
+        self.n_resamples = n_resamples
+        self.batch_size = max(1, batch_size) if batch_size else None
+        self.max_batch_bytes = max_batch_bytes
+        self.seed = seed
+        self.executor = ParallelExecutor(backend=backend, max_workers=max_workers, chunk_size=1)
+
+    def draw(self, kernel: Kernel, *arrays: np.ndarray) -> np.ndarray:
+        """
+        n_resamples statistics from a kernel
+
+        The resamples are split into shards, each with its own child seed, so
+        results are identical for any backend and worker count.
+        """
+        batch_size = self.batch_size or self._batch_size_for(arrays)
+        sizes = [min(batch_size, self.n_resamples - start)
+                 for start in range(0, self.n_resamples, batch_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        return np.concatenate(self.executor.map(partial(_run_shard, kernel, arrays), list(zip(seeds, sizes))))
+
+    def _batch_size_for(self, arrays: Tuple[np.ndarray, ...]) -> int:
+        """Rows per shard so one (rows x n) float64 matrix fits the byte budget"""
+        n = max((np.shape(array)[-1] for array in arrays if np.ndim(array) > 0), default=1)
+        return max(1, self.max_batch_bytes // (8 * max(n, 1)))
+
+    def permutation_p_value(self, kernel: Kernel, observed: float, *arrays: np.ndarray) -> float:
+        """
+        Share of null statistics at least as extreme as the observed one
+
+        Kernels return statistics where larger is more extreme (absolute values
+        for two-sided tests). The (count + 1) / (n + 1) estimate is never 0.
+        """
+        null = self.draw(kernel, *arrays)
+        # Tolerance so statistics equal to the observed one up to rounding count as extreme
+        tolerance = 1e-9 * max(1.0, abs(observed))
+        return float((np.count_nonzero(null >= observed - tolerance) + 1) / (len(null) + 1))
+
+    def bootstrap_interval(self, kernel: Kernel, *arrays: np.ndarray,
+                           confidence: float = 0.95) -> Tuple[float, float]:
+        """Percentile bootstrap confidence interval"""
+        statistics = self.draw(kernel, *arrays)
+        lower, upper = np.quantile(statistics, [(1 - confidence) / 2, (1 + confidence) / 2])
+        return float(lower), float(upper)
@@ -0,0 +1,152 @@
+"""
+Result Cache Utility
+Thread-safe, memory-budgeted LRU cache for per-file analysis results
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness"""
+    entries: int = 0
+    current_bytes: int = 0
+    max_bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    rejected: int = 0  # Values larger than the whole budget
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+def approximate_size(obj: Any, max_depth: int = 6) -> int:
+    """
+    Approximate the deep memory footprint of an object in bytes
+
+    Walks containers, dataclass/regular instance attributes and slots with
+    sys.getsizeof, counting shared objects once. Deeper levels than max_depth
+    are ignored, so the result is a lower bound for very nested values.
+    """
+    seen = set()
+
+    def _size(value: Any, depth: int) -> int:
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+        size = sys.getsizeof(value)
+
+        if depth >= max_depth or isinstance(value, (str, bytes, bytearray, int, float, bool)):
+            return size
+
+        if isinstance(value, dict):
+            size += sum(_size(k, depth + 1) + _size(v, depth + 1) for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(_size(item, depth + 1) for item in value)
+        elif hasattr(value, '__dict__'):
+            size += _size(vars(value), depth + 1)
+        elif hasattr(value, '__slots__'):
+            size += sum(_size(getattr(value, slot), depth + 1)
+                        for slot in value.__slots__ if hasattr(value, slot))
+        return size
+
+    return _size(obj, 0)
+
+class MemoryBudgetLRU:
+    """Least-recently-used cache bounded by the approximate size of its values"""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Approximate memory budget for keys and values
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_bytes=max_bytes)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it as recently used"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return self._entries[key]
+            self._stats.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting least-recently-used entries over budget"""
+        size = approximate_size(key) + approximate_size(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self.max_bytes:
+                self._stats.rejected += 1
+                logger.debug(f"Not caching {key}: {size} bytes exceeds budget of {self.max_bytes}")
+                return
+
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._stats.current_bytes += size
+
+            while self._stats.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership test that does not touch recency or counters"""
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._stats.current_bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the cache counters"""
+        with self._lock:
+            return CacheStats(entries=len(self._entries),
+                              current_bytes=self._stats.current_bytes,
+                              max_bytes=self.max_bytes,
+                              hits=self._stats.hits,
+                              misses=self._stats.misses,
+                              evictions=self._stats.evictions,
+                              rejected=self._stats.rejected)
+
+    def __getstate__(self):
+        """Pickle only the budget: entries stay local and locks cannot be pickled"""
+        return {'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(max_bytes=state['max_bytes'])
+
+    def empty_copy(self) -> 'MemoryBudgetLRU':
+        """New empty cache with the same budget (used when pickling analyzers)"""
+        return MemoryBudgetLRU(max_bytes=self.max_bytes)
+
+    def _remove(self, key: Hashable):
+        """Remove an entry; caller must hold the lock"""
+        del self._entries[key]
+        self._stats.current_bytes -= self._sizes.pop(key)
@@ -0,0 +1,229 @@
+"""
+Semver Utility
+Memoized npm-style semver range parsing and minimum satisfying version evaluation
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (major, minor, patch, is_release, prerelease identifiers); orders like semver precedence
+Version = Tuple[int, int, int, int, Tuple]
+Comparator = Tuple[str, Version]
+
+_PARTIAL_VERSION = re.compile(
+    r'^v?(\d+|[xX*])(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?'
+    r'(?:-?([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?(?:\+[0-9A-Za-z.-]+)?$'
+)
+_OPERATOR_SPACING = re.compile(r'(<=|>=|<|>|=|\^|~>?)\s+')
+_COMPARATOR = re.compile(r'^(<=|>=|<|>|=|\^|~>?)?(.*)$')
+_HYPHEN_RANGE = re.compile(r'^\s*(\S+)\s+-\s+(\S+)\s*$')
+
+# Specs that do not describe a registry version range
+_NON_REGISTRY_PREFIXES = ('file:', 'link:', 'portal:', 'patch:', 'git', 'github:', 'http:', 'https:')
+
+MIN_VERSION: Version = (0, 0, 0, 0, ((0, 0),))  # 0.0.0-0, the lowest possible version
+
+def _prerelease_key(prerelease: Optional[str]) -> Tuple[int, Tuple]:
+    """Precedence key for a prerelease tag (releases sort after prereleases)"""
+    if not prerelease:
+        return 1, ()
+    return 0, tuple((0, int(part), '') if part.isdigit() else (1, 0, part)
+                    for part in prerelease.split('.'))
+
+def make_version(major: int, minor: int = 0, patch: int = 0, prerelease: Optional[str] = None) -> Version:
+    """Build a comparable version tuple"""
+    is_release, identifiers = _prerelease_key(prerelease)
+    return major, minor, patch, is_release, identifiers
+
+def format_version(version: Version) -> str:
+    """Render a version tuple as a semver string"""
+    text = f"{version[0]}.{version[1]}.{version[2]}"
+    if not version[3]:
+        text += '-' + '.'.join(str(number) if kind == 0 else name
+                               for kind, number, name in version[4])
+    return text
+
+@lru_cache(maxsize=None)
+def parse_version(text: str) -> Optional[Version]:
+    """Parse an exact version ('1.2.3', 'v1.2.3-beta.1'); None if not a full version"""
+    match = _PARTIAL_VERSION.match(text.strip())
+    if not match or not all(part and part.isdigit() for part in match.group(1, 2, 3)):
+        return None
+    return make_version(int(match.group(1)), int(match.group(2)), int(match.group(3)), match.group(4))
+
+def _parse_partial(text: str) -> Optional[Tuple[Optional[int], Optional[int], Optional[int], Optional[str]]]:
+    """Parse a possibly partial version; wildcard/missing parts become None"""
+    match = _PARTIAL_VERSION.match(text)
+    if not match:
+        return None
+    parts = [int(part) if part and part.isdigit() else None for part in match.group(1, 2, 3)]
+    # Anything after a wildcard is a wildcard too ('1.x.3' == '1.x')
+    for i in range(1, 3):
+        if parts[i - 1] is None:
+            parts[i] = None
+    return parts[0], parts[1], parts[2], match.group(4)
+
+def _desugar(operator: str, text: str) -> Optional[Tuple[Comparator, ...]]:
+    """Turn one comparator token (caret, tilde, x-range, primitive) into primitive comparators"""
+    if text in ('', '*', 'x', 'X'):
+        return ((">=", MIN_VERSION),) if operator in ('', '=', '>=', '^', '~', '~>', '<=') else None
+    partial = _parse_partial(text)
+    if partial is None:
+        return None
+    major, minor, patch, prerelease = partial
+
+    if major is None:
+        return ((">=", MIN_VERSION),)
+
+    low = make_version(major, minor or 0, patch or 0, prerelease)
+
+    if operator == '^':
+        if major > 0 or minor is None:
+            high = make_version(major + 1, 0, 0, '0')
+        elif minor > 0 or patch is None:
+            high = make_version(0, minor + 1, 0, '0')
+        else:
+            high = make_version(0, 0, patch + 1, '0')
+        return ((">=", low), ("<", high))
+
+    if operator in ('~', '~>'):
+        high = make_version(major + 1, 0, 0, '0') if minor is None else make_version(major, minor + 1, 0, '0')
+        return ((">=", low), ("<", high))
+
+    # Upper bound implied by a partial version (e.g. '1.2' covers up to <1.3.0-0)
+    if minor is None:
+        partial_high = make_version(major + 1, 0, 0, '0')
+    elif patch is None:
+        partial_high = make_version(major, minor + 1, 0, '0')
+    else:
+        partial_high = None
+
+    if operator in ('', '='):
+        return ((">=", low), ("<", partial_high)) if partial_high else (("=", low),)
+    if operator == '>=':
+        return ((">=", low),)
+    if operator == '>':
+        # '>1.2' means '>=1.3.0' (the release, not its prereleases)
+        return ((">=", partial_high[:3] + (1, ())),) if partial_high else ((">", low),)
+    if operator == '<':
+        return (("<", low),)
+    if operator == '<=':
+        return (("<", partial_high),) if partial_high else (("<=", low),)
+    return None
+
+def _normalize_spec(spec: str) -> Optional[str]:
+    """Strip protocol prefixes; None for specs that are not registry ranges"""
+    spec = spec.strip()
+    if spec.startswith('workspace:'):
+        spec = spec[len('workspace:'):]
+        if spec in ('*', '^', '~'):
+            return None
+    if spec.startswith('npm:'):
+        # Aliases: 'npm:other-package@^1.2.3'
+        spec = spec[len('npm:'):]
+        at = spec.rfind('@')
+        spec = spec[at + 1:] if at > 0 else ''
+    if spec.startswith(_NON_REGISTRY_PREFIXES) or '://' in spec or '/' in spec:
+        return None
+    return spec
+
+@lru_cache(maxsize=None)
+def _parse_range_cached(spec: str) -> Optional[Tuple[Tuple[Comparator, ...], ...]]:
+    """Parse a range into OR-ed sets of AND-ed primitive comparators"""
+    normalized = _normalize_spec(spec)
+    if normalized is None:
+        return None
+
+    comparator_sets = []
+    for alternative in normalized.split('||'):
+        alternative = _OPERATOR_SPACING.sub(r'\1', alternative.strip())
+
+        hyphen = _HYPHEN_RANGE.match(alternative)
+        if hyphen:
+            low = _desugar('>=', hyphen.group(1))
+            high = _desugar('<=', hyphen.group(2))
+            if low is None or high is None:
+                return None
+            comparator_sets.append(low + high)
+            continue
+
+        comparators = []
+        for token in alternative.split() or ['*']:
+            operator, text = _COMPARATOR.match(token).groups()
+            desugared = _desugar(operator or '', text)
+            if desugared is None:
+                return None
+            comparators.extend(desugared)
+        comparator_sets.append(tuple(comparators))
+
+    return tuple(comparator_sets)
+
+def parse_range(spec: str) -> Optional[Tuple[Tuple[Comparator, ...], ...]]:
+    """
+    Parse an npm range specification (memoized per distinct, interned string)
+
+    Returns None for dist-tags ('latest'), URLs, git/file specs and invalid ranges.
+    """
+    return _parse_range_cached(sys.intern(spec))
+
+def _satisfies_set(version: Version, comparators: Tuple[Comparator, ...]) -> bool:
+    """Check a version against one AND-ed comparator set"""
+    for operator, bound in comparators:
+        if operator == '>=' and not version >= bound:
+            return False
+        if operator == '>' and not version > bound:
+            return False
+        if operator == '<' and not version < bound:
+            return False
+        if operator == '<=' and not version <= bound:
+            return False
+        if operator == '=' and version != bound:
+            return False
+    return True
+
+def satisfies(version: str, spec: str) -> bool:
+    """Check whether an exact version satisfies a range"""
+    parsed_version = parse_version(version)
+    parsed_range = parse_range(spec)
+    if parsed_version is None or parsed_range is None:
+        return False
+    return any(_satisfies_set(parsed_version, comparators) for comparators in parsed_range)
+
+@lru_cache(maxsize=None)
+def _min_version_cached(spec: str) -> Optional[Version]:
+    """Lowest version satisfying the range"""
+    parsed_range = _parse_range_cached(spec)
+    if parsed_range is None:
+        return None
+
+    candidates = []
+    for comparators in parsed_range:
+        lower = make_version(0, 0, 0)
+        for operator, bound in comparators:
+            if operator in ('>=', '=') and bound > lower:
+                lower = bound
+            elif operator == '>' and bound >= lower:
+                # Next release after the bound
+                lower = (make_version(bound[0], bound[1], bound[2] + 1) if bound[3]
+                         else make_version(bound[0], bound[1], bound[2]))
+        if _satisfies_set(lower, comparators):
+            candidates.append(lower)
+
+    return min(candidates) if candidates else None
+
+def min_satisfying_version(spec: str) -> Optional[Version]:
+    """Lowest version allowed by a range (memoized); None if unknown or unsatisfiable"""
+    return _min_version_cached(sys.intern(spec))
+
+def cache_info() -> dict:
+    """Memoization statistics for the parser caches"""
+    return {
+        'parse_range': _parse_range_cached.cache_info()._asdict(),
+        'min_satisfying_version': _min_version_cached.cache_info()._asdict(),
+        'parse_version': parse_version.cache_info()._asdict()
+    }
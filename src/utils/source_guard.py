@@ -0,0 +1,152 @@
+"""
+Source Guard Utility
+Detects minified, generated and oversized source files and bounds per-file analysis cost
+"""
+
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Analysis modes reported on metrics objects
+MODE_FULL = "full"
+MODE_BOUNDED = "bounded"
+MODE_SKIPPED = "skipped"
+
+@dataclass
+class SourceProfile:
+    """Cheap structural profile of a single source file"""
+    file_path: str
+    size_bytes: int = 0
+    line_count: int = 0
+    max_line_length: int = 0
+    avg_line_length: float = 0.0
+    entropy: float = 0.0  # Shannon entropy in bits per character (sampled)
+
+    # Routing decision
+    mode: str = MODE_FULL
+    flags: List[str] = field(default_factory=list)  # minified, generated, high_entropy, oversized
+
+class AnalysisDeadline:
+    """Per-file time budget checked between analysis passes"""
+
+    def __init__(self, budget_seconds: Optional[float]):
+        self.budget_seconds = budget_seconds
+        self.started = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """Seconds spent since the budget started"""
+        return time.perf_counter() - self.started
+
+    def expired(self) -> bool:
+        """Check whether the budget has been used up"""
+        return self.budget_seconds is not None and self.elapsed() > self.budget_seconds
+
+class SourceGuard:
+    """Classifies source files and routes them to full, bounded or skipped analysis"""
+
+    def __init__(self,
+                 max_file_bytes: int = 1_000_000,
+                 minified_line_length: int = 1000,
+                 minified_avg_line_length: float = 250.0,
+                 entropy_threshold: float = 5.2,
+                 bounded_max_bytes: int = 64_000,
+                 time_budget_seconds: Optional[float] = 5.0):
+        """
+        Initialize the source guard
+
+        Args:
+            max_file_bytes: Files larger than this are skipped entirely
+            minified_line_length: A single line this long marks the file as minified
+            minified_avg_line_length: Average line length that marks the file as minified
+            entropy_threshold: Character entropy (bits) above which long-lined files are flagged
+            bounded_max_bytes: Content budget for the bounded analysis path
+            time_budget_seconds: Hard per-file time budget (None disables it)
+        """
+        self.max_file_bytes = max_file_bytes
+        self.minified_line_length = minified_line_length
+        self.minified_avg_line_length = minified_avg_line_length
+        self.entropy_threshold = entropy_threshold
+        self.bounded_max_bytes = bounded_max_bytes
+        self.time_budget_seconds = time_budget_seconds
+
+        # Entropy is estimated from a prefix sample to keep inspection O(sample)
+        self.entropy_sample_bytes = 16_384
+
+        # Markers emitted by bundlers, code generators and vendored builds
+        self.generated_markers = [
+            '@generated', 'do not edit', 'auto-generated', 'autogenerated',
+            'sourcemappingurl=', 'webpackbootstrap', '__webpack_require__',
+            '/*! for license information'
+        ]
+        self.generated_suffixes = ['.min.js', '.min.jsx', '.bundle.js', '.chunk.js']
+
+    def inspect(self, file_path: str, content: str) -> SourceProfile:
+        """Profile a file and decide how it should be analyzed"""
+        profile = SourceProfile(file_path=file_path)
+        profile.size_bytes = len(content)
+
+        lines = content.splitlines()
+        profile.line_count = len(lines)
+        if lines:
+            profile.max_line_length = max(len(line) for line in lines)
+            profile.avg_line_length = profile.size_bytes / profile.line_count
+
+        profile.entropy = self._character_entropy(content[:self.entropy_sample_bytes])
+
+        # Generated/vendored sources
+        lowered_path = file_path.lower()
+        header = content[:2048].lower()
+        if (any(lowered_path.endswith(suffix) for suffix in self.generated_suffixes) or
+                any(marker in header for marker in self.generated_markers)):
+            profile.flags.append('generated')
+
+        # Minified sources
+        if (profile.max_line_length >= self.minified_line_length or
+                profile.avg_line_length >= self.minified_avg_line_length):
+            profile.flags.append('minified')
+
+        if profile.entropy >= self.entropy_threshold and profile.avg_line_length >= 120:
+            profile.flags.append('high_entropy')
+
+        if profile.size_bytes > self.max_file_bytes:
+            profile.flags.append('oversized')
+            profile.mode = MODE_SKIPPED
+        elif profile.flags:
+            profile.mode = MODE_BOUNDED
+
+        if profile.mode != MODE_FULL:
+            logger.info(f"Routing {file_path} to {profile.mode} analysis ({', '.join(profile.flags)})")
+
+        return profile
+
+    def bound_content(self, content: str) -> str:
+        """Truncate content for the bounded path and break up very long lines"""
+        bounded = content[:self.bounded_max_bytes]
+
+        # Re-wrap long lines so line-oriented patterns cannot scan megabyte-long lines
+        if any(len(line) > self.minified_line_length for line in bounded.splitlines()):
+            width = self.minified_line_length
+            wrapped = []
+            for line in bounded.splitlines():
+                wrapped.extend(line[i:i + width] for i in range(0, max(len(line), 1), width))
+            bounded = '\n'.join(wrapped)
+
+        return bounded
+
+    def start_budget(self) -> AnalysisDeadline:
+        """Start the per-file time budget"""
+        return AnalysisDeadline(self.time_budget_seconds)
+
+    def _character_entropy(self, sample: str) -> float:
+        """Shannon entropy of the character distribution in bits"""
+        if not sample:
+            return 0.0
+
+        total = len(sample)
+        return -sum((count / total) * math.log2(count / total)
+                    for count in Counter(sample).values())
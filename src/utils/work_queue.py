@@ -0,0 +1,139 @@
+"""
+Work Queue Utility
+Global file-level work queue with auto-tuned worker counts and thread/process backends
+"""
+
+import math
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from utils.parallel_executor import ParallelExecutor, BACKEND_THREAD, BACKEND_PROCESS
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class FileTask:
+    """A single file to analyze, tagged with the group (template/app) it belongs to"""
+    group: str
+    file_path: str
+
+@dataclass
+class QueueRunStats:
+    """Execution statistics of the last queue run"""
+    backend: str = BACKEND_THREAD
+    total_tasks: int = 0
+    failed_tasks: int = 0
+    workers: int = 1
+    chunk_size: int = 1
+    calibration_tasks: int = 0
+    mean_task_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+def _run_task(worker: Callable[[str], Any], task: FileTask) -> Tuple[str, str, Any, Optional[str]]:
+    """Run one task, turning exceptions into an error string"""
+    try:
+        return task.group, task.file_path, worker(task.file_path), None
+    except Exception as e:
+        return task.group, task.file_path, None, str(e)
+
+class FileWorkQueue:
+    """Single shared queue of file tasks drained by one pool across all groups"""
+
+    def __init__(self,
+                 backend: str = BACKEND_THREAD,
+                 max_workers: Optional[int] = None,
+                 calibration_tasks: int = 8,
+                 min_seconds_per_worker: Optional[float] = None):
+        """
+        Initialize the work queue
+
+        Args:
+            backend: 'thread' or 'process'
+            max_workers: Upper bound on workers (defaults to the CPU count)
+            calibration_tasks: Tasks run inline first to measure per-file cost
+            min_seconds_per_worker: Estimated work each extra worker must receive to be
+                worth starting (defaults to 0.05s for threads, 0.5s for processes)
+        """
+        if backend not in (BACKEND_THREAD, BACKEND_PROCESS):
+            raise ValueError(f"Unknown work queue backend: {backend}")
+
+        self.backend = backend
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.calibration_tasks = calibration_tasks
+        if min_seconds_per_worker is None:
+            min_seconds_per_worker = 0.05 if backend == BACKEND_THREAD else 0.5
+        self.min_seconds_per_worker = min_seconds_per_worker
+        self.last_run_stats = QueueRunStats(backend=backend)
+
+    def run(self, tasks: List[FileTask], worker: Callable[[str], Any]) -> Dict[str, List[Any]]:
+        """
+        Run the worker over every task and group the results
+
+        Args:
+            tasks: File tasks from all groups, drained from one shared queue
+            worker: Callable taking a file path; must be picklable for the process backend
+
+        Returns:
+            Mapping of group name to successful results, in task order
+        """
+        stats = QueueRunStats(backend=self.backend, total_tasks=len(tasks))
+        started = time.perf_counter()
+        outcomes = []
+
+        # Measure per-file cost on a small inline sample
+        calibration = tasks[:self.calibration_tasks]
+        for task in calibration:
+            outcomes.append(_run_task(worker, task))
+        stats.calibration_tasks = len(calibration)
+        if calibration:
+            stats.mean_task_seconds = (time.perf_counter() - started) / len(calibration)
+
+        remaining = tasks[len(calibration):]
+        stats.workers = self._tune_workers(len(remaining), stats.mean_task_seconds)
+        stats.chunk_size = self._tune_chunk_size(len(remaining), stats.workers)
+
+        if remaining:
+            logger.info(f"Dispatching {len(remaining)} files to {stats.workers} {self.backend} "
+                        f"workers (~{stats.mean_task_seconds * 1000:.1f} ms/file)")
+            outcomes.extend(self._execute(remaining, worker, stats))
+
+        grouped = defaultdict(list)
+        for group, file_path, result, error in outcomes:
+            if error is not None:
+                stats.failed_tasks += 1
+                stats.errors.append(f"{file_path}: {error}")
+                logger.warning(f"Analysis failed for {file_path}: {error}")
+            else:
+                grouped[group].append(result)
+
+        stats.elapsed_seconds = time.perf_counter() - started
+        self.last_run_stats = stats
+        return dict(grouped)
+
+    def _execute(self, tasks: List[FileTask], worker: Callable[[str], Any],
+                 stats: QueueRunStats) -> List[Tuple[str, str, Any, Optional[str]]]:
+        """Drain the tasks through the configured backend"""
+        executor = ParallelExecutor(backend=self.backend, max_workers=stats.workers,
+                                    chunk_size=stats.chunk_size)
+        return executor.map(partial(_run_task, worker), tasks)
+
+    def _tune_workers(self, remaining: int, mean_task_seconds: float) -> int:
+        """Pick a worker count from the measured per-file cost"""
+        if remaining == 0:
+            return 1
+
+        estimated_seconds = remaining * mean_task_seconds
+        useful_workers = math.ceil(estimated_seconds / self.min_seconds_per_worker)
+        return max(1, min(self.max_workers, remaining, useful_workers))
+
+    def _tune_chunk_size(self, remaining: int, workers: int) -> int:
+        """Batch process-pool tasks so each worker gets a few chunks"""
+        if self.backend != BACKEND_PROCESS or workers <= 1:
+            return 1
+        return max(1, remaining // (workers * 4))